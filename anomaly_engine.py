@@ -0,0 +1,195 @@
+"""
+캠페인 × 지표 × 일 단위 이상치 탐지 엔진
+직전 N주 같은 요일 값의 중앙값/MAD를 기준선으로 모든 시계열을 한 번에 벡터 연산으로 평가
+"""
+
+import time
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from instrumentation import instrument
+import config
+
+
+KEY_COLUMNS = ['Campaign', 'Source', 'Medium', 'Channel_Group']
+
+# 감소 알림 기준을 SLACK_SETTINGS['alert_thresholds']에서 가져오는 지표
+DROP_THRESHOLD_KEYS = {
+    'Sessions': 'session_drop_pct',
+    'Conversions': 'conversion_drop_pct'
+}
+
+# MAD → 표준편차 환산 계수 (정규분포 기준)
+MAD_SCALE = 1.4826
+
+ANOMALY_COLUMNS = [
+    'Date', 'Metric', 'Value', 'Baseline', 'Change_Pct', 'Score', 'Alert_Type'
+]
+
+
+def build_series_matrix(daily_data, key_columns, metrics):
+    """일별 데이터를 시계열 × 일 행렬로 변환
+    
+    반환값: (시계열 키 DataFrame, {지표: (시계열 수, 일 수) 배열}, 날짜 DatetimeIndex)
+    데이터가 없는 날은 0으로 채움
+    """
+    dates = pd.to_datetime(daily_data['Date'])
+    first_day = dates.min()
+    day_index = (dates - first_day).dt.days.to_numpy()
+    num_days = int(day_index.max()) + 1
+    
+    grouper = daily_data.groupby(key_columns, observed=True, sort=True)
+    series_ids = grouper.ngroup().to_numpy()
+    keys = grouper.size().index.to_frame(index=False)
+    num_series = len(keys)
+    
+    # (시계열, 일) 위치별 합계를 bincount 한 번으로 계산
+    flat_index = series_ids * num_days + day_index
+    matrices = {}
+    for metric in metrics:
+        weights = daily_data[metric].to_numpy(dtype=np.float64)
+        matrices[metric] = np.bincount(
+            flat_index, weights=weights, minlength=num_series * num_days
+        ).reshape(num_series, num_days)
+    
+    return keys, matrices, pd.date_range(first_day, periods=num_days, freq='D')
+
+
+def _sorted_median(windows):
+    """마지막 축의 중앙값 (창이 짧아 np.median보다 정렬 후 가운데 값을 고르는 편이 빠름)"""
+    ordered = np.sort(windows, axis=-1)
+    middle = ordered.shape[-1] // 2
+    
+    if ordered.shape[-1] % 2:
+        return ordered[..., middle]
+    return (ordered[..., middle - 1] + ordered[..., middle]) / 2
+
+
+def score_matrix(values, baseline_weeks):
+    """시계열 × 일 행렬의 기준선(중앙값), robust Z-score, 변화율 계산
+    
+    각 날짜의 기준선은 직전 baseline_weeks주 같은 요일 값 (7일 간격)
+    기준선을 만들 이력이 부족한 앞쪽 baseline_weeks주는 NaN
+    """
+    num_series, num_days = values.shape
+    span = 7 * baseline_weeks
+    
+    baseline = np.full(values.shape, np.nan)
+    score = np.full(values.shape, np.nan)
+    change_pct = np.full(values.shape, np.nan)
+    
+    if num_days <= span:
+        return baseline, score, change_pct
+    
+    # 창 [d - 7N, d] 중 7일 간격 값(d - 7N, ..., d - 7)만 사용
+    windows = sliding_window_view(values, span + 1, axis=1)[:, :, :span:7]
+    current = values[:, span:]
+    
+    median = _sorted_median(windows)
+    mad = _sorted_median(np.abs(windows - median[:, :, None]))
+    
+    # 변동이 거의 없는 시계열은 MAD가 0이 되므로 포아송 잡음 수준(√기준선)을 최소 척도로 사용
+    scale = np.maximum(MAD_SCALE * mad, np.maximum(np.sqrt(median), 1.0))
+    
+    baseline[:, span:] = median
+    score[:, span:] = (current - median) / scale
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change_pct[:, span:] = np.where(median > 0, (current - median) / median * 100, np.nan)
+    
+    return baseline, score, change_pct
+
+
+def get_change_thresholds(metric):
+    """지표별 (감소 기준 %, 증가 기준 %) 반환"""
+    settings = config.ANOMALY_SETTINGS
+    alert_thresholds = config.SLACK_SETTINGS.get('alert_thresholds', {})
+    
+    drop_pct = alert_thresholds.get(DROP_THRESHOLD_KEYS.get(metric), settings['min_change_pct'])
+    return drop_pct, settings['min_change_pct']
+
+
+@instrument('analyze')
+def detect_anomalies(daily_data, key_columns=None, metrics=None, baseline_weeks=None, since=None):
+    """모든 캠페인 × 지표 × 일 시계열에서 이상치 탐지
+    
+    daily_data: Date + 키 컬럼 + 지표 컬럼의 일별 데이터 (get_daily_campaign_data 형식)
+                기준선을 위해 평가 기간 앞에 baseline_weeks주 이력이 필요
+    since: 이 날짜 이후의 이상치만 반환 (기본값: 전체)
+    반환값: 키 컬럼 + Date, Metric, Value, Baseline, Change_Pct, Score, Alert_Type
+    """
+    settings = config.ANOMALY_SETTINGS
+    key_columns = key_columns or [column for column in KEY_COLUMNS if column in daily_data.columns]
+    metrics = metrics or [metric for metric in settings['metrics'] if metric in daily_data.columns]
+    baseline_weeks = baseline_weeks or settings['baseline_weeks']
+    
+    if daily_data.empty:
+        return pd.DataFrame(columns=key_columns + ANOMALY_COLUMNS)
+    
+    keys, matrices, dates = build_series_matrix(daily_data, key_columns, metrics)
+    first_day = 0 if since is None else int(np.searchsorted(dates, pd.Timestamp(since)))
+    
+    frames = []
+    for metric in metrics:
+        values = matrices[metric]
+        baseline, score, change_pct = score_matrix(values, baseline_weeks)
+        drop_pct, rise_pct = get_change_thresholds(metric)
+        
+        with np.errstate(invalid='ignore'):
+            flagged = (
+                (baseline >= settings['min_baseline'])
+                & (np.abs(score) >= settings['z_threshold'])
+                & ((change_pct <= -drop_pct) | (change_pct >= rise_pct))
+            )
+        flagged[:, :first_day] = False
+        
+        series_index, day_index = np.nonzero(flagged)
+        if len(series_index) == 0:
+            continue
+        
+        frame = keys.iloc[series_index].reset_index(drop=True)
+        frame['Date'] = dates[day_index]
+        frame['Metric'] = metric
+        frame['Value'] = values[series_index, day_index]
+        frame['Baseline'] = baseline[series_index, day_index]
+        frame['Change_Pct'] = np.round(change_pct[series_index, day_index], 2)
+        frame['Score'] = np.round(score[series_index, day_index], 2)
+        frame['Alert_Type'] = np.where(frame['Change_Pct'] > 0, '급증', '급감')
+        frames.append(frame)
+    
+    if not frames:
+        return pd.DataFrame(columns=key_columns + ANOMALY_COLUMNS)
+    
+    anomalies = pd.concat(frames, ignore_index=True)
+    order = anomalies['Score'].abs().sort_values(ascending=False).index
+    
+    return anomalies.loc[order].reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    print("이상치 탐지 엔진 테스트...")
+    
+    # 테스트용 더미 데이터: 캠페인 20,000개 × 8주
+    rng = np.random.default_rng(0)
+    num_series, num_days = 20000, 56
+    level = rng.gamma(2.0, 50.0, num_series)
+    weekday = 1 + 0.3 * np.sin(np.arange(num_days) * 2 * np.pi / 7)
+    sessions = rng.poisson(level[:, None] * weekday[None, :])
+    sessions[:10, -1] = sessions[:10, -1] // 5  # 마지막 날 급감 10건
+    
+    test_daily_data = pd.DataFrame({
+        'Date': np.tile(pd.date_range('2024-01-01', periods=num_days), num_series),
+        'Campaign': np.repeat([f'campaign_{i}' for i in range(num_series)], num_days),
+        'Source': 'google',
+        'Medium': 'cpc',
+        'Channel_Group': 'Paid Search',
+        'Sessions': sessions.ravel(),
+        'Users': (sessions * 0.8).astype(int).ravel(),
+        'Conversions': rng.poisson(sessions * 0.02).ravel()
+    })
+    
+    started = time.perf_counter()
+    anomalies = detect_anomalies(test_daily_data)
+    elapsed = time.perf_counter() - started
+    
+    print(f"시계열 {num_series * 3:,}개 × {num_days}일 평가: {elapsed:.3f}초, 이상치 {len(anomalies)}건")
+    print(anomalies.head(10))
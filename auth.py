@@ -2,14 +2,45 @@
 Google API 인증 관련 함수들
 """
 
+import json
+import threading
+import grpc
+import httplib2
 from google.oauth2 import service_account
 from google.analytics.data_v1beta import BetaAnalyticsDataClient
-from googleapiclient.discovery import build
+from google.analytics.data_v1beta.services.beta_analytics_data.transports import BetaAnalyticsDataGrpcTransport
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 import config
 
 
+# API 주소를 바꿔 접속할 때 gRPC 채널 옵션
+GRPC_CHANNEL_OPTIONS = [
+    ('grpc.max_send_message_length', -1),
+    ('grpc.max_receive_message_length', -1)
+]
+
+# 프로세스 전역 캐시 (인증 정보, 접속 주소별 GA4 클라이언트, Search Console discovery 문서)
+_cache = {}
+_cache_lock = threading.Lock()
+
+# Search Console 서비스는 httplib2 기반이라 스레드 간 공유가 안전하지 않으므로 스레드별로 보관
+_thread_local = threading.local()
+
+
 def get_credentials():
-    """서비스 계정 인증 정보 반환"""
+    """서비스 계정 인증 정보 반환 (프로세스 내에서 한 번만 로드, 토큰 갱신도 공유)"""
+    with _cache_lock:
+        credentials = _cache.get('credentials')
+        if credentials is None:
+            credentials = _load_credentials()
+            _cache['credentials'] = credentials
+    
+    return credentials
+
+
+def _load_credentials():
+    """서비스 계정 파일에서 인증 정보 생성"""
     scopes = [
         'https://www.googleapis.com/auth/analytics.readonly',
         'https://www.googleapis.com/auth/webmasters.readonly'
@@ -24,15 +55,78 @@ def get_credentials():
 
 
 def get_ga4_client():
-    """GA4 클라이언트 반환"""
-    credentials = get_credentials()
-    return BetaAnalyticsDataClient(credentials=credentials)
+    """GA4 클라이언트 반환 (gRPC 채널 하나를 모든 호출/스레드가 공유)
+    
+    config.API_ENDPOINTS['ga4']가 지정되면 인증 없이 해당 주소(가짜 서버 등)에 접속.
+    클라이언트는 접속 주소별로 캐시하므로 주소를 바꾸거나 지우면 그에 맞는 클라이언트를 사용
+    """
+    endpoint = config.API_ENDPOINTS.get('ga4')
+    credentials = None if endpoint else get_credentials()
+    key = ('ga4_client', endpoint)
+    
+    with _cache_lock:
+        client = _cache.get(key)
+        if client is None:
+            if endpoint:
+                # 기본 채널과 같이 메시지 크기 제한 해제 (한 페이지가 4MB를 넘을 수 있음)
+                channel = grpc.insecure_channel(endpoint, options=GRPC_CHANNEL_OPTIONS)
+                transport = BetaAnalyticsDataGrpcTransport(channel=channel)
+                client = BetaAnalyticsDataClient(transport=transport)
+            else:
+                client = BetaAnalyticsDataClient(credentials=credentials)
+            _cache[key] = client
+    
+    return client
 
 
 def get_search_console_service():
-    """Search Console 서비스 반환"""
-    credentials = get_credentials()
-    return build('searchconsole', 'v1', credentials=credentials)
+    """Search Console 서비스 반환 (패키지에 포함된 정적 discovery 문서 사용, 스레드/접속 주소별 재사용)
+    
+    config.API_ENDPOINTS['gsc']가 지정되면 인증 없이 해당 주소(가짜 서버 등)로 요청
+    """
+    endpoint = config.API_ENDPOINTS.get('gsc')
+    services = getattr(_thread_local, 'search_console_services', None)
+    if services is None:
+        services = _thread_local.search_console_services = {}
+    
+    service = services.get(endpoint)
+    if service is not None:
+        return service
+    
+    if endpoint:
+        auth_kwargs = {'http': httplib2.Http(), 'client_options': {'api_endpoint': endpoint}}
+    else:
+        auth_kwargs = {'credentials': get_credentials()}
+    
+    document = _get_search_console_discovery_document()
+    
+    if document is not None:
+        service = build_from_document(document, **auth_kwargs)
+    else:
+        # 정적 문서가 없는 구버전 라이브러리
+        service = build('searchconsole', 'v1', cache_discovery=False, **auth_kwargs)
+    
+    services[endpoint] = service
+    return service
+
+
+def _get_search_console_discovery_document():
+    """google-api-python-client에 포함된 Search Console discovery 문서 (한 번만 파싱)"""
+    with _cache_lock:
+        if 'searchconsole_discovery' not in _cache:
+            document = get_static_doc('searchconsole', 'v1')
+            _cache['searchconsole_discovery'] = json.loads(document) if document else None
+    
+    return _cache['searchconsole_discovery']
+
+
+def reset_clients():
+    """캐시된 인증 정보와 클라이언트 초기화 (설정 변경 후 사용)"""
+    global _thread_local
+    
+    with _cache_lock:
+        _cache.clear()
+        _thread_local = threading.local()
 
 
 def test_authentication():
@@ -0,0 +1,88 @@
+"""
+보고서 일괄 생성 모듈
+속성별 보고서 작성(REPORT_SETTINGS['output_formats'] 형식별)을 프로세스 풀로 나눠 CPU 코어 수만큼 병렬 처리
+"""
+
+import io
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+import report_generator
+import config
+
+
+def serialize_tables(tables):
+    """시트 이름 → DataFrame을 Parquet 바이트로 변환 (프로세스 간 전달용, dtype 유지)"""
+    payload = {}
+    for sheet_name, df in tables.items():
+        buffer = io.BytesIO()
+        df.to_parquet(buffer, index=False)
+        payload[sheet_name] = buffer.getvalue()
+    return payload
+
+
+def deserialize_tables(payload):
+    """serialize_tables 결과를 시트 이름 → DataFrame으로 복원"""
+    return {sheet_name: pd.read_parquet(io.BytesIO(data)) for sheet_name, data in payload.items()}
+
+
+def render_report(payload, filename, formats):
+    """작업 프로세스에서 보고서 하나를 형식별로 작성, ({형식: [파일 경로]}, 소요 시간) 반환
+    
+    filename의 확장자를 뺀 이름을 write_report의 base_name으로 사용
+    """
+    start = time.perf_counter()
+    
+    outputs = report_generator.write_report(
+        deserialize_tables(payload), formats=formats, base_name=os.path.splitext(filename)[0]
+    )
+    
+    return outputs, time.perf_counter() - start
+
+
+def get_render_workers(max_workers=None):
+    """보고서 생성 프로세스 수 (기본값: FANOUT_SETTINGS['render_workers'], 없으면 CPU 코어 수)"""
+    return max_workers or config.FANOUT_SETTINGS.get('render_workers') or os.cpu_count() or 1
+
+
+def render_reports(jobs, max_workers=None, formats=None):
+    """여러 보고서를 프로세스 풀에서 작성
+    
+    jobs: {이름: (시트 이름 → DataFrame, 파일 이름)}
+    formats: 출력 형식 목록 (기본값: REPORT_SETTINGS['output_formats'], 작업 프로세스는 설정 변경을 모르므로 여기서 결정)
+    반환값: {'reports': {이름: {형식: [파일 경로]}}, 'errors': {이름: 오류}, 'timings': {이름: 초}, 'total_time': 초}
+    """
+    formats = list(formats or config.REPORT_SETTINGS['output_formats'])
+    max_workers = min(get_render_workers(max_workers), max(len(jobs), 1))
+    total_start = time.perf_counter()
+    
+    reports = {}
+    errors = {}
+    timings = {}
+    
+    # 수집 스레드가 남아 있을 수 있으므로 fork 대신 spawn으로 작업 프로세스 시작
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+        futures = {
+            executor.submit(render_report, serialize_tables(tables), filename, formats): name
+            for name, (tables, filename) in jobs.items()
+        }
+        
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                reports[name], timings[name] = future.result()
+                paths = [path for output_paths in reports[name].values() for path in output_paths]
+                print(f"✓ {name}: {', '.join(paths)} ({timings[name]:.1f}초)")
+            except Exception as e:
+                errors[name] = str(e)
+                print(f"✗ {name} 보고서 생성 실패: {e}")
+    
+    return {
+        'reports': reports,
+        'errors': errors,
+        'timings': timings,
+        'total_time': time.perf_counter() - total_start
+    }
@@ -0,0 +1,4 @@
+"""
+성능 측정 모음
+합성 GA4 / Search Console 데이터로 분석/보고서 함수의 처리 시간을 규모별로 측정
+"""
@@ -0,0 +1,264 @@
+"""
+분석/보고서 함수 성능 측정 실행
+규모별 합성 데이터로 각 함수의 처리 시간을 측정하고 결과를 JSON으로 저장, 이전 결과와 비교해 느려진 항목 표시
+
+실행: python -m benchmarks.run_benchmarks --scales 1k 100k 1m 10m
+      (--compact-frames: 메모리 절약 스키마로 측정)
+"""
+
+import os
+import gc
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+from contextlib import contextmanager
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import data_analyzer
+import report_generator
+import config
+from benchmarks.synthetic_data import SCALES, generate_utm_campaign_data, generate_landing_page_data, generate_query_data
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+LATEST_FILENAME = 'latest.json'
+
+# Excel 보고서 측정에 넣는 검색 데이터 최대 행 수 (openpyxl 작성이 수 분 이상 걸리지 않도록)
+EXCEL_MAX_INPUT_ROWS = 50000
+
+# 이전 결과보다 이 배수 이상 느려지면 성능 저하로 표시
+REGRESSION_RATIO = 1.2
+
+
+def time_call(func, make_args, repeat):
+    """func(*make_args())를 repeat번 실행한 소요 시간 목록 (인자 준비 시간은 제외)"""
+    seconds = []
+    for _ in range(repeat):
+        args = make_args()
+        gc.collect()
+        
+        start = time.perf_counter()
+        func(*args)
+        seconds.append(time.perf_counter() - start)
+    
+    return seconds
+
+
+def generate_timed(results, name, generator, rows, seed):
+    """측정 입력 생성 (생성 시간을 generate_{name} 결과로 기록)"""
+    gc.collect()
+    start = time.perf_counter()
+    df = generator(rows, seed)
+    results[f"generate_{name}"] = summarize([time.perf_counter() - start], rows)
+    print(f"  generate_{name}: {results[f'generate_{name}']['median_seconds']:.4f}초")
+    return df
+
+
+def build_excel_inputs(utm_data, landing_data, gsc_data):
+    """create_excel_report 입력 생성 (분석 함수 결과)"""
+    utm_summary = data_analyzer.analyze_utm_performance(utm_data)
+    channel_summary = data_analyzer.analyze_channel_performance(utm_data)
+    landing_summary = data_analyzer.analyze_landing_page_performance(landing_data)
+    search_analysis = data_analyzer.analyze_search_performance(gsc_data)
+    performance_summary = data_analyzer.create_performance_summary(utm_data, gsc_data)
+    insights = data_analyzer.generate_insights(utm_summary, channel_summary, search_analysis)
+    
+    return utm_summary, channel_summary, landing_summary, search_analysis, performance_summary, insights
+
+
+def run_scale(scale, repeat, seed, output_dir):
+    """한 규모의 측정 결과 {벤치마크 이름: {...}}"""
+    rows = SCALES[scale]
+    results = {}
+    
+    utm_data = generate_timed(results, 'utm_campaign', generate_utm_campaign_data, rows, seed)
+    historical_utm_data = generate_utm_campaign_data(rows, seed + 1)
+    gsc_data = generate_timed(results, 'query', generate_query_data, rows, seed)
+    
+    benchmarks = {
+        'analyze_utm_performance': (
+            data_analyzer.analyze_utm_performance, lambda: (utm_data,), rows
+        ),
+        'analyze_search_performance': (
+            data_analyzer.analyze_search_performance, lambda: (gsc_data,), rows
+        ),
+        # 입력에 Z-score 컬럼을 추가하므로 매번 복사본 사용
+        'detect_performance_anomalies': (
+            data_analyzer.detect_performance_anomalies, lambda: (utm_data.copy(), historical_utm_data), rows
+        ),
+        'create_performance_summary': (
+            data_analyzer.create_performance_summary, lambda: (utm_data, gsc_data), rows
+        )
+    }
+    
+    for name, (func, make_args, input_rows) in benchmarks.items():
+        results[name] = summarize(time_call(func, make_args, repeat), input_rows)
+        print(f"  {name}: {results[name]['median_seconds']:.4f}초 ({results[name]['rows_per_second']:,.0f}행/초)")
+    
+    # 전체 규모 입력은 여기까지만 사용 (Excel 측정 중에 메모리를 차지하지 않도록 해제)
+    del benchmarks, utm_data, historical_utm_data, gsc_data
+    gc.collect()
+    
+    # Excel 보고서는 입력 크기를 제한해서 측정 (제한된 크기로만 생성)
+    excel_rows = min(rows, EXCEL_MAX_INPUT_ROWS)
+    excel_inputs = build_excel_inputs(
+        generate_utm_campaign_data(excel_rows, seed),
+        generate_landing_page_data(excel_rows, seed),
+        generate_query_data(excel_rows, seed)
+    )
+    filename = os.path.join(output_dir, f"bench_{scale}.xlsx")
+    results['create_excel_report'] = summarize(
+        time_call(lambda *args: report_generator.create_excel_report(*args, filename=filename), lambda: excel_inputs, repeat),
+        excel_rows
+    )
+    results['create_excel_report']['sheet_rows'] = sum(
+        len(df) for df in report_generator.build_report_tables(*excel_inputs).values()
+    )
+    print(f"  create_excel_report: {results['create_excel_report']['median_seconds']:.4f}초 (입력 {excel_rows:,}행)")
+    
+    return results
+
+
+def summarize(seconds, rows):
+    median = float(np.median(seconds))
+    return {
+        'rows': rows,
+        'repeat': len(seconds),
+        'min_seconds': round(min(seconds), 6),
+        'median_seconds': round(median, 6),
+        'rows_per_second': round(rows / median, 1) if median > 0 else 0
+    }
+
+
+def get_environment():
+    """측정 환경 정보 (비교 시 환경이 같은지 확인용)"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    
+    return {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'commit': commit
+    }
+
+
+def compare_results(current, previous):
+    """이전 결과 대비 중앙값 비율, REGRESSION_RATIO 이상이면 성능 저하 목록에 추가"""
+    regressions = []
+    for scale, benchmarks in current['results'].items():
+        for name, result in benchmarks.items():
+            before = previous.get('results', {}).get(scale, {}).get(name)
+            if not before or before['median_seconds'] <= 0:
+                continue
+            
+            ratio = result['median_seconds'] / before['median_seconds']
+            result['previous_median_seconds'] = before['median_seconds']
+            result['ratio'] = round(ratio, 3)
+            
+            if ratio >= REGRESSION_RATIO:
+                regressions.append(f"{scale} {name}: {before['median_seconds']:.4f}초 → {result['median_seconds']:.4f}초 ({ratio:.2f}배)")
+    
+    return regressions
+
+
+def save_results(results, results_dir=RESULTS_DIR):
+    """측정 결과를 타임스탬프 파일과 latest.json으로 저장"""
+    os.makedirs(results_dir, exist_ok=True)
+    
+    path = os.path.join(results_dir, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    for target in (path, os.path.join(results_dir, LATEST_FILENAME)):
+        with open(target, 'w', encoding='utf-8') as f:
+            f.write(text)
+    
+    return path
+
+
+def load_previous(results_dir=RESULTS_DIR):
+    path = os.path.join(results_dir, LATEST_FILENAME)
+    if not os.path.exists(path):
+        return None
+    
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+@contextmanager
+def override_setting(settings, key, value):
+    """설정값을 측정하는 동안만 바꿈 (끝나면 원래 설정으로)"""
+    previous = settings[key]
+    settings[key] = value
+    try:
+        yield
+    finally:
+        settings[key] = previous
+
+
+def metrics_disabled():
+    """측정 대상 함수의 instrumentation 기록이 시간에 섞이지 않도록 잠시 끔"""
+    return override_setting(config.METRICS_SETTINGS, 'enabled', False)
+
+
+def run_benchmarks(scales=None, repeat=3, seed=42, results_dir=RESULTS_DIR, compact_frames=None):
+    """규모별 측정 실행 후 결과 저장, 이전 결과와 비교
+    
+    compact_frames: 합성 데이터 스키마 (None이면 REPORT_SETTINGS['compact_frames'] 설정 그대로)
+    """
+    scales = scales or list(SCALES)
+    if compact_frames is None:
+        compact_frames = bool(config.REPORT_SETTINGS.get('compact_frames'))
+    
+    current = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'seed': seed,
+        'compact_frames': compact_frames,
+        'environment': get_environment(),
+        'results': {}
+    }
+    
+    with metrics_disabled(), override_setting(config.REPORT_SETTINGS, 'compact_frames', compact_frames), \
+            tempfile.TemporaryDirectory() as output_dir:
+        for scale in scales:
+            print(f"[{scale}] {SCALES[scale]:,}행")
+            current['results'][scale] = run_scale(scale, repeat, seed, output_dir)
+            gc.collect()
+    
+    # 스키마가 다른 결과끼리는 비교하지 않음
+    previous = load_previous(results_dir)
+    if previous and previous.get('compact_frames', False) != compact_frames:
+        print("⚠️ 이전 결과와 compact_frames 설정이 달라 비교를 건너뜁니다")
+        previous = None
+    regressions = compare_results(current, previous) if previous else []
+    
+    path = save_results(current, results_dir)
+    print(f"✓ 결과 저장: {path}")
+    
+    for regression in regressions:
+        print(f"⚠️ 성능 저하: {regression}")
+    
+    return current, regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='분석/보고서 함수 성능 측정')
+    parser.add_argument('--scales', nargs='+', choices=list(SCALES), help='측정할 규모 (기본값: 전체)')
+    parser.add_argument('--repeat', type=int, default=3, help='함수별 반복 횟수')
+    parser.add_argument('--seed', type=int, default=42, help='합성 데이터 시드')
+    parser.add_argument('--results-dir', default=RESULTS_DIR, help='결과 저장 위치')
+    parser.add_argument('--compact-frames', action=argparse.BooleanOptionalAction, default=None,
+                        help='메모리 절약 스키마로 측정 (기본값: REPORT_SETTINGS 설정)')
+    args = parser.parse_args()
+    
+    _, regressions = run_benchmarks(args.scales, args.repeat, args.seed, args.results_dir, args.compact_frames)
+    raise SystemExit(1 if regressions else 0)
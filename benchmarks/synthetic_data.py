@@ -0,0 +1,187 @@
+"""
+합성 GA4 / Search Console 데이터 생성
+수집 함수와 같은 컬럼/dtype의 DataFrame을 시드 고정 난수로 생성 (같은 시드 → 같은 데이터)
+
+차원은 수집 함수처럼 문자열 배열로 만들고, 마지막에 apply_schema를 거치므로
+REPORT_SETTINGS['compact_frames'] 설정에 따라 기본 스키마/메모리 절약 스키마를 모두 측정할 수 있음
+"""
+
+import numpy as np
+import pandas as pd
+from ga4_data import UTM_CAMPAIGN_COLUMNS, LANDING_PAGE_COLUMNS, DAILY_TREND_COLUMNS, METRIC_DTYPES
+from gsc_data import METRIC_COLUMNS
+from frame_schema import apply_schema
+from google.analytics.data_v1beta.types import MetricType
+
+
+# 규모 이름 → 행 수
+SCALES = {
+    '1k': 1000,
+    '100k': 100000,
+    '1m': 1000000,
+    '10m': 10000000
+}
+
+CHANNEL_GROUPS = [
+    'Organic Search', 'Paid Search', 'Direct', 'Referral', 'Organic Social',
+    'Paid Social', 'Email', 'Display', 'Affiliates', 'Unassigned'
+]
+
+MEDIUMS = ['cpc', 'organic', 'social', 'email', 'referral', 'display', 'affiliate', '(none)']
+
+SOURCES = ['google', 'naver', 'facebook', 'instagram', 'kakao', 'youtube', 'newsletter', '(direct)']
+
+# 일별 트렌드 기간 (일)
+DAILY_TREND_DAYS = 365
+
+# GA4 지표 컬럼 → 메트릭 타입 (decode_columns와 같이 METRIC_DTYPES로 dtype 결정)
+GA4_METRIC_TYPES = {
+    'Users': MetricType.TYPE_INTEGER,
+    'Sessions': MetricType.TYPE_INTEGER,
+    'Page_Views': MetricType.TYPE_INTEGER,
+    'Conversions': MetricType.TYPE_INTEGER,
+    'Engagement_Rate': MetricType.TYPE_FLOAT,
+    'Avg_Session_Duration': MetricType.TYPE_SECONDS,
+    'Bounce_Rate': MetricType.TYPE_FLOAT
+}
+
+
+def _strings(rng, prefix, cardinality, rows, unique=False):
+    """prefix0 ... prefix{n-1} 중에서 고른 문자열 컬럼 (수집 함수의 차원과 같은 object 배열), unique=True면 행마다 다른 값"""
+    pool = np.array([f"{prefix}{i}" for i in range(rows if unique else cardinality)], dtype=object)
+    return pool if unique else pool[rng.integers(0, cardinality, rows)]
+
+
+def _choice(rng, values, rows):
+    return np.array(values, dtype=object)[rng.integers(0, len(values), rows)]
+
+
+def _counts(rng, mean, rows):
+    """정수 지표 (롱테일 분포)"""
+    return np.floor(rng.pareto(1.5, rows) * mean).astype(np.int64)
+
+
+def _ga4_frame(data, columns):
+    """GA4 수집 결과와 같은 dtype으로 맞춘 DataFrame (정수 지표 int64, 나머지 지표 float64)"""
+    for column, metric_type in GA4_METRIC_TYPES.items():
+        if column in data:
+            data[column] = np.asarray(data[column]).astype(METRIC_DTYPES.get(metric_type, np.float64))
+    
+    return pd.DataFrame(data)[columns]
+
+
+def generate_utm_campaign_data(rows, seed=0):
+    """get_utm_campaign_data 형식 (캠페인 × 소스 × 매체 × 채널)"""
+    rng = np.random.default_rng(seed)
+    
+    sessions = _counts(rng, 50, rows) + 1
+    users = np.minimum(sessions, np.floor(sessions * rng.uniform(0.6, 1.0, rows)))
+    
+    df = _ga4_frame({
+        'Campaign': _strings(rng, 'campaign_', max(10, rows // 20), rows),
+        'Source': _choice(rng, SOURCES, rows),
+        'Medium': _choice(rng, MEDIUMS, rows),
+        'Channel_Group': _choice(rng, CHANNEL_GROUPS, rows),
+        'Users': users,
+        'Sessions': sessions,
+        'Page_Views': sessions * rng.integers(1, 6, rows),
+        'Engagement_Rate': rng.beta(5, 3, rows),
+        'Avg_Session_Duration': rng.gamma(2.0, 60.0, rows),
+        'Conversions': rng.binomial(sessions, 0.03)
+    }, UTM_CAMPAIGN_COLUMNS)
+    
+    return apply_schema(df.sort_values('Sessions', ascending=False, ignore_index=True))
+
+
+def generate_landing_page_data(rows, seed=0):
+    """get_landing_page_data 형식 (랜딩 페이지 × 캠페인 × 소스 × 매체)"""
+    rng = np.random.default_rng(seed)
+    
+    sessions = _counts(rng, 30, rows) + 1
+    
+    df = _ga4_frame({
+        'Landing_Page': _strings(rng, '/landing_', max(10, rows // 5), rows),
+        'Campaign': _strings(rng, 'campaign_', max(10, rows // 20), rows),
+        'Source': _choice(rng, SOURCES, rows),
+        'Medium': _choice(rng, MEDIUMS, rows),
+        'Users': np.floor(sessions * rng.uniform(0.6, 1.0, rows)),
+        'Sessions': sessions,
+        'Bounce_Rate': rng.beta(3, 5, rows),
+        'Conversions': rng.binomial(sessions, 0.03)
+    }, LANDING_PAGE_COLUMNS)
+    
+    return apply_schema(df.sort_values('Sessions', ascending=False, ignore_index=True))
+
+
+def generate_daily_trend_data(rows, seed=0):
+    """get_daily_utm_trend 형식 (날짜 × 채널, 1년치 날짜에 채널 수를 늘려 행 수를 맞춤)"""
+    rng = np.random.default_rng(seed)
+    
+    days = min(DAILY_TREND_DAYS, rows)
+    groups = -(-rows // days)
+    channels = CHANNEL_GROUPS if groups <= len(CHANNEL_GROUPS) else [f"channel_{i}" for i in range(groups)]
+    
+    dates = pd.date_range('2024-01-01', periods=days, freq='D')
+    sessions = _counts(rng, 200, rows) + 1
+    
+    df = _ga4_frame({
+        'Date': np.tile(dates.values, groups)[:rows],
+        'Channel_Group': np.repeat(np.array(channels[:groups], dtype=object), days)[:rows],
+        'Users': np.floor(sessions * rng.uniform(0.6, 1.0, rows)),
+        'Sessions': sessions,
+        'Conversions': rng.binomial(sessions, 0.03)
+    }, DAILY_TREND_COLUMNS)
+    
+    return apply_schema(df.sort_values('Date', kind='stable', ignore_index=True))
+
+
+def _search_metrics(rng, rows):
+    """Search Console 지표 컬럼 (클릭 많은 순으로 정렬, API 응답 순서와 동일)"""
+    impressions = np.sort(_counts(rng, 200, rows) + 1)[::-1]
+    position = rng.gamma(2.0, 5.0, rows) + 1
+    ctr = np.clip(0.35 / position + rng.normal(0, 0.01, rows), 0, 1)
+    clicks = rng.binomial(impressions, ctr).astype(np.int64)
+    
+    order = np.argsort(-clicks, kind='stable')
+    clicks, impressions, position = clicks[order], impressions[order], position[order]
+    
+    metrics = {
+        'Clicks': clicks,
+        'Impressions': impressions,
+        'CTR': clicks / impressions,
+        'Position': position
+    }
+    return {column: metrics[column].astype(dtype) for column, (_, dtype) in METRIC_COLUMNS.items()}
+
+
+def generate_query_data(rows, seed=0):
+    """get_search_performance_data 형식 (검색어별, 검색어는 모두 다름)"""
+    rng = np.random.default_rng(seed)
+    return apply_schema(pd.DataFrame({'Query': _strings(rng, 'query ', rows, rows, unique=True), **_search_metrics(rng, rows)}))
+
+
+def generate_page_data(rows, seed=0):
+    """get_page_performance_data 형식 (페이지별)"""
+    rng = np.random.default_rng(seed)
+    return apply_schema(pd.DataFrame({'Page': _strings(rng, 'https://example.com/page/', rows, rows, unique=True), **_search_metrics(rng, rows)}))
+
+
+def generate_query_page_data(rows, seed=0):
+    """get_query_page_performance 형식 (검색어 × 페이지)"""
+    rng = np.random.default_rng(seed)
+    return apply_schema(pd.DataFrame({
+        'Query': _strings(rng, 'query ', max(10, rows // 5), rows),
+        'Page': _strings(rng, 'https://example.com/page/', max(10, rows // 20), rows),
+        **_search_metrics(rng, rows)
+    }))
+
+
+# 데이터셋 이름 → 생성 함수 (rows, seed)
+GENERATORS = {
+    'utm_campaign': generate_utm_campaign_data,
+    'landing_page': generate_landing_page_data,
+    'daily_trend': generate_daily_trend_data,
+    'query': generate_query_data,
+    'page': generate_page_data,
+    'query_page': generate_query_page_data
+}
@@ -0,0 +1,215 @@
+"""
+GA4 / Search Console 데이터 동시 수집 모듈
+서로 독립적인 수집 함수를 제한된 스레드 풀에서 병렬 실행
+
+실행: python collector.py                   (전체 수집 테스트)
+      python collector.py --backfill search_performance --start-date 2024-01-01 --end-date 2024-06-30 --output search.parquet
+"""
+
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from functools import partial
+import pandas as pd
+from date_utils import get_date_range, split_date_range
+import ga4_data
+import gsc_data
+import config
+
+
+# 수집 이름별 수집 함수
+COLLECTORS = {
+    'utm_campaign': ga4_data.get_utm_campaign_data,
+    'landing_page': ga4_data.get_landing_page_data,
+    'daily_utm_trend': ga4_data.get_daily_utm_trend,
+    'search_performance': gsc_data.get_search_performance_data,
+    'page_performance': gsc_data.get_page_performance_data,
+    'query_page_performance': gsc_data.get_query_page_performance,
+    'daily_search_trend': gsc_data.get_daily_search_trend
+}
+
+# 완료 여부/타임아웃 확인 주기 (초)
+POLL_INTERVAL = 0.1
+
+
+def collect_all(collectors=None, max_workers=None, timeout=None):
+    """수집 함수들을 스레드 풀에서 동시에 실행
+    
+    timeout은 호출별 제한 시간(초)으로, 작업이 실제로 시작된 시점부터 계산.
+    반환값: {'data': {이름: DataFrame}, 'timings': {이름: 초}, 'errors': {이름: 오류 메시지}, 'total_time': 초}
+    """
+    result = collect_grouped({None: collectors or COLLECTORS}, max_workers=max_workers, timeout=timeout)
+    
+    return {
+        'data': result['data'].get(None, {}),
+        'timings': result['timings'].get(None, {}),
+        'errors': result['errors'].get(None, {}),
+        'total_time': result['total_time']
+    }
+
+
+def collect_grouped(groups, max_workers=None, per_group_limit=None, timeout=None):
+    """여러 그룹(예: 속성별)의 수집 함수를 하나의 제한된 스레드 풀에서 실행
+    
+    groups: {그룹 이름: {수집 이름: 함수}}
+    per_group_limit: 그룹별 동시 실행 수 상한 (자리가 날 때만 작업을 제출하므로 대기 중인 작업이 스레드를 점유하지 않음)
+    반환값: collect_all과 같은 형식이며 data/timings/errors가 {그룹 이름: {...}}으로 묶임
+    """
+    max_workers = max_workers or config.COLLECTION_SETTINGS['max_workers']
+    per_group_limit = per_group_limit or max_workers
+    timeout = timeout or config.COLLECTION_SETTINGS['call_timeout']
+    
+    started_at = {}
+    
+    def run(key, func):
+        started_at[key] = time.perf_counter()
+        result = func()
+        return result, time.perf_counter() - started_at[key]
+    
+    queues = {group: deque(collectors.items()) for group, collectors in groups.items()}
+    running = {group: 0 for group in groups}
+    
+    data = {group: {} for group in groups}
+    timings = {group: {} for group in groups}
+    errors = {group: {} for group in groups}
+    
+    total_start = time.perf_counter()
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='collector')
+    pending = {}
+    # 제한 시간을 넘겨 결과를 버린 호출 → 그룹 (스레드가 끝날 때까지 그룹 자리와 풀 자리를 계속 차지)
+    abandoned = {}
+    
+    def has_capacity():
+        return len(pending) + len(abandoned) < max_workers
+    
+    def submit_ready():
+        # 그룹을 번갈아 가며 (라운드 로빈) 그룹별 상한과 풀 크기 안에서 작업 제출
+        submitted = True
+        while submitted and has_capacity():
+            submitted = False
+            for group, queue in queues.items():
+                if queue and running[group] < per_group_limit and has_capacity():
+                    name, func = queue.popleft()
+                    pending[executor.submit(run, (group, name), func)] = (group, name)
+                    running[group] += 1
+                    submitted = True
+    
+    try:
+        submit_ready()
+        
+        while pending or any(queues.values()):
+            done, _ = wait(list(pending) + list(abandoned), timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            
+            for future in done:
+                if future in abandoned:
+                    # 시간 초과로 결과를 버린 호출이 실제로 끝났으므로 이제 자리를 반환
+                    running[abandoned.pop(future)] -= 1
+                    continue
+                
+                group, name = key = pending.pop(future)
+                running[group] -= 1
+                try:
+                    data[group][name], timings[group][name] = future.result()
+                except Exception as e:
+                    timings[group][name] = time.perf_counter() - started_at.get(key, total_start)
+                    errors[group][name] = str(e)
+                    print(f"✗ {_format_key(key)} 수집 실패: {e}")
+            
+            # 제한 시간을 넘긴 호출은 결과를 기다리지 않음
+            # 실행 중인 스레드는 멈출 수 없으므로 끝날 때까지 자리를 반환하지 않아 그룹별 동시 호출 수(할당량)를 지킴
+            now = time.perf_counter()
+            for future, key in list(pending.items()):
+                if key in started_at and now - started_at[key] > timeout:
+                    group, name = key
+                    pending.pop(future)
+                    abandoned[future] = group
+                    timings[group][name] = now - started_at[key]
+                    errors[group][name] = f"{timeout}초 제한 시간 초과"
+                    print(f"✗ {_format_key(key)} 수집 시간 초과 ({timeout}초)")
+            
+            submit_ready()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    return {
+        'data': data,
+        'timings': timings,
+        'errors': errors,
+        'total_time': time.perf_counter() - total_start
+    }
+
+
+def backfill(collect, start_date, end_date, chunk_days=None, max_workers=None, **kwargs):
+    """긴 기간을 chunk_days일 구간으로 나눠 병렬 수집한 뒤 하나의 DataFrame으로 병합
+    
+    API 호출은 rate_limiter를 거치므로 동시에 실행해도 할당량 안에서 처리됨.
+    결과에 Date 컬럼이 있으면(일별 데이터) 구간을 이어 붙이고, 없으면 구간별 집계를 키별로 다시 집계해
+    전체 기간을 한 번에 수집한 것과 같은 형식으로 반환 (warehouse.aggregate_days 규칙: Users처럼 더할 수 없는 지표는
+    구간이 하나일 때만 유지)
+    """
+    # warehouse가 이 모듈을 import하므로 함수 안에서 import
+    import warehouse
+    
+    chunk_days = chunk_days or config.BACKFILL_SETTINGS['chunk_days']
+    max_workers = max_workers or config.BACKFILL_SETTINGS['max_workers']
+    
+    chunks = split_date_range(start_date, end_date, chunk_days)
+    tasks = {chunk: partial(collect, start_date=chunk[0], end_date=chunk[1], **kwargs) for chunk in chunks}
+    
+    print(f"{start_date} ~ {end_date} 구간 {len(chunks)}개 수집 ({chunk_days}일 단위)")
+    result = collect_all(tasks, max_workers=max_workers)
+    
+    if result['errors']:
+        failed = ', '.join(f"{chunk[0]}~{chunk[1]}" for chunk in result['errors'])
+        raise RuntimeError(f"기간 수집 실패: {failed}")
+    
+    frames = [result['data'][chunk] for chunk in chunks]
+    if all('Date' in df.columns for df in frames):
+        return pd.concat(frames, ignore_index=True)
+    
+    # 구간 시작일을 Date로 두고 날짜별 행처럼 다시 집계
+    columns = list(frames[0].columns)
+    combined = pd.concat(
+        [df.assign(Date=pd.Timestamp(chunk_start)) for (chunk_start, _), df in zip(chunks, frames)],
+        ignore_index=True
+    )
+    summary = warehouse.aggregate_days(combined)
+    
+    return summary[[column for column in columns if column in summary.columns]]
+
+
+def _format_key(key):
+    group, name = key
+    return str(name) if group is None else f"{group}/{name}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='GA4 / Search Console 동시 수집 / 장기간 백필')
+    parser.add_argument('--backfill', choices=list(COLLECTORS), help='긴 기간을 구간으로 나눠 수집할 데이터')
+    parser.add_argument('--start-date', help='백필 시작일 (YYYY-MM-DD)')
+    parser.add_argument('--end-date', help='백필 종료일 (YYYY-MM-DD)')
+    parser.add_argument('--chunk-days', type=int, help='구간 길이 (기본값: BACKFILL_SETTINGS)')
+    parser.add_argument('--output', help='백필 결과 저장 경로 (.parquet 또는 .csv)')
+    args = parser.parse_args()
+    
+    if args.backfill:
+        start_date, end_date = get_date_range(args.start_date, args.end_date)
+        df = backfill(COLLECTORS[args.backfill], start_date, end_date, chunk_days=args.chunk_days)
+        print(f"{args.backfill}: {len(df):,}행")
+        
+        if args.output:
+            if args.output.endswith('.parquet'):
+                df.to_parquet(args.output, index=False)
+            else:
+                df.to_csv(args.output, index=False, encoding='utf-8')
+            print(f"✓ 저장: {args.output}")
+    else:
+        print("GA4 / Search Console 동시 수집 테스트 중...")
+        result = collect_all()
+        
+        for name, seconds in sorted(result['timings'].items(), key=lambda item: -item[1]):
+            rows = len(result['data'][name]) if name in result['data'] else '-'
+            print(f"{name}: {seconds:.2f}초, {rows} 행")
+        
+        print(f"전체 수집 시간: {result['total_time']:.2f}초 (오류 {len(result['errors'])}건)")
@@ -3,9 +3,115 @@
 # Google Analytics 4 설정
 GA4_PROPERTY_ID = 'YOUR_GA4_PROPERTY_ID'  # 예: '123456789'
 
+# GA4 Data API 설정
+GA4_SETTINGS = {
+    'page_size': 100000,  # RunReport 한 페이지당 행 수 (최대 250,000)
+}
+
 # Google Search Console 설정
 GSC_SITE_URL = 'YOUR_GSC_SITE_URL'  # 예: 'https://www.yourdomain.com/' 또는 'sc-domain:yourdomain.com'
 
+# 여러 속성/사이트 일괄 처리 (fanout.py) - 비어 있으면 위의 GA4_PROPERTY_ID / GSC_SITE_URL 하나만 사용
+PROPERTIES = [
+    # {'name': 'brand_a', 'ga4_property_id': '123456789', 'gsc_site_url': 'https://www.brand-a.com/'},
+]
+
+FANOUT_SETTINGS = {
+    'max_workers': 16,         # 모든 속성이 공유하는 수집 스레드 수
+    'per_property_limit': 2,   # 속성별 동시 API 호출 수
+    'render_workers': None,    # 보고서 생성 프로세스 수 (None: CPU 코어 수)
+}
+
+# 데이터 수집 설정 (GA4 / Search Console 동시 수집)
+COLLECTION_SETTINGS = {
+    'max_workers': 7,      # 동시에 실행할 수집 작업 수
+    'call_timeout': 120,   # 수집 함수별 제한 시간 (초)
+}
+
+# API 호출 속도 제한 / 재시도 설정
+RATE_LIMIT_SETTINGS = {
+    'max_retries': 5,                 # 할당량 초과/일시 오류 시 최대 재시도 횟수
+    'base_delay': 1.0,                # 지수 백오프 기본 대기 시간 (초)
+    'max_delay': 60.0,                # 재시도 대기 시간 상한 (초)
+    'ga4_concurrent_requests': 10,    # GA4 속성별 동시 요청 수
+    'ga4_tokens_per_hour': 40000,     # GA4 속성별 시간당 토큰 한도 (표준 속성)
+    'ga4_tokens_per_day': 200000,     # GA4 속성별 일일 토큰 한도 (표준 속성)
+    'ga4_pacing_threshold': 0.2,      # 남은 토큰이 한도의 20% 미만이면 호출 간격 조절
+    'gsc_qps': 20,                    # Search Console 사이트별 초당 요청 수
+    'gsc_burst': 20,                  # Search Console 순간 최대 요청 수
+}
+
+# 로컬 Parquet 저장소 설정
+WAREHOUSE_SETTINGS = {
+    'root_dir': 'warehouse',  # 날짜별 파티션 저장 경로
+    'sync_days': 28,          # 기본 동기화 기간 (어제까지 최근 N일)
+    'gsc_revise_days': 3,     # Search Console 최근 N일은 수정될 수 있으므로 매번 다시 수집
+}
+
+# API 응답 디스크 캐시 설정
+CACHE_SETTINGS = {
+    'enabled': True,
+    'cache_dir': '.api_cache',
+    'max_size_mb': 500,                 # 전체 캐시 용량 상한 (초과 시 오래 사용하지 않은 항목부터 삭제)
+    'recent_days': 3,                   # 종료일이 최근 N일 이내면 집계 중인 데이터로 간주
+    'closed_after_days': 10,            # 종료일이 N일 이상 지난 기간은 마감된 데이터로 간주
+    'ttl_recent_seconds': 60 * 60,      # 집계 중인 데이터: 1시간
+    'ttl_default_seconds': 24 * 60 * 60,     # 그 외: 1일
+    'ttl_closed_seconds': 30 * 24 * 60 * 60  # 마감된 데이터: 30일
+}
+
+# 장기간 수집(백필) 설정
+BACKFILL_SETTINGS = {
+    'chunk_days': 30,   # 긴 기간을 나누는 구간 길이 (일)
+    'max_workers': 8,   # 동시에 수집할 구간 수 (호출 속도는 RATE_LIMIT_SETTINGS로 제한)
+}
+
+# 이상치 탐지 엔진 설정 (감소 알림 기준은 SLACK_SETTINGS['alert_thresholds'])
+ANOMALY_SETTINGS = {
+    'baseline_weeks': 4,        # 기준선: 직전 N주의 같은 요일 값
+    'z_threshold': 3.5,         # 중앙값/MAD 기반 robust Z-score 기준
+    'min_baseline': 10,         # 기준선이 이보다 작은 시계열은 제외 (소량 트래픽 잡음)
+    'min_change_pct': 30,       # 감소 기준이 없는 지표/급증의 최소 변화율 (%)
+    'metrics': ['Sessions', 'Users', 'Conversions']
+}
+
+# 파이프라인 실행 설정 (pipeline.py)
+PIPELINE_SETTINGS = {
+    'checkpoint_dir': 'checkpoints',  # 단계별 결과 저장 위치 ({checkpoint_dir}/{run_id}/{stage}.pkl)
+    'max_workers': 4                  # 동시에 실행할 수 있는 단계 수
+}
+
+# 단계별 측정 설정 (instrumentation.py)
+METRICS_SETTINGS = {
+    'enabled': True,
+    'tracemalloc': False,       # True: 파이썬 메모리 할당 최고치 측정 (실행이 느려짐)
+    'output_dir': 'metrics',    # JSON / Prometheus 텍스트 파일 저장 위치
+    'prometheus_filename': 'utm_report.prom',  # node exporter textfile collector 디렉터리로 지정 가능
+    'latency_buckets': [0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120]  # 소요 시간 히스토그램 구간 (초)
+}
+
+# API 주소 변경 (None: 실제 Google API)
+# 로컬 부하 테스트용 가짜 서버(fake_servers.py)를 쓸 때 지정, 인증 없이 접속
+API_ENDPOINTS = {
+    'ga4': None,   # 예: 'localhost:50051' (gRPC)
+    'gsc': None    # 예: 'http://localhost:8080/'
+}
+
+# 가짜 GA4 / Search Console 서버 설정 (fake_servers.py)
+FAKE_SERVER_SETTINGS = {
+    'ga4_port': 50051,
+    'gsc_port': 8080,
+    'ga4_rows': 100000,          # 보고서 하나의 전체 행 수
+    'gsc_rows': 100000,          # 조회 하나의 전체 행 수
+    'latency_ms': 50,            # 응답 지연 (밀리초)
+    'latency_jitter_ms': 20,     # 지연에 더하는 무작위 값 최대치 (밀리초)
+    'error_rate': 0.0,           # 일시적 오류(GA4 UNAVAILABLE / HTTP 503) 비율
+    'quota_tokens': None,        # GA4 속성 / GSC 사이트별 할당량 창 안의 최대 토큰 (None: 무제한)
+    'quota_window_seconds': 60,  # 할당량 창 길이 (초)
+    'tokens_per_request': 10,    # 요청당 소모 토큰
+    'seed': 0
+}
+
 # 인증 파일 경로
 SERVICE_ACCOUNT_FILE = 'service-account-key.json'
 
@@ -13,7 +119,11 @@ SERVICE_ACCOUNT_FILE = 'service-account-key.json'
 REPORT_SETTINGS = {
     'output_filename': 'weekly_utm_report.xlsx',
     'top_queries_limit': 50,
-    'top_campaigns_limit': 20
+    'top_campaigns_limit': 20,
+    'compact_frames': False,  # True: 수집 데이터를 범주형/다운캐스트 스키마로 보관 (frame_schema.py)
+    'output_formats': ['excel'],      # 보고서 출력 형식 (excel, parquet, csv, html)
+    'csv_max_rows_per_file': 1000000,  # CSV 파일 하나의 최대 행 수 (초과 시 파일 분할)
+    'html_max_rows_per_file': 10000    # HTML 파일 하나의 최대 행 수 (초과 시 파일 분할)
 }
 
 # Slack 웹훅 설정
@@ -24,7 +134,14 @@ SLACK_SETTINGS = {
     'alert_thresholds': {
         'session_drop_pct': 30,    # 세션 30% 이상 감소 시 알림
         'conversion_drop_pct': 50,  # 전환 50% 이상 감소 시 알림
-    }
+    },
+    'timeout': 10,           # 요청 타임아웃 (초)
+    'max_retries': 5,        # 429/5xx/연결 오류 재시도 횟수
+    'send_workers': 4,       # 동시 발송 스레드 수
+    'send_queue_size': 1000,  # 발송 대기열 최대 크기 (가득 차면 추가 요청이 대기)
+    'alert_window_seconds': 60,      # 이 시간 동안 들어온 알림을 한 메시지로 묶음
+    'alert_cooldown_seconds': 3600,  # 같은 (속성, 지표, 캠페인) 알림을 다시 보내지 않는 시간 (파이프라인은 {checkpoint_dir}/alert_state.json으로 실행 간 유지)
+    'alert_max_items': 20            # 묶음 메시지에 표시할 최대 알림 수
 }
 
 # 이메일 설정 (선택사항)
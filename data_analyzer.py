@@ -6,20 +6,96 @@ UTM 성과 분석, 트렌드 비교, 이상치 탐지
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from instrumentation import instrument
 
 
+# 집계 큐브의 기본 차원 (Campaign × Source × Medium × Channel_Group)
+CUBE_DIMENSIONS = ['Campaign', 'Source', 'Medium', 'Channel_Group']
+
+# 합계로 집계하는 지표 / 행 평균으로 집계하는 지표 (평균은 합계와 개수를 저장해 상위 차원에서 다시 계산)
+SUM_METRICS = ['Users', 'Sessions', 'Page_Views', 'Conversions']
+MEAN_METRICS = ['Engagement_Rate', 'Avg_Session_Duration']
+
+
+class AggregationCube:
+    """UTM 데이터의 Campaign × Source × Medium × Channel_Group 기본 집계
+    
+    원본은 groupby 한 번으로 기본 집계를 만들고, 캠페인별/채널별/전체 요약은 기본 집계를 다시 묶어 계산
+    (평균 지표는 합계와 개수로 저장하므로 원본 행 평균과 같은 값).
+    분석 실행마다 한 번 만들어 분석 함수/알림/보고서에 넘김 (원본이 바뀌면 새로 만들어야 함)
+    """
+    
+    def __init__(self, utm_data):
+        self.dimensions = [column for column in CUBE_DIMENSIONS if column in utm_data.columns]
+        self.sum_metrics = [column for column in SUM_METRICS if column in utm_data.columns]
+        self.mean_metrics = [column for column in MEAN_METRICS if column in utm_data.columns]
+        self.base = build_base_aggregate(utm_data, self.dimensions, self.sum_metrics, self.mean_metrics)
+    
+    def __len__(self):
+        return len(self.base)
+    
+    def rollup(self, dimensions, metrics=None):
+        """지정한 차원별 집계 (dimensions는 기본 차원의 부분집합, groupby와 같은 키 순 정렬)
+        
+        metrics: 반환할 지표 컬럼 (기본값: 전체)
+        결측 차원 값이 있는 그룹은 groupby와 같이 제외
+        """
+        dimensions = list(dimensions)
+        rollup = self.base.groupby(dimensions, observed=True, sort=True)[self._value_columns()].sum().reset_index()
+        
+        for metric in self.mean_metrics:
+            count = rollup.pop(f"{metric}_Count")
+            rollup[metric] = rollup.pop(f"{metric}_Sum") / count.where(count > 0)
+        
+        if metrics is not None:
+            return rollup[dimensions + list(metrics)].copy()
+        return rollup
+    
+    def totals(self):
+        """전체 합계/평균 {지표: 값}"""
+        totals = {metric: self.base[metric].sum() for metric in self.sum_metrics}
+        for metric in self.mean_metrics:
+            count = self.base[f"{metric}_Count"].sum()
+            totals[metric] = self.base[f"{metric}_Sum"].sum() / count if count else np.nan
+        return totals
+    
+    def nunique(self, dimension):
+        """차원의 고유값 수 (결측값 제외)"""
+        return self.base[dimension].nunique()
+    
+    def _value_columns(self):
+        return self.sum_metrics + [
+            f"{metric}_{part}" for metric in self.mean_metrics for part in ('Sum', 'Count')
+        ]
+
+
+@instrument('analyze')
+def build_base_aggregate(utm_data, dimensions, sum_metrics, mean_metrics):
+    """기본 차원 조합별 합계 + 평균 지표의 합계/개수 DataFrame
+    
+    결측 차원 값도 별도 그룹으로 유지해 전체 합계를 보존 (dropna=False)
+    """
+    aggregations = {metric: (metric, 'sum') for metric in sum_metrics}
+    for metric in mean_metrics:
+        aggregations[f"{metric}_Sum"] = (metric, 'sum')
+        aggregations[f"{metric}_Count"] = (metric, 'count')
+    
+    return utm_data.groupby(dimensions, observed=True, dropna=False, sort=False).agg(**aggregations).reset_index()
+
+
+def as_cube(utm_data):
+    """분석 함수 입력을 집계 큐브로 (큐브는 그대로, DataFrame은 새로 집계)"""
+    if isinstance(utm_data, AggregationCube):
+        return utm_data
+    return AggregationCube(utm_data)
+
+
+@instrument('analyze')
 def analyze_utm_performance(utm_data):
-    """UTM 캠페인 성과 분석"""
+    """UTM 캠페인 성과 분석 (utm_data: DataFrame 또는 AggregationCube)"""
     
     # 1. 캠페인별 성과 요약
-    campaign_summary = utm_data.groupby(['Campaign', 'Source', 'Medium']).agg({
-        'Users': 'sum',
-        'Sessions': 'sum', 
-        'Page_Views': 'sum',
-        'Conversions': 'sum',
-        'Engagement_Rate': 'mean',
-        'Avg_Session_Duration': 'mean'
-    }).reset_index()
+    campaign_summary = as_cube(utm_data).rollup(['Campaign', 'Source', 'Medium'])
     
     # 성과 지표 계산
     campaign_summary['Conversion_Rate'] = (
@@ -36,15 +112,13 @@ def analyze_utm_performance(utm_data):
     return campaign_summary
 
 
+@instrument('analyze')
 def analyze_channel_performance(utm_data):
-    """채널별 성과 분석"""
+    """채널별 성과 분석 (utm_data: DataFrame 또는 AggregationCube)"""
     
-    channel_summary = utm_data.groupby('Channel_Group').agg({
-        'Users': 'sum',
-        'Sessions': 'sum',
-        'Conversions': 'sum',
-        'Engagement_Rate': 'mean'
-    }).reset_index()
+    channel_summary = as_cube(utm_data).rollup(
+        ['Channel_Group'], ['Users', 'Sessions', 'Conversions', 'Engagement_Rate']
+    )
     
     # 채널별 점유율 계산
     total_sessions = channel_summary['Sessions'].sum()
@@ -59,10 +133,11 @@ def analyze_channel_performance(utm_data):
     return channel_summary.sort_values('Sessions', ascending=False)
 
 
+@instrument('analyze')
 def analyze_landing_page_performance(landing_data):
     """랜딩 페이지 성과 분석"""
     
-    page_summary = landing_data.groupby('Landing_Page').agg({
+    page_summary = landing_data.groupby('Landing_Page', observed=True).agg({
         'Users': 'sum',
         'Sessions': 'sum',
         'Conversions': 'sum',
@@ -79,6 +154,7 @@ def analyze_landing_page_performance(landing_data):
     return page_summary
 
 
+@instrument('analyze')
 def analyze_search_performance(gsc_data):
     """검색 성과 분석"""
     
@@ -106,6 +182,7 @@ def analyze_search_performance(gsc_data):
     }
 
 
+@instrument('analyze')
 def detect_performance_anomalies(current_data, historical_data=None):
     """성과 이상치 탐지 (급증/급감)"""
     
@@ -152,6 +229,7 @@ def detect_performance_anomalies(current_data, historical_data=None):
     return anomalies
 
 
+@instrument('analyze')
 def generate_insights(utm_summary, channel_summary, search_analysis):
     """데이터 기반 인사이트 생성"""
     
@@ -197,23 +275,26 @@ def generate_insights(utm_summary, channel_summary, search_analysis):
     return insights
 
 
+@instrument('analyze')
 def create_performance_summary(utm_data, gsc_data):
-    """전체 성과 요약 생성"""
+    """전체 성과 요약 생성 (utm_data: DataFrame 또는 AggregationCube)"""
     
     # 기본 통계
-    total_sessions = utm_data['Sessions'].sum()
-    total_users = utm_data['Users'].sum()
-    total_conversions = utm_data['Conversions'].sum()
+    utm_cube = as_cube(utm_data)
+    utm_totals = utm_cube.totals()
+    total_sessions = utm_totals['Sessions']
+    total_users = utm_totals['Users']
+    total_conversions = utm_totals['Conversions']
     total_clicks = gsc_data['Clicks'].sum()
     total_impressions = gsc_data['Impressions'].sum()
     
     # 평균 지표
-    avg_engagement_rate = utm_data['Engagement_Rate'].mean()
+    avg_engagement_rate = utm_totals['Engagement_Rate']
     avg_ctr = gsc_data['CTR'].mean()
     avg_position = gsc_data['Position'].mean()
     
     # 캠페인/키워드 수
-    unique_campaigns = utm_data['Campaign'].nunique()
+    unique_campaigns = utm_cube.nunique('Campaign')
     unique_keywords = len(gsc_data)
     
     summary = {
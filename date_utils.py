@@ -0,0 +1,97 @@
+"""
+수집 기간 계산 공통 함수
+GA4 / Search Console 모듈이 함께 사용하는 날짜 범위 처리
+"""
+
+from datetime import datetime, timedelta
+
+
+DATE_FORMAT = '%Y-%m-%d'
+
+
+def get_last_week_range():
+    """지난주 월요일부터 일요일까지의 날짜 범위 반환"""
+    today = datetime.now()
+    days_since_monday = today.weekday()
+    start_of_last_week = today - timedelta(days=days_since_monday + 7)
+    end_of_last_week = start_of_last_week + timedelta(days=6)
+    
+    return start_of_last_week.strftime(DATE_FORMAT), end_of_last_week.strftime(DATE_FORMAT)
+
+
+def get_date_range(start_date=None, end_date=None):
+    """수집 기간 반환 (start_date/end_date를 모두 지정하지 않으면 지난주 월~일)
+    
+    하나만 지정하면 다른 기간을 조용히 조회하지 않도록 ValueError
+    """
+    if start_date and end_date:
+        validate_date_range(start_date, end_date)
+        return start_date, end_date
+    
+    if start_date or end_date:
+        raise ValueError(f"시작일과 종료일을 함께 지정해야 합니다 (시작일: {start_date}, 종료일: {end_date})")
+    
+    return get_last_week_range()
+
+
+def get_previous_period(start_date, end_date):
+    """같은 길이의 직전 기간 반환 (예: 지난주 → 그 전주)"""
+    start = datetime.strptime(start_date, DATE_FORMAT)
+    end = datetime.strptime(end_date, DATE_FORMAT)
+    length = end - start + timedelta(days=1)
+    
+    return (start - length).strftime(DATE_FORMAT), (end - length).strftime(DATE_FORMAT)
+
+
+def get_baseline_start(start_date, weeks):
+    """기준선 이력을 포함한 시작일 반환 (start_date보다 weeks주 앞)"""
+    start = datetime.strptime(start_date, DATE_FORMAT)
+    return (start - timedelta(weeks=weeks)).strftime(DATE_FORMAT)
+
+
+def validate_date_range(start_date, end_date):
+    """날짜 형식(YYYY-MM-DD)과 순서 확인"""
+    start = datetime.strptime(start_date, DATE_FORMAT)
+    end = datetime.strptime(end_date, DATE_FORMAT)
+    
+    if start > end:
+        raise ValueError(f"시작일({start_date})이 종료일({end_date})보다 늦습니다")
+
+
+def iter_days(start_date, end_date):
+    """시작일부터 종료일까지의 날짜 문자열 (YYYY-MM-DD) 반환"""
+    day = datetime.strptime(start_date, DATE_FORMAT)
+    end = datetime.strptime(end_date, DATE_FORMAT)
+    
+    while day <= end:
+        yield day.strftime(DATE_FORMAT)
+        day += timedelta(days=1)
+
+
+def split_date_range(start_date, end_date, chunk_days):
+    """긴 기간을 chunk_days일 단위 구간 목록 [(시작일, 종료일), ...]으로 분할"""
+    validate_date_range(start_date, end_date)
+    
+    chunks = []
+    chunk_start = datetime.strptime(start_date, DATE_FORMAT)
+    end = datetime.strptime(end_date, DATE_FORMAT)
+    
+    while chunk_start <= end:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end)
+        chunks.append((chunk_start.strftime(DATE_FORMAT), chunk_end.strftime(DATE_FORMAT)))
+        chunk_start = chunk_end + timedelta(days=1)
+    
+    return chunks
+
+
+def group_consecutive_days(days):
+    """날짜 목록을 연속 구간 [(시작일, 종료일), ...]으로 묶음"""
+    ranges = []
+    for day in sorted(days):
+        current = datetime.strptime(day, DATE_FORMAT)
+        if ranges and datetime.strptime(ranges[-1][1], DATE_FORMAT) + timedelta(days=1) == current:
+            ranges[-1] = (ranges[-1][0], day)
+        else:
+            ranges.append((day, day))
+    
+    return ranges
@@ -0,0 +1,425 @@
+"""
+로컬 부하 테스트용 가짜 GA4 Data API(gRPC) / Search Console(HTTP) 서버
+실제 API와 같은 요청/응답 형식으로 합성 데이터를 페이지 단위로 반환하고, 지연/오류/할당량 초과를 흉내냄
+
+실행: python fake_servers.py            (서버만 실행, config.API_ENDPOINTS에 표시된 주소 지정)
+      python fake_servers.py --load-test (서버를 띄우고 collector.collect_all로 수집 부하 측정)
+"""
+
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from concurrent import futures
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import unquote
+import grpc
+import numpy as np
+from google.analytics.data_v1beta.types import (
+    BatchRunReportsRequest, BatchRunReportsResponse, MetricType, RunReportRequest, RunReportResponse
+)
+import config
+
+
+GA4_SERVICE = 'google.analytics.data.v1beta.BetaAnalyticsData'
+
+# GA4 limit을 지정하지 않은 요청의 기본 행 수 (실제 API와 동일)
+GA4_DEFAULT_LIMIT = 10000
+
+# 정수형으로 응답하는 GA4 지표 (나머지는 실수)
+GA4_INTEGER_METRICS = {'activeUsers', 'sessions', 'screenPageViews', 'conversions', 'totalUsers', 'newUsers'}
+
+# Search Console rowLimit 기본값 / 최대값
+GSC_DEFAULT_ROW_LIMIT = 1000
+GSC_MAX_ROW_LIMIT = 25000
+
+GSC_QUERY_PATH = re.compile(r'^/webmasters/v3/sites/(?P<site>[^/]+)/searchAnalytics/query$')
+
+
+def hash_rows(start, stop, seed):
+    """행 번호별 의사 난수 (같은 행은 항상 같은 값이라 페이지를 나눠 받아도 결과가 일정)"""
+    index = np.arange(start, stop, dtype=np.uint64)
+    return (index * np.uint64(2654435761) + np.uint64(seed * 97 + 1)) % np.uint64(2 ** 32)
+
+
+def get_days(start_date, end_date):
+    """기간의 날짜 목록 (datetime)"""
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    end = datetime.strptime(end_date, '%Y-%m-%d')
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)] or [start]
+
+
+class FakeBehavior:
+    """지연, 일시적 오류, 대상(속성/사이트)별 할당량을 관리하고 요청 통계를 기록"""
+    
+    def __init__(self, settings):
+        self.settings = settings
+        self.lock = threading.Lock()
+        self.consumed = {}        # 대상 → (창 시작 시각, 소모 토큰)
+        self.stats = {'requests': 0, 'rows': 0, 'errors': 0, 'quota_exceeded': 0}
+    
+    def delay(self):
+        settings = self.settings
+        time.sleep((settings['latency_ms'] + random.uniform(0, settings['latency_jitter_ms'])) / 1000)
+    
+    def should_fail(self):
+        return random.random() < self.settings['error_rate']
+    
+    def consume(self, target):
+        """토큰 소모, 창 안에서 남은 토큰 반환 (할당량 없음: None, 초과: -1)"""
+        settings = self.settings
+        limit = settings['quota_tokens']
+        if limit is None:
+            return None
+        
+        with self.lock:
+            now = time.monotonic()
+            window_start, used = self.consumed.get(target, (now, 0))
+            if now - window_start >= settings['quota_window_seconds']:
+                window_start, used = now, 0
+            
+            if used + settings['tokens_per_request'] > limit:
+                return -1
+            
+            used += settings['tokens_per_request']
+            self.consumed[target] = (window_start, used)
+            return limit - used
+    
+    def count(self, key, value=1):
+        with self.lock:
+            self.stats[key] += value
+    
+    def snapshot(self):
+        with self.lock:
+            return dict(self.stats)
+
+
+class FakeGa4Servicer:
+    """BetaAnalyticsData.RunReport / BatchRunReports 가짜 구현"""
+    
+    def __init__(self, behavior):
+        self.behavior = behavior
+        self.settings = behavior.settings
+    
+    def run_report(self, request, context):
+        self.behavior.count('requests')
+        self.behavior.delay()
+        
+        response = self._build_response(request, context)
+        return RunReportResponse.pb(response).SerializeToString()
+    
+    def batch_run_reports(self, request, context):
+        self.behavior.count('requests')
+        self.behavior.delay()
+        
+        batch = BatchRunReportsResponse.pb()()
+        for report_request in request.requests:
+            report_request.property = report_request.property or request.property
+            batch.reports.add().CopyFrom(RunReportResponse.pb(self._build_response(report_request, context)))
+        
+        return batch.SerializeToString()
+    
+    def _build_response(self, request, context):
+        behavior = self.behavior
+        
+        if behavior.should_fail():
+            behavior.count('errors')
+            context.abort(grpc.StatusCode.UNAVAILABLE, 'fake server: temporarily unavailable')
+        
+        remaining = behavior.consume(request.property)
+        if remaining == -1:
+            behavior.count('quota_exceeded')
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, 'fake server: exhausted property tokens')
+        
+        total = self.settings['ga4_rows']
+        offset = request.offset
+        limit = request.limit or GA4_DEFAULT_LIMIT
+        stop = min(offset + limit, total)
+        
+        dimensions = [dimension.name for dimension in request.dimensions]
+        if len(request.date_ranges) > 1:
+            dimensions.append('dateRange')
+        metrics = [metric.name for metric in request.metrics]
+        
+        response = RunReportResponse()
+        response_pb = RunReportResponse.pb(response)
+        response_pb.row_count = total
+        for name in dimensions:
+            response_pb.dimension_headers.add(name=name)
+        for name in metrics:
+            metric_type = MetricType.TYPE_INTEGER if name in GA4_INTEGER_METRICS else MetricType.TYPE_FLOAT
+            response_pb.metric_headers.add(name=name, type_=metric_type)
+        
+        if stop > offset:
+            columns = self._build_columns(request, dimensions, metrics, offset, stop)
+            for values in zip(*columns):
+                row = response_pb.rows.add()
+                for value in values[:len(dimensions)]:
+                    row.dimension_values.add(value=value)
+                for value in values[len(dimensions):]:
+                    row.metric_values.add(value=value)
+            behavior.count('rows', stop - offset)
+        
+        if request.return_property_quota and remaining is not None:
+            quota = response_pb.property_quota
+            for status in (quota.tokens_per_hour, quota.tokens_per_day):
+                status.consumed = self.settings['tokens_per_request']
+                status.remaining = remaining
+        
+        return response
+    
+    def _build_columns(self, request, dimensions, metrics, offset, stop):
+        """행 [offset, stop)의 차원/지표 값 (문자열 열 목록)"""
+        hashes = hash_rows(offset, stop, self.settings['seed'])
+        index = np.arange(offset, stop)
+        
+        columns = []
+        for position, name in enumerate(dimensions):
+            if name == 'date':
+                date_range = request.date_ranges[0]
+                days = [day.strftime('%Y%m%d') for day in get_days(date_range.start_date, date_range.end_date)]
+                columns.append([days[i % len(days)] for i in index.tolist()])
+            elif name == 'dateRange':
+                names = [date_range.name or f"date_range_{i}" for i, date_range in enumerate(request.date_ranges)]
+                columns.append([names[i % len(names)] for i in index.tolist()])
+            elif position == 0:
+                columns.append([f"{name}_{i}" for i in index.tolist()])
+            else:
+                columns.append([f"{name}_{h % 50}" for h in (hashes >> np.uint64(position * 5)).tolist()])
+        
+        for position, name in enumerate(metrics):
+            shifted = (hashes >> np.uint64(position * 3)).tolist()
+            if name in GA4_INTEGER_METRICS:
+                columns.append([str(h % 1000 + 1) for h in shifted])
+            else:
+                columns.append([str((h % 10000) / 10000) for h in shifted])
+        
+        return columns
+
+
+def start_ga4_server(behavior, port):
+    """가짜 GA4 gRPC 서버 시작 (BetaAnalyticsData 서비스의 RunReport / BatchRunReports만 구현)"""
+    servicer = FakeGa4Servicer(behavior)
+    
+    # 응답은 직렬화된 바이트로 반환하므로 serializer는 그대로 통과
+    handler = grpc.method_handlers_generic_handler(GA4_SERVICE, {
+        'RunReport': grpc.unary_unary_rpc_method_handler(
+            servicer.run_report,
+            request_deserializer=RunReportRequest.deserialize,
+            response_serializer=lambda data: data
+        ),
+        'BatchRunReports': grpc.unary_unary_rpc_method_handler(
+            servicer.batch_run_reports,
+            request_deserializer=BatchRunReportsRequest.deserialize,
+            response_serializer=lambda data: data
+        )
+    })
+    
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=32))
+    server.add_generic_rpc_handlers((handler,))
+    port = server.add_insecure_port(f'127.0.0.1:{port}')
+    server.start()
+    
+    return server, port
+
+
+class FakeGscHandler(BaseHTTPRequestHandler):
+    """searchAnalytics.query 가짜 구현 (POST /webmasters/v3/sites/{siteUrl}/searchAnalytics/query)"""
+    
+    behavior = None
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def do_POST(self):
+        behavior = self.behavior
+        behavior.count('requests')
+        
+        match = GSC_QUERY_PATH.match(self.path.split('?')[0])
+        if match is None:
+            return self._send_error(404, 'NOT_FOUND', f'unknown path: {self.path}')
+        
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length) or b'{}')
+        
+        behavior.delay()
+        
+        if behavior.should_fail():
+            behavior.count('errors')
+            return self._send_error(503, 'UNAVAILABLE', 'fake server: backend error')
+        
+        if behavior.consume(unquote(match.group('site'))) == -1:
+            behavior.count('quota_exceeded')
+            return self._send_error(429, 'RESOURCE_EXHAUSTED', 'fake server: quota exceeded')
+        
+        rows = self._build_rows(body)
+        behavior.count('rows', len(rows))
+        
+        response = {'responseAggregationType': 'byProperty'}
+        if rows:
+            response['rows'] = rows
+        self._send_json(200, response)
+    
+    def _build_rows(self, body):
+        settings = self.behavior.settings
+        total = settings['gsc_rows']
+        start = int(body.get('startRow', 0))
+        limit = min(int(body.get('rowLimit', GSC_DEFAULT_ROW_LIMIT)), GSC_MAX_ROW_LIMIT)
+        stop = min(start + limit, total)
+        if stop <= start:
+            return []
+        
+        dimensions = body.get('dimensions', [])
+        days = get_days(body['startDate'], body['endDate']) if 'startDate' in body else []
+        
+        rows = []
+        for i, h in zip(range(start, stop), hash_rows(start, stop, settings['seed']).tolist()):
+            impressions = h % 5000 + 1
+            clicks = impressions * ((h >> 8) % 30) // 100
+            
+            keys = []
+            for dimension in dimensions:
+                if dimension == 'date':
+                    keys.append(days[i % len(days)].strftime('%Y-%m-%d'))
+                elif dimension == 'query':
+                    keys.append(f"query {i}")
+                elif dimension == 'page':
+                    keys.append(f"https://example.com/page/{(h >> 4) % 5000}")
+                else:
+                    keys.append(f"{dimension}_{(h >> 12) % 20}")
+            
+            rows.append({
+                'keys': keys,
+                'clicks': clicks,
+                'impressions': impressions,
+                'ctr': clicks / impressions,
+                'position': 1 + ((h >> 16) % 500) / 10
+            })
+        
+        return rows
+    
+    def _send_error(self, code, status, message):
+        self._send_json(code, {'error': {'code': code, 'message': message, 'status': status}})
+    
+    def _send_json(self, code, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_gsc_server(behavior, port):
+    """가짜 Search Console HTTP 서버 시작"""
+    handler = type('BoundFakeGscHandler', (FakeGscHandler,), {'behavior': behavior})
+    
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    
+    return server, server.server_port
+
+
+class FakeServers:
+    """가짜 GA4 / Search Console 서버 한 쌍 (port=0이면 빈 포트 자동 선택)
+    
+    with FakeServers(error_rate=0.05) as servers:
+        servers.configure_endpoints()   # config.API_ENDPOINTS를 가짜 서버로 지정
+    """
+    
+    def __init__(self, **overrides):
+        self.settings = {**config.FAKE_SERVER_SETTINGS, **overrides}
+        self.ga4_behavior = FakeBehavior(self.settings)
+        self.gsc_behavior = FakeBehavior(self.settings)
+        
+        self.ga4_server, self.ga4_port = start_ga4_server(self.ga4_behavior, self.settings['ga4_port'])
+        self.gsc_server, self.gsc_port = start_gsc_server(self.gsc_behavior, self.settings['gsc_port'])
+    
+    @property
+    def endpoints(self):
+        return {
+            'ga4': f'127.0.0.1:{self.ga4_port}',
+            'gsc': f'http://127.0.0.1:{self.gsc_port}/'
+        }
+    
+    def configure_endpoints(self):
+        """config.API_ENDPOINTS를 이 서버들로 지정하고 캐시된 클라이언트 초기화"""
+        import auth
+        
+        config.API_ENDPOINTS.update(self.endpoints)
+        auth.reset_clients()
+    
+    def stats(self):
+        return {'ga4': self.ga4_behavior.snapshot(), 'gsc': self.gsc_behavior.snapshot()}
+    
+    def stop(self):
+        self.ga4_server.stop(grace=None)
+        self.gsc_server.shutdown()
+        self.gsc_server.server_close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def run_load_test(servers, max_workers=None):
+    """가짜 서버를 대상으로 전체 수집을 실행하고 수집 시간과 서버 통계 출력"""
+    import collector
+    
+    servers.configure_endpoints()
+    result = collector.collect_all(max_workers=max_workers)
+    
+    print(f"\n수집 완료: {result['total_time']:.2f}초, 실패 {len(result['errors'])}개")
+    for name, seconds in sorted(result['timings'].items(), key=lambda item: -item[1]):
+        rows = len(result['data'][name]) if name in result['data'] else 0
+        print(f"  {name}: {seconds:.2f}초, {rows:,}행")
+    for name, error in result['errors'].items():
+        print(f"  ✗ {name}: {error}")
+    
+    for api, stats in servers.stats().items():
+        print(f"{api} 서버: {stats}")
+    
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='가짜 GA4 / Search Console 서버')
+    parser.add_argument('--ga4-port', type=int, help='GA4 gRPC 포트')
+    parser.add_argument('--gsc-port', type=int, help='Search Console HTTP 포트')
+    parser.add_argument('--latency-ms', type=float, help='응답 지연 (밀리초)')
+    parser.add_argument('--error-rate', type=float, help='일시적 오류 비율 (0~1)')
+    parser.add_argument('--quota-tokens', type=int, help='할당량 창 안의 대상별 최대 토큰')
+    parser.add_argument('--ga4-rows', type=int, help='GA4 보고서 전체 행 수')
+    parser.add_argument('--gsc-rows', type=int, help='Search Console 조회 전체 행 수')
+    parser.add_argument('--load-test', action='store_true', help='서버를 띄운 뒤 전체 수집을 실행하고 종료')
+    args = parser.parse_args()
+    
+    overrides = {
+        key: value for key, value in {
+            'ga4_port': args.ga4_port,
+            'gsc_port': args.gsc_port,
+            'latency_ms': args.latency_ms,
+            'error_rate': args.error_rate,
+            'quota_tokens': args.quota_tokens,
+            'ga4_rows': args.ga4_rows,
+            'gsc_rows': args.gsc_rows
+        }.items() if value is not None
+    }
+    
+    with FakeServers(**overrides) as servers:
+        if args.load_test:
+            config.CACHE_SETTINGS['enabled'] = False
+            run_load_test(servers)
+        else:
+            print(f"✓ 가짜 서버 실행 중: config.API_ENDPOINTS = {servers.endpoints}")
+            try:
+                while True:
+                    time.sleep(1)
+            except KeyboardInterrupt:
+                print(f"\n서버 통계: {servers.stats()}")
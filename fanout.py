@@ -0,0 +1,137 @@
+"""
+여러 GA4 속성 / Search Console 사이트 일괄 처리 모듈
+모든 속성을 하나의 제한된 스레드 풀에서 수집한 뒤 속성별 분석/보고서 생성
+"""
+
+import time
+from functools import partial
+import ga4_data
+import gsc_data
+import collector
+import data_analyzer
+import report_generator
+import batch_render
+import config
+
+
+def get_properties():
+    """처리할 속성/사이트 목록 반환 (config.PROPERTIES가 비어 있으면 기본 속성 하나)"""
+    if config.PROPERTIES:
+        return config.PROPERTIES
+    
+    return [{
+        'name': 'default',
+        'ga4_property_id': config.GA4_PROPERTY_ID,
+        'gsc_site_url': config.GSC_SITE_URL
+    }]
+
+
+def build_property_collectors(prop):
+    """속성 하나의 보고서에 필요한 수집 함수 목록 (GA4 보고서는 batch_run_reports 한 번으로 수집)"""
+    return {
+        'ga4': partial(ga4_data.get_weekly_report_data, property_id=prop['ga4_property_id']),
+        'search_performance': partial(gsc_data.get_search_performance_data, site_url=prop['gsc_site_url'])
+    }
+
+
+def flatten_collected(data):
+    """수집 결과 {'ga4': {보고서: ...}, 'search_performance': ...}를 수집 이름 → 결과 하나로 펼침"""
+    data = dict(data)
+    data.update(data.pop('ga4'))
+    return data
+
+
+def analyze_property(data):
+    """수집 데이터를 기존 분석 함수로 처리하여 보고서 입력 생성
+    
+    data['utm_campaign']은 (현재 기간, 직전 기간) - 직전 기간은 이상치 탐지의 비교 데이터로 사용
+    """
+    utm_data, previous_utm_data = data['utm_campaign']
+    
+    # 캠페인/채널/전체 요약과 알림 요약은 한 번 계산한 기본 집계에서 파생
+    utm_cube = data_analyzer.AggregationCube(utm_data)
+    utm_summary = data_analyzer.analyze_utm_performance(utm_cube)
+    channel_summary = data_analyzer.analyze_channel_performance(utm_cube)
+    landing_summary = data_analyzer.analyze_landing_page_performance(data['landing_page'])
+    search_analysis = data_analyzer.analyze_search_performance(data['search_performance'])
+    performance_summary = data_analyzer.create_performance_summary(
+        utm_cube, data['search_performance']
+    )
+    insights = data_analyzer.generate_insights(utm_summary, channel_summary, search_analysis)
+    anomalies = data_analyzer.detect_performance_anomalies(utm_data.copy(), previous_utm_data)
+    
+    return {
+        'utm_cube': utm_cube,
+        'utm_summary': utm_summary,
+        'channel_summary': channel_summary,
+        'landing_summary': landing_summary,
+        'search_analysis': search_analysis,
+        'performance_summary': performance_summary,
+        'insights': insights,
+        'anomalies': anomalies
+    }
+
+
+def build_property_tables(data):
+    """속성 하나의 분석 결과를 보고서 시트 이름 → DataFrame으로 변환"""
+    analysis = analyze_property(data)
+    
+    return report_generator.build_report_tables(
+        analysis['utm_summary'],
+        analysis['channel_summary'],
+        analysis['landing_summary'],
+        analysis['search_analysis'],
+        analysis['performance_summary'],
+        analysis['insights']
+    )
+
+
+def run_fanout(properties=None, max_workers=None, per_property_limit=None, render_workers=None):
+    """모든 속성을 수집하고 속성별 보고서 생성
+    
+    분석은 이 프로세스에서, 보고서 작성(CPU 사용이 큰 openpyxl 작업 등)은 프로세스 풀에서 병렬 처리
+    반환값: {'reports': {속성 이름: {형식: [파일 경로]}}, 'errors': {속성 이름: 오류},
+             'timings': {속성 이름: {수집 이름: 초}}, 'render_timings': {속성 이름: 초}, 'total_time': 초}
+    """
+    properties = properties or get_properties()
+    max_workers = max_workers or config.FANOUT_SETTINGS['max_workers']
+    per_property_limit = per_property_limit or config.FANOUT_SETTINGS['per_property_limit']
+    
+    total_start = time.perf_counter()
+    groups = {prop['name']: build_property_collectors(prop) for prop in properties}
+    
+    print(f"속성 {len(groups)}개 수집 시작 (스레드 {max_workers}개, 속성별 {per_property_limit}개)")
+    result = collector.collect_grouped(groups, max_workers=max_workers, per_group_limit=per_property_limit)
+    
+    jobs = {}
+    errors = {}
+    for name in groups:
+        if result['errors'][name]:
+            errors[name] = result['errors'][name]
+            continue
+        
+        try:
+            data = flatten_collected(result['data'][name])
+            jobs[name] = (build_property_tables(data), report_generator.get_report_filename(name))
+        except Exception as e:
+            errors[name] = str(e)
+            print(f"✗ {name} 분석 실패: {e}")
+    
+    rendered = {'reports': {}, 'errors': {}, 'timings': {}}
+    if jobs:
+        print(f"보고서 {len(jobs)}개 생성 시작 (프로세스 {batch_render.get_render_workers(render_workers)}개)")
+        rendered = batch_render.render_reports(jobs, max_workers=render_workers)
+    errors.update(rendered['errors'])
+    
+    return {
+        'reports': rendered['reports'],
+        'errors': errors,
+        'timings': result['timings'],
+        'render_timings': rendered['timings'],
+        'total_time': time.perf_counter() - total_start
+    }
+
+
+if __name__ == "__main__":
+    result = run_fanout()
+    print(f"완료: 보고서 {len(result['reports'])}개, 실패 {len(result['errors'])}개, {result['total_time']:.1f}초")
@@ -0,0 +1,83 @@
+"""
+수집 데이터 메모리 절약 스키마
+차원은 범주형, 정수 지표는 다운캐스트 (비율 지표는 평균이 달라지지 않도록 float64 유지)
+"""
+
+import numpy as np
+import pandas as pd
+import config
+
+
+# 범주형(사전 인코딩)으로 변환할 차원 컬럼
+DIMENSION_COLUMNS = [
+    'Campaign', 'Source', 'Medium', 'Channel_Group', 'Landing_Page',
+    'Query', 'Page', 'Country', 'Device'
+]
+
+
+def to_compact(df):
+    """DataFrame을 메모리 절약 스키마로 변환
+    
+    정수 지표의 합계는 pandas가 넘치지 않는 정수형으로 계산하므로 다운캐스트해도 집계 결과는 동일
+    실수 지표(참여율, 평균 세션 시간, CTR, 순위)는 float32로 줄이면 평균이 달라지므로 float64 유지
+    """
+    df = df.copy()
+    
+    for column in df.columns:
+        series = df[column]
+        
+        if column in DIMENSION_COLUMNS:
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                df[column] = series.astype('category')
+        elif pd.api.types.is_integer_dtype(series.dtype):
+            df[column] = pd.to_numeric(series, downcast='integer')
+    
+    return df
+
+
+def apply_schema(df):
+    """설정(REPORT_SETTINGS['compact_frames'])이 켜져 있으면 메모리 절약 스키마 적용"""
+    if config.REPORT_SETTINGS.get('compact_frames'):
+        return to_compact(df)
+    return df
+
+
+def memory_report(frames):
+    """DataFrame별 메모리 사용량 보고서
+    
+    frames: {이름: DataFrame}
+    반환값: 이름, 행 수, 메모리(MB), 행당 바이트, 컬럼별 dtype을 담은 DataFrame
+    """
+    rows = []
+    for name, df in frames.items():
+        memory_bytes = int(df.memory_usage(deep=True).sum())
+        rows.append({
+            'Frame': name,
+            'Rows': len(df),
+            'Memory_MB': round(memory_bytes / 1024 / 1024, 3),
+            'Bytes_Per_Row': round(memory_bytes / len(df), 1) if len(df) > 0 else 0,
+            'Dtypes': ', '.join(f"{column}:{dtype}" for column, dtype in df.dtypes.items())
+        })
+    
+    return pd.DataFrame(rows, columns=['Frame', 'Rows', 'Memory_MB', 'Bytes_Per_Row', 'Dtypes'])
+
+
+if __name__ == "__main__":
+    print("메모리 절약 스키마 테스트...")
+    
+    # 테스트용 더미 데이터
+    size = 100000
+    test_utm_data = pd.DataFrame({
+        'Campaign': np.random.choice(['summer_sale', 'brand_awareness', 'retargeting'], size),
+        'Source': np.random.choice(['google', 'facebook', 'naver'], size),
+        'Medium': np.random.choice(['cpc', 'social', 'email'], size),
+        'Channel_Group': np.random.choice(['Paid Search', 'Social', 'Email'], size),
+        'Users': np.random.randint(0, 1000, size),
+        'Sessions': np.random.randint(0, 1200, size),
+        'Engagement_Rate': np.random.rand(size)
+    })
+    
+    print(memory_report({
+        'utm_data': test_utm_data,
+        'utm_data (compact)': to_compact(test_utm_data)
+    })[['Frame', 'Rows', 'Memory_MB', 'Bytes_Per_Row']])
@@ -3,30 +3,236 @@ Google Analytics 4 데이터 수집 모듈
 UTM 파라미터 및 주요 마케팅 지표 수집
 """
 
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
-from google.analytics.data_v1beta.types import DateRange, Dimension, Metric, RunReportRequest
+from google.analytics.data_v1beta.types import (
+    BatchRunReportsRequest, DateRange, Dimension, Metric, MetricType, RunReportRequest, RunReportResponse
+)
+from date_utils import get_date_range, get_previous_period
 from auth import get_ga4_client
+from frame_schema import apply_schema
+import rate_limiter
+import response_cache
+from instrumentation import instrument
 import config
 
 
-def get_date_range():
-    """지난주 월요일부터 일요일까지의 날짜 범위 반환"""
-    today = datetime.now()
-    days_since_monday = today.weekday()
-    start_of_last_week = today - timedelta(days=days_since_monday + 7)
-    end_of_last_week = start_of_last_week + timedelta(days=6)
+# GA4 Data API 한 페이지당 최대 행 수 (API 상한 250,000)
+GA4_MAX_PAGE_SIZE = 250000
+
+# BatchRunReports 한 번에 보낼 수 있는 최대 보고서 수
+GA4_BATCH_LIMIT = 5
+
+# 주간 보고서에 쓰는 GA4 보고서 (get_weekly_report_data가 한 번의 배치로 수집)
+WEEKLY_REPORTS = ['utm_campaign', 'landing_page']
+
+UTM_CAMPAIGN_COLUMNS = [
+    'Campaign', 'Source', 'Medium', 'Channel_Group', 
+    'Users', 'Sessions', 'Page_Views', 'Engagement_Rate', 
+    'Avg_Session_Duration', 'Conversions'
+]
+
+LANDING_PAGE_COLUMNS = [
+    'Landing_Page', 'Campaign', 'Source', 'Medium',
+    'Users', 'Sessions', 'Bounce_Rate', 'Conversions'
+]
+
+DAILY_TREND_COLUMNS = [
+    'Date', 'Channel_Group', 'Users', 'Sessions', 'Conversions'
+]
+
+DAILY_CAMPAIGN_COLUMNS = [
+    'Date', 'Campaign', 'Source', 'Medium', 'Channel_Group',
+    'Users', 'Sessions', 'Conversions'
+]
+
+# GA4 차원/지표 이름 → DataFrame 컬럼 이름
+GA4_COLUMN_NAMES = {
+    'sessionCampaignName': 'Campaign',
+    'sessionSource': 'Source',
+    'sessionMedium': 'Medium',
+    'sessionDefaultChannelGroup': 'Channel_Group',
+    'landingPagePlusQueryString': 'Landing_Page',
+    'date': 'Date',
+    'activeUsers': 'Users',
+    'sessions': 'Sessions',
+    'screenPageViews': 'Page_Views',
+    'engagementRate': 'Engagement_Rate',
+    'averageSessionDuration': 'Avg_Session_Duration',
+    'bounceRate': 'Bounce_Rate',
+    'conversions': 'Conversions',
+    'dateRange': 'Date_Range'
+}
+
+# 비교 기간 조회 시 date_ranges 이름 (응답의 dateRange 차원 값)
+CURRENT_PERIOD = 'current'
+PREVIOUS_PERIOD = 'previous'
+
+# 지표 타입별 dtype (정수형 외에는 모두 실수)
+METRIC_DTYPES = {
+    MetricType.TYPE_INTEGER: np.int64
+}
+
+
+def get_property_name(property_id=None):
+    """GA4 속성 리소스 이름 반환 (property_id를 지정하지 않으면 config.GA4_PROPERTY_ID)"""
+    return f"properties/{property_id or config.GA4_PROPERTY_ID}"
+
+
+def get_page_size(page_size=None):
+    """RunReport 페이지 크기 반환 (API 상한 적용)"""
+    return min(page_size or config.GA4_SETTINGS['page_size'], GA4_MAX_PAGE_SIZE)
+
+
+@instrument('api')
+def run_report(client, request):
+    """run_report 호출 (디스크 캐시에 같은 요청의 응답이 있으면 재사용)"""
+    key = get_cache_key(request)
+    
+    cached = response_cache.get(key)
+    if cached is not None:
+        return RunReportResponse.deserialize(cached)
+    
+    response = rate_limiter.call_ga4(request.property, lambda: client.run_report(request))
+    rate_limiter.record_ga4_quota(request.property, response.property_quota)
+    cache_response(key, request, response)
     
-    return start_of_last_week.strftime('%Y-%m-%d'), end_of_last_week.strftime('%Y-%m-%d')
+    return response
 
 
-def get_utm_campaign_data():
-    """UTM 캠페인별 성과 데이터 수집"""
-    client = get_ga4_client()
-    start_date, end_date = get_date_range()
+def get_cache_key(request):
+    """요청의 캐시 키 (속성 + 정규화된 요청 본문)"""
+    return response_cache.make_cache_key('ga4', request.property, RunReportRequest.to_dict(request))
+
+
+def cache_response(key, request, response):
+    """응답을 디스크 캐시에 저장 (요청 기간의 종료일에 따라 TTL 결정)"""
+    end_date = max(date_range.end_date for date_range in request.date_ranges)
+    response_cache.put(key, RunReportResponse.serialize(response), response_cache.get_ttl(end_date))
+
+
+def iter_report_pages(client, request, page_size=None, first_response=None):
+    """RunReportResponse의 offset/row_count를 따라가며 보고서를 페이지 단위로 반환 (제너레이터)
+    
+    first_response가 주어지면 (예: batch_run_reports 응답) 첫 페이지로 사용하고 이어서 조회
+    """
+    page_size = get_page_size(page_size)
+    offset = 0
+    response = first_response
+    
+    while True:
+        if response is None:
+            page_request = RunReportRequest(request)
+            page_request.limit = page_size
+            page_request.offset = offset
+            response = run_report(client, page_request)
+        
+        yield response
+        
+        offset += len(response.rows)
+        if len(response.rows) == 0 or offset >= response.row_count:
+            break
+        response = None
+
+
+@instrument('decode')
+def decode_columns(response):
+    """RunReportResponse 한 페이지를 열 단위 NumPy 배열로 변환 {컬럼 이름: 배열}
+    
+    dimension_headers/metric_headers를 기준으로 열마다 미리 할당한 배열을 채움.
+    차원은 문자열(object), 지표는 메트릭 타입에 따라 int64/float64
+    
+    차원을 여기서 범주형으로 만들지 않음: 범주형 변환은 GA4/Search Console 공통으로
+    REPORT_SETTINGS['compact_frames'](frame_schema.apply_schema)가 결정하고, 켜져 있으면
+    collect_report가 모든 페이지를 모은 뒤 보고서 전체에 한 번 적용 (페이지마다 범주를 합치지 않음)
+    """
+    pb = RunReportResponse.pb(response)
+    rows = pb.rows
+    row_count = len(rows)
+    
+    data = {}
+    for i, header in enumerate(pb.dimension_headers):
+        values = np.fromiter((row.dimension_values[i].value for row in rows), dtype=object, count=row_count)
+        data[GA4_COLUMN_NAMES.get(header.name, header.name)] = values
+    
+    for i, header in enumerate(pb.metric_headers):
+        values = np.fromiter((row.metric_values[i].value for row in rows), dtype=object, count=row_count)
+        dtype = METRIC_DTYPES.get(header.type_, np.float64)
+        data[GA4_COLUMN_NAMES.get(header.name, header.name)] = values.astype(dtype)
+    
+    return data
+
+
+def decode_response(response, columns=None):
+    """RunReportResponse 한 페이지를 DataFrame으로 변환"""
+    df = pd.DataFrame(decode_columns(response))
+    if columns is not None:
+        df = df.reindex(columns=columns)
+    
+    return df
+
+
+class ReportBuffer:
+    """보고서 페이지를 전체 행 수(row_count)만큼 미리 할당한 열 배열에 채우는 버퍼
+    
+    첫 페이지의 row_count로 열마다 배열을 한 번 할당하고 이후 페이지는 제자리에 복사하므로
+    메모리 최고치는 보고서 전체 + 한 페이지 (페이지별 DataFrame을 모아 마지막에 이어 붙이지 않음)
+    """
+    
+    def __init__(self):
+        self.arrays = None
+        self.size = 0
+    
+    @property
+    def capacity(self):
+        return len(next(iter(self.arrays.values()))) if self.arrays else 0
+    
+    def append_page(self, response):
+        """한 페이지를 열별 배열로 변환하여 버퍼에 복사"""
+        page = decode_columns(response)
+        count = len(response.rows)
+        
+        if self.arrays is None:
+            capacity = max(response.row_count, count)
+            self.arrays = {column: np.empty(capacity, dtype=values.dtype) for column, values in page.items()}
+        elif self.size + count > self.capacity:
+            # 조회 도중 row_count가 늘어난 경우 (집계 중인 최근 데이터)
+            extra = max(response.row_count, self.size + count) - self.capacity
+            self.arrays = {
+                column: np.concatenate([array, np.empty(extra, dtype=array.dtype)])
+                for column, array in self.arrays.items()
+            }
+        
+        for column, values in page.items():
+            self.arrays[column][self.size:self.size + count] = values
+        self.size += count
+    
+    def to_dataframe(self, columns=None):
+        """채운 행만 DataFrame으로 반환 (배열을 복사하지 않음, 차원은 decode_columns와 같이 문자열 그대로)"""
+        if self.arrays is None:
+            return pd.DataFrame(columns=columns)
+        
+        df = pd.DataFrame({column: array[:self.size] for column, array in self.arrays.items()}, copy=False)
+        if columns is not None and list(df.columns) != list(columns):
+            df = df.reindex(columns=columns)
+        
+        return df
+
+
+def pages_to_dataframe(pages, columns=None):
+    """페이지를 차례로 ReportBuffer에 채워 DataFrame 하나로 변환"""
+    buffer = ReportBuffer()
+    for page in pages:
+        buffer.append_page(page)
     
-    request = RunReportRequest(
-        property=f"properties/{config.GA4_PROPERTY_ID}",
+    return buffer.to_dataframe(columns)
+
+
+def build_utm_campaign_request(start_date, end_date, property_id=None):
+    """UTM 캠페인별 성과 보고서 요청 생성"""
+    return RunReportRequest(
+        property=get_property_name(property_id),
+        return_property_quota=True,
         dimensions=[
             Dimension(name="sessionCampaignName"),  # utm_campaign
             Dimension(name="sessionSource"),        # utm_source
@@ -45,44 +251,27 @@ def get_utm_campaign_data():
         order_bys=[{
             'metric': {'metric_name': 'sessions'},
             'desc': True
-        }],
-        limit=1000
+        }]
     )
-    
-    response = client.run_report(request)
-    
-    # DataFrame으로 변환
-    rows = []
-    for row in response.rows:
-        rows.append([
-            row.dimension_values[0].value,  # Campaign
-            row.dimension_values[1].value,  # Source
-            row.dimension_values[2].value,  # Medium
-            row.dimension_values[3].value,  # Channel Group
-            int(row.metric_values[0].value),  # Users
-            int(row.metric_values[1].value),  # Sessions
-            int(row.metric_values[2].value),  # Page Views
-            float(row.metric_values[3].value),  # Engagement Rate
-            float(row.metric_values[4].value),  # Avg Session Duration
-            int(row.metric_values[5].value)   # Conversions
-        ])
-    
-    df = pd.DataFrame(rows, columns=[
-        'Campaign', 'Source', 'Medium', 'Channel_Group', 
-        'Users', 'Sessions', 'Page_Views', 'Engagement_Rate', 
-        'Avg_Session_Duration', 'Conversions'
-    ])
-    
-    return df
 
 
-def get_landing_page_data():
-    """UTM 랜딩 페이지별 성과 데이터 수집"""
+@instrument('collect')
+def get_utm_campaign_data(start_date=None, end_date=None, property_id=None):
+    """UTM 캠페인별 성과 데이터 수집"""
     client = get_ga4_client()
-    start_date, end_date = get_date_range()
+    start_date, end_date = get_date_range(start_date, end_date)
     
-    request = RunReportRequest(
-        property=f"properties/{config.GA4_PROPERTY_ID}",
+    request = build_utm_campaign_request(start_date, end_date, property_id)
+    
+    # 페이지 단위로 DataFrame 변환
+    return collect_report(client, 'utm_campaign', request)
+
+
+def build_landing_page_request(start_date, end_date, property_id=None):
+    """UTM 랜딩 페이지별 성과 보고서 요청 생성"""
+    return RunReportRequest(
+        property=get_property_name(property_id),
+        return_property_quota=True,
         dimensions=[
             Dimension(name="landingPagePlusQueryString"),
             Dimension(name="sessionCampaignName"),
@@ -108,42 +297,64 @@ def get_landing_page_data():
         order_bys=[{
             'metric': {'metric_name': 'sessions'},
             'desc': True
-        }],
-        limit=500
+        }]
     )
+
+
+@instrument('collect')
+def get_landing_page_data(start_date=None, end_date=None, property_id=None):
+    """UTM 랜딩 페이지별 성과 데이터 수집"""
+    client = get_ga4_client()
+    start_date, end_date = get_date_range(start_date, end_date)
     
-    response = client.run_report(request)
-    
-    rows = []
-    for row in response.rows:
-        rows.append([
-            row.dimension_values[0].value,  # Landing Page
-            row.dimension_values[1].value,  # Campaign
-            row.dimension_values[2].value,  # Source
-            row.dimension_values[3].value,  # Medium
-            int(row.metric_values[0].value),  # Users
-            int(row.metric_values[1].value),  # Sessions
-            float(row.metric_values[2].value),  # Bounce Rate
-            int(row.metric_values[3].value)   # Conversions
-        ])
-    
-    df = pd.DataFrame(rows, columns=[
-        'Landing_Page', 'Campaign', 'Source', 'Medium',
-        'Users', 'Sessions', 'Bounce_Rate', 'Conversions'
-    ])
+    request = build_landing_page_request(start_date, end_date, property_id)
     
-    return df
+    return collect_report(client, 'landing_page', request)
+
+
+def build_daily_trend_request(start_date, end_date, property_id=None):
+    """일별 UTM 트래픽 트렌드 보고서 요청 생성"""
+    return RunReportRequest(
+        property=get_property_name(property_id),
+        return_property_quota=True,
+        dimensions=[
+            Dimension(name="date"),
+            Dimension(name="sessionDefaultChannelGroup")
+        ],
+        metrics=[
+            Metric(name="activeUsers"),
+            Metric(name="sessions"),
+            Metric(name="conversions")
+        ],
+        date_ranges=[DateRange(start_date=start_date, end_date=end_date)],
+        order_bys=[{
+            'dimension': {'dimension_name': 'date'},
+            'desc': False
+        }]
+    )
 
 
-def get_daily_utm_trend():
+@instrument('collect')
+def get_daily_utm_trend(start_date=None, end_date=None, property_id=None):
     """일별 UTM 트래픽 트렌드 데이터"""
     client = get_ga4_client()
-    start_date, end_date = get_date_range()
+    start_date, end_date = get_date_range(start_date, end_date)
+    
+    request = build_daily_trend_request(start_date, end_date, property_id)
     
-    request = RunReportRequest(
-        property=f"properties/{config.GA4_PROPERTY_ID}",
+    return collect_report(client, 'daily_trend', request)
+
+
+def build_daily_campaign_request(start_date, end_date, property_id=None):
+    """캠페인별 일별 성과 보고서 요청 생성 (이상치 탐지 기준선용)"""
+    return RunReportRequest(
+        property=get_property_name(property_id),
+        return_property_quota=True,
         dimensions=[
             Dimension(name="date"),
+            Dimension(name="sessionCampaignName"),
+            Dimension(name="sessionSource"),
+            Dimension(name="sessionMedium"),
             Dimension(name="sessionDefaultChannelGroup")
         ],
         metrics=[
@@ -157,29 +368,174 @@ def get_daily_utm_trend():
             'desc': False
         }]
     )
+
+
+@instrument('collect')
+def get_daily_campaign_data(start_date=None, end_date=None, property_id=None):
+    """캠페인별 일별 성과 데이터 수집"""
+    client = get_ga4_client()
+    start_date, end_date = get_date_range(start_date, end_date)
     
-    response = client.run_report(request)
-    
-    rows = []
-    for row in response.rows:
-        rows.append([
-            row.dimension_values[0].value,  # Date
-            row.dimension_values[1].value,  # Channel Group
-            int(row.metric_values[0].value),  # Users
-            int(row.metric_values[1].value),  # Sessions
-            int(row.metric_values[2].value)   # Conversions
-        ])
-    
-    df = pd.DataFrame(rows, columns=[
-        'Date', 'Channel_Group', 'Users', 'Sessions', 'Conversions'
-    ])
+    request = build_daily_campaign_request(start_date, end_date, property_id)
     
+    return collect_report(client, 'daily_campaign', request)
+
+
+def _finalize_daily_trend(df):
+    """일별 트렌드 DataFrame 후처리"""
     # 날짜 형식 변환
     df['Date'] = pd.to_datetime(df['Date'])
     
     return df
 
 
+# 보고서 이름별 요청 생성/컬럼 정의 (배치 수집에서 응답을 DataFrame으로 되돌릴 때 사용)
+GA4_REPORTS = {
+    'utm_campaign': {
+        'build_request': build_utm_campaign_request,
+        'columns': UTM_CAMPAIGN_COLUMNS,
+        'finalize': None
+    },
+    'landing_page': {
+        'build_request': build_landing_page_request,
+        'columns': LANDING_PAGE_COLUMNS,
+        'finalize': None
+    },
+    'daily_trend': {
+        'build_request': build_daily_trend_request,
+        'columns': DAILY_TREND_COLUMNS,
+        'finalize': _finalize_daily_trend
+    },
+    'daily_campaign': {
+        'build_request': build_daily_campaign_request,
+        'columns': DAILY_CAMPAIGN_COLUMNS,
+        'finalize': _finalize_daily_trend
+    }
+}
+
+
+def collect_report(client, report_name, request, first_response=None, extra_columns=None):
+    """보고서 전체 페이지를 조회하여 DataFrame으로 변환"""
+    report = GA4_REPORTS[report_name]
+    
+    pages = iter_report_pages(client, request, first_response=first_response)
+    df = pages_to_dataframe(pages, report['columns'] + list(extra_columns or []))
+    
+    if report['finalize'] is not None:
+        df = report['finalize'](df)
+    
+    return apply_schema(df)
+
+
+@instrument('collect')
+def get_batched_report_data(report_names=None, start_date=None, end_date=None, property_id=None, comparison_reports=()):
+    """여러 보고서를 batch_run_reports 한 번의 호출로 수집 (최대 5개씩)
+    
+    comparison_reports: 현재/직전 기간을 date_ranges 2개로 함께 조회할 보고서 이름
+    반환값: {보고서 이름: DataFrame} (get_utm_campaign_data 등과 동일한 형식,
+             comparison_reports의 보고서는 get_comparison_data와 같은 (현재 기간, 직전 기간))
+    """
+    client = get_ga4_client()
+    start_date, end_date = get_date_range(start_date, end_date)
+    report_names = list(report_names or GA4_REPORTS)
+    page_size = get_page_size()
+    
+    requests = {}
+    first_responses = {}
+    for name in report_names:
+        if name in comparison_reports:
+            request = build_comparison_request(name, start_date, end_date, property_id)
+        else:
+            request = GA4_REPORTS[name]['build_request'](start_date, end_date, property_id)
+        request.limit = page_size
+        requests[name] = request
+        
+        # 캐시에 첫 페이지가 있는 보고서는 배치 요청에서 제외
+        cached = response_cache.get(get_cache_key(request))
+        if cached is not None:
+            first_responses[name] = RunReportResponse.deserialize(cached)
+    
+    missing = [name for name in report_names if name not in first_responses]
+    for i in range(0, len(missing), GA4_BATCH_LIMIT):
+        batch_names = missing[i:i + GA4_BATCH_LIMIT]
+        
+        batch_request = BatchRunReportsRequest(
+            property=get_property_name(property_id),
+            requests=[requests[name] for name in batch_names]
+        )
+        batch_response = rate_limiter.call_ga4(
+            batch_request.property, lambda: client.batch_run_reports(batch_request)
+        )
+        
+        # 응답 순서는 요청 순서와 동일
+        for name, response in zip(batch_names, batch_response.reports):
+            rate_limiter.record_ga4_quota(batch_request.property, response.property_quota)
+            cache_response(get_cache_key(requests[name]), requests[name], response)
+            first_responses[name] = response
+    
+    # 첫 페이지 이후는 개별 페이지 조회로 이어감
+    results = {}
+    for name in report_names:
+        if name in comparison_reports:
+            results[name] = split_comparison(collect_report(
+                client, name, requests[name], first_response=first_responses[name], extra_columns=['Date_Range']
+            ))
+        else:
+            results[name] = collect_report(client, name, requests[name], first_response=first_responses[name])
+    
+    return results
+
+
+def get_weekly_report_data(start_date=None, end_date=None, property_id=None):
+    """주간 보고서의 GA4 데이터를 batch_run_reports 한 번으로 수집
+    
+    반환값: {'utm_campaign': (현재 기간, 직전 기간), 'landing_page': DataFrame}
+    """
+    return get_batched_report_data(
+        WEEKLY_REPORTS, start_date, end_date, property_id, comparison_reports=['utm_campaign']
+    )
+
+
+def build_comparison_request(report_name, start_date, end_date, property_id=None):
+    """현재 기간과 같은 길이의 직전 기간을 date_ranges 2개로 조회하는 요청 생성"""
+    previous_start, previous_end = get_previous_period(start_date, end_date)
+    
+    request = GA4_REPORTS[report_name]['build_request'](start_date, end_date, property_id)
+    request.date_ranges = [
+        DateRange(start_date=start_date, end_date=end_date, name=CURRENT_PERIOD),
+        DateRange(start_date=previous_start, end_date=previous_end, name=PREVIOUS_PERIOD)
+    ]
+    
+    return request
+
+
+def split_comparison(df):
+    """Date_Range 컬럼으로 (현재 기간 DataFrame, 직전 기간 DataFrame) 분리"""
+    current = df[df['Date_Range'] == CURRENT_PERIOD].drop(columns='Date_Range').reset_index(drop=True)
+    previous = df[df['Date_Range'] == PREVIOUS_PERIOD].drop(columns='Date_Range').reset_index(drop=True)
+    
+    return current, previous
+
+
+@instrument('collect')
+def get_comparison_data(report_name, start_date=None, end_date=None, property_id=None):
+    """현재 기간과 직전 기간을 한 번의 RunReportRequest(date_ranges 2개)로 조회
+    
+    반환값: (현재 기간 DataFrame, 직전 기간 DataFrame) - 각각 단일 기간 수집 함수와 같은 형식
+    """
+    client = get_ga4_client()
+    start_date, end_date = get_date_range(start_date, end_date)
+    
+    request = build_comparison_request(report_name, start_date, end_date, property_id)
+    
+    return split_comparison(collect_report(client, report_name, request, extra_columns=['Date_Range']))
+
+
+def get_utm_campaign_comparison(start_date=None, end_date=None, property_id=None):
+    """UTM 캠페인 성과 - 현재/직전 기간 (이상치 탐지의 historical_data용)"""
+    return get_comparison_data('utm_campaign', start_date, end_date, property_id)
+
+
 if __name__ == "__main__":
     print("GA4 데이터 수집 테스트 중...")
     try:
@@ -3,159 +3,218 @@ Google Search Console 데이터 수집 모듈
 오가닉 검색 성과 및 키워드 분석
 """
 
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from date_utils import get_date_range, get_previous_period
 from auth import get_search_console_service
+from frame_schema import apply_schema
+import rate_limiter
+import response_cache
+from instrumentation import instrument
 import config
 
 
-def get_date_range():
-    """지난주 월요일부터 일요일까지의 날짜 범위 반환"""
-    today = datetime.now()
-    days_since_monday = today.weekday()
-    start_of_last_week = today - timedelta(days=days_since_monday + 7)
-    end_of_last_week = start_of_last_week + timedelta(days=6)
+# Search Analytics API 한 페이지당 최대 행 수
+GSC_MAX_PAGE_SIZE = 25000
+
+# API 차원 이름 → DataFrame 컬럼 이름
+DIMENSION_COLUMNS = {
+    'query': 'Query',
+    'page': 'Page',
+    'date': 'Date',
+    'country': 'Country',
+    'device': 'Device'
+}
+
+# 지표 컬럼 이름 → (API 필드, dtype)
+METRIC_COLUMNS = {
+    'Clicks': ('clicks', np.int64),
+    'Impressions': ('impressions', np.int64),
+    'CTR': ('ctr', np.float64),
+    'Position': ('position', np.float64)
+}
+
+
+@instrument('api')
+def execute_query(service, site_url, request_body):
+    """searchanalytics().query 실행 (디스크 캐시에 같은 요청의 응답이 있으면 재사용)"""
+    key = response_cache.make_cache_key('gsc', site_url, request_body)
+    
+    cached = response_cache.get(key)
+    if cached is not None:
+        return cached
     
-    return start_of_last_week.strftime('%Y-%m-%d'), end_of_last_week.strftime('%Y-%m-%d')
+    response = rate_limiter.call_gsc(site_url, lambda: service.searchanalytics().query(
+        siteUrl=site_url, 
+        body=request_body
+    ).execute())
+    
+    response_cache.put(key, response, response_cache.get_ttl(request_body['endDate']))
+    
+    return response
 
 
-def get_search_performance_data():
-    """검색 성과 데이터 (키워드별)"""
+def iter_search_analytics_pages(service, site_url, request_body, max_rows=None):
+    """startRow로 페이지를 넘기며 Search Analytics 결과를 페이지 단위로 반환 (제너레이터)
+    
+    max_rows가 None이면 결과 전체를 조회
+    """
+    start_row = 0
+    
+    while max_rows is None or start_row < max_rows:
+        page_size = GSC_MAX_PAGE_SIZE if max_rows is None else min(GSC_MAX_PAGE_SIZE, max_rows - start_row)
+        body = dict(request_body, startRow=start_row, rowLimit=page_size)
+        
+        response = execute_query(service, site_url, body)
+        
+        rows = response.get('rows', [])
+        if not rows:
+            break
+        
+        yield rows
+        
+        start_row += len(rows)
+        if len(rows) < page_size:
+            break
+
+
+class ColumnBuffer:
+    """Search Analytics 페이지를 열(column)별 배열로 모으는 버퍼
+    
+    페이지마다 차원/지표를 NumPy 배열로 바꿔 보관하고 마지막에 한 번만 이어 붙임
+    """
+    
+    def __init__(self, dimensions):
+        self.dimensions = list(dimensions)
+        self.columns = [DIMENSION_COLUMNS.get(d, d.title()) for d in self.dimensions] + list(METRIC_COLUMNS)
+        self.chunks = {column: [] for column in self.columns}
+        self.row_count = 0
+    
+    def append_page(self, rows):
+        """한 페이지(rows)를 열별 배열로 변환하여 추가"""
+        count = len(rows)
+        if count == 0:
+            return
+        
+        # 행별 keys 목록을 한 번에 전치해 차원별 튜플로 만듦 (차원마다 행을 다시 순회하지 않음)
+        if self.dimensions:
+            keys = zip(*(row['keys'] for row in rows))
+            for column, values in zip(self.columns, keys):
+                self.chunks[column].append(np.array(values, dtype=object))
+        
+        for column, (field, dtype) in METRIC_COLUMNS.items():
+            self.chunks[column].append(np.fromiter((row[field] for row in rows), dtype=dtype, count=count))
+        
+        self.row_count += count
+    
+    @instrument('decode')
+    def to_dataframe(self):
+        """버퍼 내용을 DataFrame으로 변환"""
+        data = {}
+        for column in self.columns:
+            chunks = self.chunks[column]
+            if chunks:
+                data[column] = np.concatenate(chunks)
+            elif column in METRIC_COLUMNS:
+                data[column] = np.array([], dtype=METRIC_COLUMNS[column][1])
+            else:
+                data[column] = np.array([], dtype=object)
+        
+        return pd.DataFrame(data, columns=self.columns)
+
+
+def query_search_analytics(request_body, max_rows=None, site_url=None):
+    """Search Analytics 조회 결과 전체를 페이지 단위로 받아 DataFrame으로 변환 (site_url 기본값: config.GSC_SITE_URL)
+    
+    수집 측정은 이 함수를 부르는 get_* 진입점에서만 기록 (중첩 측정으로 소요 시간이 여러 번 집계되지 않도록)
+    """
     service = get_search_console_service()
-    start_date, end_date = get_date_range()
+    site_url = site_url or config.GSC_SITE_URL
+    
+    buffer = ColumnBuffer(request_body['dimensions'])
+    for rows in iter_search_analytics_pages(service, site_url, request_body, max_rows=max_rows):
+        buffer.append_page(rows)
+    
+    return apply_schema(buffer.to_dataframe())
+
+
+@instrument('collect')
+def get_search_performance_data(start_date=None, end_date=None, site_url=None):
+    """검색 성과 데이터 (키워드별)"""
+    start_date, end_date = get_date_range(start_date, end_date)
     
     request_body = {
         'startDate': start_date,
         'endDate': end_date,
-        'dimensions': ['query'],
-        'rowLimit': config.REPORT_SETTINGS['top_queries_limit']
+        'dimensions': ['query']
     }
     
-    response = service.searchanalytics().query(
-        siteUrl=config.GSC_SITE_URL, 
-        body=request_body
-    ).execute()
-    
-    rows = []
-    if 'rows' in response:
-        for row in response['rows']:
-            rows.append([
-                row['keys'][0],  # Query
-                row['clicks'],
-                row['impressions'],
-                row['ctr'],
-                row['position']
-            ])
-    
-    df = pd.DataFrame(rows, columns=[
-        'Query', 'Clicks', 'Impressions', 'CTR', 'Position'
-    ])
-    
-    return df
+    return query_search_analytics(request_body, max_rows=config.REPORT_SETTINGS['top_queries_limit'], site_url=site_url)
 
 
-def get_page_performance_data():
-    """페이지별 검색 성과 데이터"""
-    service = get_search_console_service()
-    start_date, end_date = get_date_range()
+@instrument('collect')
+def get_full_search_performance_data(start_date=None, end_date=None, site_url=None):
+    """키워드별 검색 성과 전체 데이터 (상위 N개 제한 없이 25,000행 단위 페이지 조회)"""
+    start_date, end_date = get_date_range(start_date, end_date)
     
     request_body = {
         'startDate': start_date,
         'endDate': end_date,
-        'dimensions': ['page'],
-        'rowLimit': 100
+        'dimensions': ['query']
     }
     
-    response = service.searchanalytics().query(
-        siteUrl=config.GSC_SITE_URL, 
-        body=request_body
-    ).execute()
-    
-    rows = []
-    if 'rows' in response:
-        for row in response['rows']:
-            rows.append([
-                row['keys'][0],  # Page
-                row['clicks'],
-                row['impressions'],
-                row['ctr'],
-                row['position']
-            ])
-    
-    df = pd.DataFrame(rows, columns=[
-        'Page', 'Clicks', 'Impressions', 'CTR', 'Position'
-    ])
-    
-    return df
+    return query_search_analytics(request_body, site_url=site_url)
 
 
-def get_query_page_performance():
-    """키워드-페이지 조합별 성과 데이터"""
-    service = get_search_console_service()
-    start_date, end_date = get_date_range()
+def _query_by_dimensions(dimensions, start_date, end_date, site_url, row_limit):
+    """기간/차원 조회 공통 처리 (측정은 호출한 get_* 진입점에서)"""
+    start_date, end_date = get_date_range(start_date, end_date)
     
     request_body = {
         'startDate': start_date,
         'endDate': end_date,
-        'dimensions': ['query', 'page'],
-        'rowLimit': 200
+        'dimensions': dimensions
     }
     
-    response = service.searchanalytics().query(
-        siteUrl=config.GSC_SITE_URL, 
-        body=request_body
-    ).execute()
-    
-    rows = []
-    if 'rows' in response:
-        for row in response['rows']:
-            rows.append([
-                row['keys'][0],  # Query
-                row['keys'][1],  # Page
-                row['clicks'],
-                row['impressions'],
-                row['ctr'],
-                row['position']
-            ])
-    
-    df = pd.DataFrame(rows, columns=[
-        'Query', 'Page', 'Clicks', 'Impressions', 'CTR', 'Position'
-    ])
-    
-    return df
+    return query_search_analytics(request_body, max_rows=row_limit, site_url=site_url)
+
 
+@instrument('collect')
+def get_page_performance_data(start_date=None, end_date=None, site_url=None, *, row_limit=100):
+    """페이지별 검색 성과 데이터 (row_limit=None이면 전체)"""
+    return _query_by_dimensions(['page'], start_date, end_date, site_url, row_limit)
 
-def get_daily_search_trend():
+
+@instrument('collect')
+def get_full_page_performance_data(start_date=None, end_date=None, site_url=None):
+    """페이지별 검색 성과 전체 데이터 (25,000행 단위 페이지 조회)"""
+    return _query_by_dimensions(['page'], start_date, end_date, site_url, None)
+
+
+@instrument('collect')
+def get_query_page_performance(start_date=None, end_date=None, site_url=None, *, row_limit=200):
+    """키워드-페이지 조합별 성과 데이터 (row_limit=None이면 전체)"""
+    return _query_by_dimensions(['query', 'page'], start_date, end_date, site_url, row_limit)
+
+
+@instrument('collect')
+def get_full_query_page_performance(start_date=None, end_date=None, site_url=None):
+    """키워드-페이지 조합 전체 데이터 (25,000행 단위 페이지 조회)"""
+    return _query_by_dimensions(['query', 'page'], start_date, end_date, site_url, None)
+
+
+@instrument('collect')
+def get_daily_search_trend(start_date=None, end_date=None, site_url=None):
     """일별 검색 트렌드 데이터"""
-    service = get_search_console_service()
-    start_date, end_date = get_date_range()
+    start_date, end_date = get_date_range(start_date, end_date)
     
     request_body = {
         'startDate': start_date,
         'endDate': end_date,
-        'dimensions': ['date'],
-        'rowLimit': 25000
+        'dimensions': ['date']
     }
     
-    response = service.searchanalytics().query(
-        siteUrl=config.GSC_SITE_URL, 
-        body=request_body
-    ).execute()
-    
-    rows = []
-    if 'rows' in response:
-        for row in response['rows']:
-            rows.append([
-                row['keys'][0],  # Date
-                row['clicks'],
-                row['impressions'],
-                row['ctr'],
-                row['position']
-            ])
-    
-    df = pd.DataFrame(rows, columns=[
-        'Date', 'Clicks', 'Impressions', 'CTR', 'Position'
-    ])
+    df = query_search_analytics(request_body, site_url=site_url)
     
     # 날짜 형식 변환
     df['Date'] = pd.to_datetime(df['Date'])
@@ -163,6 +222,54 @@ def get_daily_search_trend():
     return df
 
 
+
+@instrument('collect')
+def get_search_performance_comparison(start_date=None, end_date=None, site_url=None, dimensions=None):
+    """현재 기간과 직전 기간 검색 성과를 한 번의 조회로 수집
+    
+    두 기간이 연속되므로 직전 기간 시작일 ~ 현재 기간 종료일을 date 차원과 함께 한 번에 조회한 뒤
+    기간별로 나눠 집계 (CTR은 클릭/노출, 순위는 노출 가중 평균으로 다시 계산)
+    반환값: (현재 기간 DataFrame, 직전 기간 DataFrame)
+    """
+    start_date, end_date = get_date_range(start_date, end_date)
+    previous_start, previous_end = get_previous_period(start_date, end_date)
+    dimensions = dimensions or ['query']
+    
+    request_body = {
+        'startDate': previous_start,
+        'endDate': end_date,
+        'dimensions': ['date'] + dimensions
+    }
+    
+    df = query_search_analytics(request_body, site_url=site_url)
+    df['Date'] = pd.to_datetime(df['Date'])
+    
+    key_columns = [DIMENSION_COLUMNS.get(d, d.title()) for d in dimensions]
+    current = _aggregate_search_rows(df[df['Date'] >= pd.Timestamp(start_date)], key_columns)
+    previous = _aggregate_search_rows(df[df['Date'] <= pd.Timestamp(previous_end)], key_columns)
+    
+    return current, previous
+
+
+def _aggregate_search_rows(df, key_columns):
+    """일별 행을 키별로 합산 (CTR, 노출 가중 평균 순위 재계산)"""
+    df = df.assign(Weighted_Position=df['Position'] * df['Impressions'])
+    
+    summary = df.groupby(key_columns, observed=True).agg({
+        'Clicks': 'sum',
+        'Impressions': 'sum',
+        'Weighted_Position': 'sum'
+    }).reset_index()
+    
+    impressions = summary['Impressions'].where(summary['Impressions'] > 0)
+    summary['CTR'] = (summary['Clicks'] / impressions).fillna(0)
+    summary['Position'] = (summary['Weighted_Position'] / impressions).fillna(0)
+    
+    summary = summary.drop(columns='Weighted_Position').sort_values('Clicks', ascending=False)
+    
+    return summary.reset_index(drop=True)[key_columns + list(METRIC_COLUMNS)]
+
+
 if __name__ == "__main__":
     print("Google Search Console 데이터 수집 테스트 중...")
     try:
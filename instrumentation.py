@@ -0,0 +1,279 @@
+"""
+단계별 성능 측정 모듈
+수집/디코딩/분석/보고서/알림 함수의 소요 시간 히스토그램, 처리 행 수, 메모리 최고치를 기록하고
+JSON과 Prometheus 텍스트 파일(node exporter textfile collector)로 내보냄
+"""
+
+import os
+import sys
+import json
+import time
+import bisect
+import resource
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+import pandas as pd
+import config
+
+
+METRIC_PREFIX = 'utm_report'
+
+
+class MetricsRegistry:
+    """측정 이름별 호출 수, 소요 시간 히스토그램, 행 수, 오류 수, 메모리 최고치"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stages = {}
+    
+    def record(self, name, kind, seconds, rows=None, error=False, tracemalloc_peak=None):
+        buckets = config.METRICS_SETTINGS['latency_buckets']
+        
+        with self.lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                stage = self.stages[name] = {
+                    'kind': kind,
+                    'count': 0,
+                    'errors': 0,
+                    'seconds_sum': 0.0,
+                    'seconds_max': 0.0,
+                    'rows': 0,
+                    'buckets': [0] * len(buckets),
+                    'tracemalloc_peak_bytes': 0
+                }
+            
+            stage['count'] += 1
+            stage['errors'] += int(error)
+            stage['seconds_sum'] += seconds
+            stage['seconds_max'] = max(stage['seconds_max'], seconds)
+            stage['rows'] += rows or 0
+            
+            # 누적 히스토그램으로 내보내므로 여기서는 해당 구간 하나만 증가
+            index = bisect.bisect_left(buckets, seconds)
+            if index < len(buckets):
+                stage['buckets'][index] += 1
+            
+            if tracemalloc_peak:
+                stage['tracemalloc_peak_bytes'] = max(stage['tracemalloc_peak_bytes'], tracemalloc_peak)
+    
+    def snapshot(self):
+        """현재까지의 측정값 (행/초, 누적 히스토그램 포함)"""
+        buckets = config.METRICS_SETTINGS['latency_buckets']
+        
+        with self.lock:
+            stages = {}
+            for name, stage in self.stages.items():
+                cumulative = []
+                total = 0
+                for upper, count in zip(buckets, stage['buckets']):
+                    total += count
+                    cumulative.append([upper, total])
+                
+                stages[name] = {
+                    **{key: value for key, value in stage.items() if key != 'buckets'},
+                    'rows_per_second': round(stage['rows'] / stage['seconds_sum'], 1) if stage['seconds_sum'] > 0 else 0,
+                    'latency_histogram': cumulative
+                }
+        
+        return {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'peak_rss_bytes': get_peak_rss_bytes(),
+            'stages': stages
+        }
+    
+    def reset(self):
+        with self.lock:
+            self.stages = {}
+
+
+_registry = MetricsRegistry()
+
+
+def get_registry():
+    return _registry
+
+
+def get_peak_rss_bytes():
+    """프로세스 최대 RSS (ru_maxrss는 Linux에서 KB, macOS에서 바이트 단위)"""
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+
+def count_rows(result):
+    """결과의 행 수 (DataFrame, DataFrame의 tuple/list/dict, API 응답의 rows, 그 외에는 None)"""
+    if isinstance(result, pd.DataFrame):
+        return len(result)
+    
+    if isinstance(result, dict):
+        if isinstance(result.get('rows'), list):
+            return len(result['rows'])   # Search Console 응답
+        result = list(result.values())
+    elif hasattr(result, 'rows'):
+        return len(result.rows)          # GA4 RunReportResponse
+    
+    if isinstance(result, (tuple, list)):
+        frames = [item for item in result if isinstance(item, pd.DataFrame)]
+        if frames:
+            return sum(len(frame) for frame in frames)
+    
+    return None
+
+
+# 실행 중인 측정 구간 (메모리 최고치 측정용)
+_spans_lock = threading.Lock()
+_active_spans = []
+
+
+def _start_memory_span():
+    """구간 시작 시 할당량 기록
+    
+    tracemalloc 최고치는 프로세스 전체에 하나뿐이므로, 다른 스레드의 구간과 겹치면 양쪽 모두 메모리 측정을 포기.
+    같은 스레드의 중첩 구간은 안쪽 구간이 최고치를 초기화하기 전에 바깥 구간의 최고치를 보관해 둠
+    """
+    thread_id = threading.get_ident()
+    memory = {'thread': thread_id, 'shared': False, 'base': 0, 'peak': 0}
+    
+    with _spans_lock:
+        others = [span for span in _active_spans if span['thread'] != thread_id]
+        if others:
+            memory['shared'] = True
+            for span in others:
+                span['shared'] = True
+        
+        if not memory['shared'] and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            for span in _active_spans:
+                span['peak'] = max(span['peak'], peak)
+            tracemalloc.reset_peak()
+            memory['base'] = memory['peak'] = current
+        
+        _active_spans.append(memory)
+    
+    return memory
+
+
+def _finish_memory_span(memory):
+    """구간 동안 늘어난 할당 최고치 (peak - 시작 시 할당량, 측정할 수 없으면 None)"""
+    with _spans_lock:
+        _active_spans.remove(memory)
+        if memory['shared'] or not tracemalloc.is_tracing():
+            return None
+        
+        peak = max(memory['peak'], tracemalloc.get_traced_memory()[1])
+        # 바깥 구간은 안쪽 구간의 최고치를 이어받음
+        for span in _active_spans:
+            span['peak'] = max(span['peak'], peak)
+        
+        return peak - memory['base']
+
+
+@contextmanager
+def measure(name, kind='stage'):
+    """with 블록의 소요 시간/행 수/메모리 기록
+    
+    블록 안에서 span['rows']에 처리한 행 수를 지정할 수 있음
+    메모리는 블록 동안 늘어난 tracemalloc 할당 최고치 (다른 스레드의 측정 구간과 겹치면 기록하지 않음)
+    """
+    span = {'rows': None}
+    if not config.METRICS_SETTINGS['enabled']:
+        yield span
+        return
+    
+    if config.METRICS_SETTINGS['tracemalloc'] and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    
+    memory = _start_memory_span()
+    start = time.perf_counter()
+    error = False
+    try:
+        yield span
+    except BaseException:
+        error = True
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        peak = _finish_memory_span(memory)
+        _registry.record(name, kind, seconds, span['rows'], error, peak)
+
+
+def instrument(kind='stage', name=None):
+    """함수 호출을 measure로 감싸는 데코레이터 (반환값에서 행 수를 자동 계산)"""
+    def decorator(func):
+        metric_name = name or f"{func.__module__}.{func.__qualname__}"
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with measure(metric_name, kind) as span:
+                result = func(*args, **kwargs)
+                span['rows'] = count_rows(result)
+                return result
+        
+        return wrapper
+    return decorator
+
+
+def export_json(path=None):
+    """측정값을 JSON 파일로 저장"""
+    path = path or os.path.join(config.METRICS_SETTINGS['output_dir'], 'metrics.json')
+    _atomic_write(path, json.dumps(_registry.snapshot(), ensure_ascii=False, indent=2))
+    return path
+
+
+def format_prometheus(snapshot):
+    """측정값을 Prometheus 텍스트 형식으로 변환"""
+    lines = [
+        f"# HELP {METRIC_PREFIX}_stage_duration_seconds 단계 소요 시간",
+        f"# TYPE {METRIC_PREFIX}_stage_duration_seconds histogram"
+    ]
+    for name, stage in sorted(snapshot['stages'].items()):
+        labels = f'stage="{name}",kind="{stage["kind"]}"'
+        for upper, count in stage['latency_histogram']:
+            lines.append(f'{METRIC_PREFIX}_stage_duration_seconds_bucket{{{labels},le="{upper}"}} {count}')
+        lines.append(f'{METRIC_PREFIX}_stage_duration_seconds_bucket{{{labels},le="+Inf"}} {stage["count"]}')
+        lines.append(f'{METRIC_PREFIX}_stage_duration_seconds_sum{{{labels}}} {stage["seconds_sum"]:.6f}')
+        lines.append(f'{METRIC_PREFIX}_stage_duration_seconds_count{{{labels}}} {stage["count"]}')
+    
+    for metric, metric_type, key, help_text in (
+        ('stage_rows_total', 'counter', 'rows', '처리한 행 수'),
+        ('stage_rows_per_second', 'gauge', 'rows_per_second', '초당 처리 행 수'),
+        ('stage_errors_total', 'counter', 'errors', '오류 수'),
+        ('stage_tracemalloc_peak_bytes', 'gauge', 'tracemalloc_peak_bytes', '단계 동안 늘어난 tracemalloc 할당 최고치')
+    ):
+        lines.append(f"# HELP {METRIC_PREFIX}_{metric} {help_text}")
+        lines.append(f"# TYPE {METRIC_PREFIX}_{metric} {metric_type}")
+        for name, stage in sorted(snapshot['stages'].items()):
+            lines.append(f'{METRIC_PREFIX}_{metric}{{stage="{name}",kind="{stage["kind"]}"}} {stage[key]}')
+    
+    lines.append(f"# HELP {METRIC_PREFIX}_peak_rss_bytes 프로세스 최대 RSS")
+    lines.append(f"# TYPE {METRIC_PREFIX}_peak_rss_bytes gauge")
+    lines.append(f"{METRIC_PREFIX}_peak_rss_bytes {snapshot['peak_rss_bytes']}")
+    
+    return '\n'.join(lines) + '\n'
+
+
+def export_prometheus(path=None):
+    """측정값을 Prometheus 텍스트 파일로 저장 (node exporter가 읽는 도중 바뀌지 않도록 교체 방식)"""
+    settings = config.METRICS_SETTINGS
+    path = path or os.path.join(settings['output_dir'], settings['prometheus_filename'])
+    _atomic_write(path, format_prometheus(_registry.snapshot()))
+    return path
+
+
+def write_metrics():
+    """JSON과 Prometheus 텍스트 파일 모두 저장, 경로 목록 반환"""
+    return [export_json(), export_prometheus()]
+
+
+def _atomic_write(path, text):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
@@ -0,0 +1,279 @@
+"""
+주간 보고서 파이프라인 실행 모듈
+수집 → 분석 → 보고서 생성 → 알림을 단계 DAG로 실행하고, 단계별 결과를 저장해 실패한 단계부터 재개
+"""
+
+import os
+import time
+import pickle
+import argparse
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from functools import partial
+from date_utils import get_date_range, get_baseline_start
+import ga4_data
+import gsc_data
+import collector
+import warehouse
+import anomaly_engine
+import fanout
+import report_generator
+import slack_notifier
+import instrumentation
+import config
+
+
+def collect_ga4(context, inputs):
+    """GA4 데이터 수집 (보고서들을 batch_run_reports 한 번으로, UTM 캠페인은 직전 기간 비교 데이터 포함)"""
+    return _collect({
+        'ga4': ga4_data.get_weekly_report_data
+    }, context)['ga4']
+
+
+def collect_gsc(context, inputs):
+    """Search Console 데이터 수집"""
+    return _collect({
+        'search_performance': gsc_data.get_search_performance_data
+    }, context)
+
+
+def collect_history(context, inputs):
+    """이상치 탐지 기준선용 일별 캠페인 데이터를 저장소에 동기화 (누락된 날짜만 수집)"""
+    result = warehouse.sync(['daily_campaign'], get_history_start(context), context['end_date'])
+    
+    if result['errors']:
+        raise RuntimeError(f"수집 실패: {result['errors']}")
+    
+    return result['written']
+
+
+def get_history_start(context):
+    """수집 기간 앞에 ANOMALY_SETTINGS['baseline_weeks']주 이력을 더한 시작일"""
+    return get_baseline_start(context['start_date'], config.ANOMALY_SETTINGS['baseline_weeks'])
+
+
+def _collect(collectors, context):
+    """수집 함수들을 동시에 실행 (하나라도 실패하면 단계 실패)"""
+    bound = {
+        name: partial(collect, start_date=context['start_date'], end_date=context['end_date'])
+        for name, collect in collectors.items()
+    }
+    result = collector.collect_all(bound)
+    
+    if result['errors']:
+        raise RuntimeError(f"수집 실패: {result['errors']}")
+    
+    return result['data']
+
+
+def analyze(context, inputs):
+    """수집 데이터 분석 (보고서 입력 + 이상치)
+    
+    daily_anomalies: 저장소의 일별 캠페인 데이터(직전 N주 이력 포함)로 수집 기간 안의 캠페인 × 지표 × 일 이상치 탐지
+    """
+    analysis = fanout.analyze_property({**inputs['collect_ga4'], **inputs['collect_gsc']})
+    
+    daily_data = warehouse.load_dataset('daily_campaign', get_history_start(context), context['end_date'])
+    analysis['daily_anomalies'] = anomaly_engine.detect_anomalies(daily_data, since=context['start_date'])
+    
+    return analysis
+
+
+def render(context, inputs):
+    """보고서 파일 생성 (REPORT_SETTINGS['output_formats'] 형식별)"""
+    analysis = inputs['analyze']
+    tables = report_generator.build_report_tables(
+        analysis['utm_summary'],
+        analysis['channel_summary'],
+        analysis['landing_summary'],
+        analysis['search_analysis'],
+        analysis['performance_summary'],
+        analysis['insights']
+    )
+    
+    return report_generator.write_report(tables)
+
+
+def notify(context, inputs):
+    """Slack으로 보고서 완성 알림 + 이상 알림(전주 대비, 캠페인별 일 단위) 발송 (실행 공용 발송 대기열 사용)"""
+    webhook_url = get_webhook_url()
+    queue = context.get('slack_queue')
+    if webhook_url is None or queue is None:
+        print("⚠️ Slack 웹훅이 설정되지 않아 알림을 건너뜁니다")
+        return {'sent': False}
+    
+    outputs = inputs['render']
+    report_filename = (outputs.get('excel') or next(iter(outputs.values())))[0]
+    
+    report = queue.submit(webhook_url, *slack_notifier.build_weekly_report_message(
+        inputs['analyze']['utm_cube'], inputs['collect_gsc']['search_performance'], report_filename
+    ))
+    
+    alerts = None
+    if config.SLACK_SETTINGS['enable_alerts']:
+        # 쿨다운은 상태 파일로 실행 간에 유지 (매주 같은 이상을 반복 발송하지 않음)
+        aggregator = slack_notifier.AlertAggregator(webhook_url, queue=queue, state_path=get_alert_state_path())
+        aggregator.add_performance_anomalies(config.GA4_PROPERTY_ID, inputs['analyze']['anomalies'])
+        aggregator.add_anomalies(config.GA4_PROPERTY_ID, inputs['analyze']['daily_anomalies'])
+        alerts = aggregator.close()
+    
+    if not report.result():
+        raise RuntimeError("보고서 알림 발송 실패")
+    if alerts is not None and not alerts.result():
+        raise RuntimeError("이상 알림 발송 실패")
+    
+    return {'sent': True}
+
+
+# 단계 이름 → 선행 단계, 실행 함수 run(context, {선행 단계: 결과})
+STAGES = {
+    'collect_ga4': {'deps': [], 'run': collect_ga4},
+    'collect_gsc': {'deps': [], 'run': collect_gsc},
+    'collect_history': {'deps': [], 'run': collect_history},
+    'analyze': {'deps': ['collect_ga4', 'collect_gsc', 'collect_history'], 'run': analyze},
+    'render': {'deps': ['analyze'], 'run': render},
+    'notify': {'deps': ['collect_gsc', 'analyze', 'render'], 'run': notify}
+}
+
+
+def get_webhook_url():
+    """설정된 Slack 웹훅 주소 (기본값 그대로면 None)"""
+    webhook_url = config.SLACK_SETTINGS.get('webhook_url', '')
+    return webhook_url if webhook_url.startswith(('https://', 'http://')) else None
+
+
+def get_alert_state_path():
+    """알림 쿨다운 상태 파일 경로 (체크포인트 디렉터리, 실행 간 공유)"""
+    return os.path.join(config.PIPELINE_SETTINGS['checkpoint_dir'], 'alert_state.json')
+
+
+def get_checkpoint_path(run_id, stage):
+    """단계 결과 저장 경로 ({checkpoint_dir}/{run_id}/{stage}.pkl)"""
+    return os.path.join(config.PIPELINE_SETTINGS['checkpoint_dir'], run_id, f"{stage}.pkl")
+
+
+def save_checkpoint(run_id, stage, output):
+    """단계 결과 저장 (임시 파일에 쓴 뒤 교체)"""
+    path = get_checkpoint_path(run_id, stage)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(output, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoints(run_id, stages):
+    """저장된 단계 결과 불러오기 (읽을 수 없는 파일은 다시 실행)"""
+    outputs = {}
+    for stage in stages:
+        path = get_checkpoint_path(run_id, stage)
+        if not os.path.exists(path):
+            continue
+        
+        try:
+            with open(path, 'rb') as f:
+                outputs[stage] = pickle.load(f)
+        except Exception as e:
+            print(f"⚠️ {stage} 체크포인트를 읽을 수 없어 다시 실행합니다: {e}")
+    
+    return outputs
+
+
+def run_pipeline(start_date=None, end_date=None, run_id=None, fresh=False, max_workers=None):
+    """단계 DAG 실행
+    
+    선행 단계가 모두 끝난 단계는 동시에 실행하고, 성공한 단계 결과는 체크포인트로 저장.
+    같은 run_id(기본값: 수집 기간)로 다시 실행하면 저장된 단계는 건너뛰고 실패/미실행 단계부터 재개.
+    fresh=True면 저장된 결과를 무시하고 처음부터 실행
+    반환값: {'run_id', 'outputs': {단계: 결과}, 'errors': {단계: 오류}, 'timings': {단계: 초},
+             'resumed': [체크포인트에서 불러온 단계], 'skipped': [선행 단계 실패로 실행하지 않은 단계]}
+    """
+    start_date, end_date = get_date_range(start_date, end_date)
+    run_id = run_id or f"{start_date}_{end_date}"
+    max_workers = max_workers or config.PIPELINE_SETTINGS['max_workers']
+    # 알림 단계와 단계 실패 알림이 함께 쓰는 발송 대기열 (실패 알림이 다음 단계 실행을 막지 않음)
+    slack_queue = slack_notifier.SlackSendQueue() if get_webhook_url() else None
+    context = {'run_id': run_id, 'start_date': start_date, 'end_date': end_date, 'slack_queue': slack_queue}
+    
+    outputs = {} if fresh else load_checkpoints(run_id, STAGES)
+    resumed = list(outputs)
+    if resumed:
+        print(f"체크포인트에서 재개 ({run_id}): {', '.join(resumed)}")
+    
+    pending = [stage for stage in STAGES if stage not in outputs]
+    errors = {}
+    timings = {}
+    
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            running = {}
+            while True:
+                for stage in list(pending):
+                    deps = STAGES[stage]['deps']
+                    if all(dep in outputs for dep in deps):
+                        pending.remove(stage)
+                        inputs = {dep: outputs[dep] for dep in deps}
+                        running[executor.submit(_run_stage, stage, context, inputs)] = stage
+                
+                if not running:
+                    break
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    try:
+                        outputs[stage], timings[stage] = future.result()
+                        save_checkpoint(run_id, stage, outputs[stage])
+                        print(f"✓ {stage} ({timings[stage]:.1f}초)")
+                    except Exception as e:
+                        errors[stage] = str(e)
+                        print(f"✗ {stage} 실패: {e}")
+                        _notify_failure(stage, e, context)
+    finally:
+        if slack_queue is not None:
+            slack_queue.close()
+    
+    if config.METRICS_SETTINGS['enabled']:
+        print(f"측정 결과 저장: {', '.join(instrumentation.write_metrics())}")
+    
+    if pending:
+        print(f"⚠️ 선행 단계 실패로 실행하지 않은 단계: {', '.join(pending)} (같은 기간으로 다시 실행하면 재개)")
+    
+    return {
+        'run_id': run_id,
+        'outputs': outputs,
+        'errors': errors,
+        'timings': timings,
+        'resumed': resumed,
+        'skipped': pending
+    }
+
+
+def _run_stage(stage, context, inputs):
+    start = time.perf_counter()
+    with instrumentation.measure(f"pipeline.{stage}", 'stage') as span:
+        output = STAGES[stage]['run'](context, inputs)
+        span['rows'] = instrumentation.count_rows(output)
+    return output, time.perf_counter() - start
+
+
+def _notify_failure(stage, error, context):
+    """단계 실패 시 Slack 오류 알림을 발송 대기열에 추가 (알림 단계 자체의 실패는 제외)"""
+    webhook_url = get_webhook_url()
+    queue = context.get('slack_queue')
+    if webhook_url is None or queue is None or stage == 'notify':
+        return
+    
+    queue.submit(webhook_url, *slack_notifier.build_error_message(str(error), stage))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='주간 보고서 파이프라인 실행')
+    parser.add_argument('--start-date', help='수집 시작일 (YYYY-MM-DD)')
+    parser.add_argument('--end-date', help='수집 종료일 (YYYY-MM-DD)')
+    parser.add_argument('--run-id', help='체크포인트 이름 (기본값: 수집 기간)')
+    parser.add_argument('--fresh', action='store_true', help='저장된 체크포인트를 무시하고 처음부터 실행')
+    args = parser.parse_args()
+    
+    result = run_pipeline(args.start_date, args.end_date, run_id=args.run_id, fresh=args.fresh)
+    print(f"완료: {len(result['outputs'])}/{len(STAGES)}단계, 실패 {len(result['errors'])}개")
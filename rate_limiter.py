@@ -0,0 +1,203 @@
+"""
+GA4 / Search Console API 호출 속도 제한 모듈
+GA4 속성별 남은 토큰 추적, Search Console 사이트별 토큰 버킷, 지터를 둔 지수 백오프 재시도
+"""
+
+import time
+import random
+import threading
+from google.api_core import exceptions as api_exceptions
+from googleapiclient.errors import HttpError
+import config
+
+
+# 재시도할 GA4 오류 (할당량 초과, 일시적 서버 오류)
+GA4_RETRYABLE_ERRORS = (
+    api_exceptions.ResourceExhausted,
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.InternalServerError,
+    api_exceptions.DeadlineExceeded
+)
+
+# 재시도할 Search Console HTTP 상태 코드
+GSC_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 capacity개까지 쌓이는 토큰 버킷"""
+    
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """토큰 하나를 얻을 때까지 대기"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                wait_seconds = (1 - self.tokens) / self.rate
+            
+            time.sleep(wait_seconds)
+
+
+class Ga4QuotaTracker:
+    """GA4 응답의 property_quota로 속성별 남은 토큰을 추적하고 호출 간격을 조절
+    
+    남은 시간당/일일 토큰이 한도의 일정 비율 아래로 떨어지면
+    남은 토큰으로 가능한 호출 수에 맞춰 호출 간격을 늘려 할당량 초과 오류를 피함
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.remaining = {}       # 속성 → {'tokens_per_hour': n, 'tokens_per_day': n}
+        self.cost = {}            # 속성 → 요청당 평균 소모 토큰 (EWMA)
+        self.next_call_at = {}    # 속성 → 다음 호출 가능 시각
+        self.semaphores = {}      # 속성 → 동시 요청 수 제한
+    
+    def get_semaphore(self, property_name):
+        with self.lock:
+            if property_name not in self.semaphores:
+                limit = config.RATE_LIMIT_SETTINGS['ga4_concurrent_requests']
+                self.semaphores[property_name] = threading.BoundedSemaphore(limit)
+            return self.semaphores[property_name]
+    
+    def wait_for_turn(self, property_name):
+        """호출 간격이 필요하면 대기"""
+        with self.lock:
+            now = time.monotonic()
+            start_at = max(now, self.next_call_at.get(property_name, now))
+            self.next_call_at[property_name] = start_at + self._get_pacing_interval(property_name)
+        
+        if start_at > now:
+            time.sleep(start_at - now)
+    
+    def _get_pacing_interval(self, property_name):
+        settings = config.RATE_LIMIT_SETTINGS
+        remaining = self.remaining.get(property_name)
+        if not remaining:
+            return 0
+        
+        cost = max(self.cost.get(property_name, 1), 1)
+        interval = 0
+        for key, limit, window_seconds in (
+            ('tokens_per_hour', settings['ga4_tokens_per_hour'], 60 * 60),
+            ('tokens_per_day', settings['ga4_tokens_per_day'], 24 * 60 * 60)
+        ):
+            left = remaining.get(key)
+            if left is None or left >= limit * settings['ga4_pacing_threshold']:
+                continue
+            
+            # 남은 토큰으로 가능한 호출 수만큼 창(window) 안에 고르게 분산
+            calls_left = max(left / cost, 1)
+            interval = max(interval, window_seconds / calls_left)
+        
+        return interval
+    
+    def record(self, property_name, property_quota):
+        """응답의 property_quota 기록"""
+        if property_quota is None or not property_quota.tokens_per_hour:
+            return
+        
+        with self.lock:
+            self.remaining[property_name] = {
+                'tokens_per_hour': property_quota.tokens_per_hour.remaining,
+                'tokens_per_day': property_quota.tokens_per_day.remaining
+            }
+            
+            consumed = property_quota.tokens_per_hour.consumed
+            previous = self.cost.get(property_name)
+            self.cost[property_name] = consumed if previous is None else 0.8 * previous + 0.2 * consumed
+    
+    def get_remaining(self, property_name):
+        """속성의 마지막으로 확인된 남은 토큰"""
+        with self.lock:
+            return dict(self.remaining.get(property_name, {}))
+
+
+_ga4_quota = Ga4QuotaTracker()
+_gsc_buckets = {}
+_gsc_lock = threading.Lock()
+
+
+def get_backoff_delay(attempt):
+    """지수 백오프 대기 시간 (full jitter)"""
+    settings = config.RATE_LIMIT_SETTINGS
+    ceiling = min(settings['max_delay'], settings['base_delay'] * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+def call_with_backoff(func, is_retryable, description=''):
+    """재시도 가능한 오류가 나면 지수 백오프로 다시 호출"""
+    max_retries = config.RATE_LIMIT_SETTINGS['max_retries']
+    
+    for attempt in range(max_retries + 1):
+        try:
+            return func()
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            
+            delay = get_backoff_delay(attempt)
+            print(f"⚠️ {description} 재시도 {attempt + 1}/{max_retries} ({delay:.1f}초 후): {e}")
+            time.sleep(delay)
+
+
+def is_ga4_retryable(error):
+    return isinstance(error, GA4_RETRYABLE_ERRORS)
+
+
+def is_gsc_retryable(error):
+    return isinstance(error, HttpError) and error.resp.status in GSC_RETRYABLE_STATUS
+
+
+def call_ga4(property_name, func):
+    """GA4 호출 (속성별 동시 요청 수/호출 간격 제한 + 재시도)
+    
+    func()의 결과에서 property_quota를 기록하는 것은 호출하는 쪽에서 record_ga4_quota로 처리
+    """
+    def attempt():
+        _ga4_quota.wait_for_turn(property_name)
+        with _ga4_quota.get_semaphore(property_name):
+            return func()
+    
+    return call_with_backoff(attempt, is_ga4_retryable, f"GA4 {property_name}")
+
+
+def record_ga4_quota(property_name, property_quota):
+    """GA4 응답의 남은 할당량 기록"""
+    _ga4_quota.record(property_name, property_quota)
+
+
+def get_ga4_remaining_tokens(property_name):
+    """속성의 마지막으로 확인된 남은 토큰 ({'tokens_per_hour': n, 'tokens_per_day': n})"""
+    return _ga4_quota.get_remaining(property_name)
+
+
+def get_gsc_bucket(site_url):
+    """사이트별 토큰 버킷 반환"""
+    with _gsc_lock:
+        if site_url not in _gsc_buckets:
+            settings = config.RATE_LIMIT_SETTINGS
+            _gsc_buckets[site_url] = TokenBucket(settings['gsc_qps'], settings['gsc_burst'])
+        return _gsc_buckets[site_url]
+
+
+def call_gsc(site_url, func):
+    """Search Console 호출 (사이트별 초당 요청 수 제한 + 재시도)"""
+    bucket = get_gsc_bucket(site_url)
+    
+    def attempt():
+        bucket.acquire()
+        return func()
+    
+    return call_with_backoff(attempt, is_gsc_retryable, f"Search Console {site_url}")
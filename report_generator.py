@@ -1,59 +1,117 @@
 """
 Excel 보고서 생성 모듈
-데이터 시각화 및 포맷팅 포함
+데이터 시각화 및 포맷팅 포함, Parquet / 압축 CSV / 정적 HTML 출력 지원
 """
 
+import os
+import re
+import html
+from abc import ABC, abstractmethod
 import pandas as pd
 from datetime import datetime
 import openpyxl
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from openpyxl.chart import BarChart, LineChart, PieChart, Reference
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+from instrumentation import instrument
+import data_analyzer
 import config
 
 
+SUMMARY_SHEET_NAME = '📊 주간 성과 요약'
+
+# 요약 시트에서 섹션 제목으로 강조할 표시
+SECTION_MARKERS = ('📊', '🔍', '💡')
+
+# 색상 정의
+HEADER_FILL = PatternFill(start_color='366092', end_color='366092', fill_type='solid')
+SUMMARY_FILL = PatternFill(start_color='E7F3FF', end_color='E7F3FF', fill_type='solid')
+
+# 폰트 정의
+HEADER_FONT = Font(color='FFFFFF', bold=True, size=12)
+TITLE_FONT = Font(bold=True, size=14)
+
+HEADER_ALIGNMENT = Alignment(horizontal='center', vertical='center')
+
+# 테두리 정의
+THIN_BORDER = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+
+MAX_COLUMN_WIDTH = 50
+
+# 스트리밍 쓰기 시 한 번에 변환할 행 수
+EXCEL_WRITE_CHUNK_ROWS = 50000
+
+# Excel 시트 하나의 최대 데이터 행 수 (1,048,576행 - 헤더 1행)
+EXCEL_MAX_ROWS = 1048575
+
+# Excel 시트 이름 최대 길이
+EXCEL_SHEET_NAME_LENGTH = 31
+
+
+@instrument('render')
 def create_excel_report(utm_summary, channel_summary, landing_summary, 
-                       search_analysis, performance_summary, insights):
+                       search_analysis, performance_summary, insights, filename=None):
     """종합 Excel 보고서 생성"""
     
-    filename = f"{config.REPORT_SETTINGS['output_filename'][:-5]}_{datetime.now().strftime('%Y%m%d')}.xlsx"
+    filename = filename or get_report_filename()
     
-    with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-        
+    tables = build_report_tables(
+        utm_summary, channel_summary, landing_summary,
+        search_analysis, performance_summary, insights
+    )
+    
+    # 스타일/차트를 행을 쓰면서 함께 적용 (파일을 다시 읽어 서식을 입히지 않음)
+    # 행 수 한도를 넘는 시트는 여러 시트로 나눠 기록
+    ExcelBackend().write(tables, filename)
+    
+    return filename
+
+
+def build_report_tables(utm_summary, channel_summary, landing_summary,
+                        search_analysis, performance_summary, insights):
+    """보고서 시트 이름 → DataFrame (시트 순서대로)"""
+    
+    tables = {
         # 1. 요약 시트
-        create_summary_sheet(writer, performance_summary, insights)
-        
+        SUMMARY_SHEET_NAME: build_summary_table(performance_summary, insights),
         # 2. UTM 캠페인 성과
-        utm_summary.to_excel(writer, sheet_name='UTM 캠페인 성과', index=False)
-        
+        'UTM 캠페인 성과': utm_summary,
         # 3. 채널별 성과
-        channel_summary.to_excel(writer, sheet_name='채널별 성과', index=False)
-        
+        '채널별 성과': channel_summary,
         # 4. 랜딩 페이지 성과
-        landing_summary.to_excel(writer, sheet_name='랜딩 페이지 성과', index=False)
-        
+        '랜딩 페이지 성과': landing_summary,
         # 5. 검색 키워드 성과
-        search_analysis['top_keywords'].to_excel(writer, sheet_name='검색 키워드', index=False)
-        
-        # 6. SEO 기회 분석
-        if len(search_analysis['low_ctr_opportunities']) > 0:
-            search_analysis['low_ctr_opportunities'].to_excel(
-                writer, sheet_name='SEO 개선 기회', index=False
-            )
-        
-        # 7. 고성과 키워드
-        if len(search_analysis['high_ctr_keywords']) > 0:
-            search_analysis['high_ctr_keywords'].to_excel(
-                writer, sheet_name='고성과 키워드', index=False
-            )
+        '검색 키워드': search_analysis['top_keywords']
+    }
     
-    # 스타일링 적용
-    apply_excel_formatting(filename)
+    # 6. SEO 기회 분석
+    if len(search_analysis['low_ctr_opportunities']) > 0:
+        tables['SEO 개선 기회'] = search_analysis['low_ctr_opportunities']
     
-    return filename
+    # 7. 고성과 키워드
+    if len(search_analysis['high_ctr_keywords']) > 0:
+        tables['고성과 키워드'] = search_analysis['high_ctr_keywords']
+    
+    return tables
 
 
-def create_summary_sheet(writer, performance_summary, insights):
-    """요약 시트 생성"""
+def get_report_filename(suffix=None):
+    """보고서 파일 이름 반환 (예: weekly_utm_report_brand_a_20240101.xlsx)"""
+    base = config.REPORT_SETTINGS['output_filename'][:-5]
+    if suffix:
+        base = f"{base}_{suffix}"
+    
+    return f"{base}_{datetime.now().strftime('%Y%m%d')}.xlsx"
+
+
+def build_summary_table(performance_summary, insights):
+    """요약 시트 DataFrame 생성"""
     
     # 성과 요약 DataFrame 생성
     utm_perf = performance_summary['utm_performance']
@@ -81,136 +139,335 @@ def create_summary_sheet(writer, performance_summary, insights):
     for insight in insights:
         summary_data.append([insight, ''])
     
-    summary_df = pd.DataFrame(summary_data, columns=['항목', '값'])
-    summary_df.to_excel(writer, sheet_name='📊 주간 성과 요약', index=False)
+    return pd.DataFrame(summary_data, columns=['항목', '값'])
 
 
-def apply_excel_formatting(filename):
-    """Excel 파일 스타일링 적용"""
+def build_campaign_chart(ws, max_row):
+    """세션 기준 상위 10개 캠페인 바차트 (UTM 캠페인 성과 시트)"""
+    chart = BarChart()
+    chart.title = "상위 10개 캠페인 세션 수"
+    chart.x_axis.title = "캠페인"
+    chart.y_axis.title = "세션"
     
-    wb = openpyxl.load_workbook(filename)
+    # 데이터 범위 (상위 10개만)
+    max_rows = min(max_row, 11)
+    data = Reference(ws, min_col=5, min_row=1, max_row=max_rows)  # Sessions 열
+    cats = Reference(ws, min_col=1, min_row=2, max_row=max_rows)  # Campaign 열
     
-    # 색상 정의
-    header_fill = PatternFill(start_color='366092', end_color='366092', fill_type='solid')
-    summary_fill = PatternFill(start_color='E7F3FF', end_color='E7F3FF', fill_type='solid')
+    chart.add_data(data, titles_from_data=True)
+    chart.set_categories(cats)
     
-    # 폰트 정의
-    header_font = Font(color='FFFFFF', bold=True, size=12)
-    title_font = Font(bold=True, size=14)
+    return chart, "I2"
+
+
+def build_channel_chart(ws, max_row):
+    """채널별 세션 점유율 파이차트 (채널별 성과 시트)"""
+    chart = PieChart()
+    chart.title = "채널별 세션 점유율"
     
-    # 테두리 정의
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
+    data = Reference(ws, min_col=3, min_row=1, max_row=max_row)  # Sessions 열
+    cats = Reference(ws, min_col=1, min_row=2, max_row=max_row)  # Channel 열
+    
+    chart.add_data(data, titles_from_data=True)
+    chart.set_categories(cats)
     
-    for sheet_name in wb.sheetnames:
-        ws = wb[sheet_name]
+    return chart, "G2"
+
+
+# 시트 이름 → 차트 생성 함수 (시트, 마지막 행 번호) → (차트, 위치)
+SHEET_CHARTS = {
+    'UTM 캠페인 성과': build_campaign_chart,
+    '채널별 성과': build_channel_chart
+}
+
+
+@instrument('render')
+def write_excel_report(tables, filename):
+    """시트별 DataFrame을 write-only 모드로 한 번에 기록
+    
+    헤더/요약 시트 스타일과 차트는 행을 쓰면서 함께 지정하고, 열 너비는 벡터 연산으로 미리 계산
+    (파일을 저장한 뒤 다시 읽어 셀마다 서식을 입히지 않음)
+    """
+    wb = openpyxl.Workbook(write_only=True)
+    
+    for sheet_name, df in tables.items():
+        ws = wb.create_sheet(title=sheet_name)
         
-        # 헤더 스타일링
-        if ws.max_row > 0:
-            for cell in ws[1]:
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-                cell.border = thin_border
+        # write-only 모드에서는 행을 쓰기 전에 열 너비를 지정해야 함
+        for column_index, width in enumerate(get_column_widths(df), start=1):
+            ws.column_dimensions[get_column_letter(column_index)].width = width
         
-        # 요약 시트 특별 처리
-        if '요약' in sheet_name:
-            for row_num in range(1, ws.max_row + 1):
-                cell_a = ws[f'A{row_num}']
-                cell_b = ws[f'B{row_num}']
-                
-                # 섹션 제목 스타일링
-                if cell_a.value and ('📊' in str(cell_a.value) or '🔍' in str(cell_a.value) or '💡' in str(cell_a.value)):
-                    cell_a.font = title_font
-                    cell_a.fill = summary_fill
-                
-                # 테두리 적용
-                cell_a.border = thin_border
-                cell_b.border = thin_border
+        ws.append([_styled_cell(ws, column, HEADER_FONT, HEADER_FILL, HEADER_ALIGNMENT) for column in df.columns])
+        
+        if sheet_name == SUMMARY_SHEET_NAME:
+            _write_summary_rows(ws, df)
+        else:
+            _write_rows(ws, df)
         
-        # 열 너비 자동 조정
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
-    
-    # 차트 추가 (상위 3개 시트에만)
-    add_charts_to_workbook(wb)
+        try:
+            if sheet_name in SHEET_CHARTS and len(df) > 0:
+                chart, anchor = SHEET_CHARTS[sheet_name](ws, len(df) + 1)
+                ws.add_chart(chart, anchor)
+        except Exception as e:
+            print(f"차트 생성 중 오류 발생: {e}")
     
     wb.save(filename)
+    
+    return filename
 
 
-def add_charts_to_workbook(wb):
-    """워크북에 차트 추가"""
-    
-    try:
-        # UTM 캠페인 성과 시트에 차트 추가
-        if 'UTM 캠페인 성과' in wb.sheetnames:
-            ws = wb['UTM 캠페인 성과']
-            
-            if ws.max_row > 1:
-                # 세션 기준 상위 10개 캠페인 바차트
-                chart = BarChart()
-                chart.title = "상위 10개 캠페인 세션 수"
-                chart.x_axis.title = "캠페인"
-                chart.y_axis.title = "세션"
-                
-                # 데이터 범위 (상위 10개만)
-                max_rows = min(ws.max_row, 11)
-                data = Reference(ws, min_col=5, min_row=1, max_row=max_rows)  # Sessions 열
-                cats = Reference(ws, min_col=1, min_row=2, max_row=max_rows)  # Campaign 열
-                
-                chart.add_data(data, titles_from_data=True)
-                chart.set_categories(cats)
-                
-                ws.add_chart(chart, "I2")
+def get_column_widths(df):
+    """열별 너비 (헤더와 값의 문자열 길이 중 최댓값 + 2, 최대 MAX_COLUMN_WIDTH)"""
+    widths = []
+    for column in df.columns:
+        max_length = len(str(column))
+        if len(df) > 0:
+            values = df[column]
+            lengths = values.astype(str).str.len().where(values.notna(), 0)
+            max_length = max(max_length, int(lengths.max()))
+        widths.append(min(max_length + 2, MAX_COLUMN_WIDTH))
+    
+    return widths
+
+
+def _styled_cell(ws, value, font=None, fill=None, alignment=None):
+    """write-only 시트용 스타일 셀 생성"""
+    cell = WriteOnlyCell(ws, value=value)
+    cell.border = THIN_BORDER
+    if font:
+        cell.font = font
+    if fill:
+        cell.fill = fill
+    if alignment:
+        cell.alignment = alignment
+    return cell
+
+
+def _iter_row_chunks(df):
+    """DataFrame을 EXCEL_WRITE_CHUNK_ROWS행씩 파이썬 값 목록으로 변환 (결측값은 빈 셀)"""
+    for start in range(0, len(df), EXCEL_WRITE_CHUNK_ROWS):
+        chunk = df.iloc[start:start + EXCEL_WRITE_CHUNK_ROWS].astype(object)
+        yield chunk.where(chunk.notna(), None).to_numpy().tolist()
+
+
+def _write_rows(ws, df):
+    """데이터 행 기록 (스타일 없음)"""
+    for rows in _iter_row_chunks(df):
+        for row in rows:
+            ws.append(row)
+
+
+def _write_summary_rows(ws, df):
+    """요약 시트 행 기록 (모든 셀 테두리, 섹션 제목 강조)"""
+    for rows in _iter_row_chunks(df):
+        for row in rows:
+            is_section = bool(row[0]) and any(marker in str(row[0]) for marker in SECTION_MARKERS)
+            ws.append([
+                _styled_cell(ws, value, TITLE_FONT, SUMMARY_FILL) if is_section and index == 0
+                else _styled_cell(ws, value)
+                for index, value in enumerate(row)
+            ])
+
+
+def split_table(df, max_rows):
+    """DataFrame을 max_rows행씩 나눈 목록 (빈 DataFrame은 그대로 한 개)"""
+    if len(df) <= max_rows:
+        return [df]
+    
+    return [df.iloc[start:start + max_rows] for start in range(0, len(df), max_rows)]
+
+
+def get_safe_filename(name):
+    """시트 이름을 파일 이름으로 쓸 수 있게 변환 (문자/숫자/한글 외에는 '_')"""
+    return re.sub(r'[^\w]+', '_', name).strip('_') or 'table'
+
+
+# 정적 HTML 출력 페이지 틀
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="ko">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 24px; }}
+table.report {{ border-collapse: collapse; font-size: 13px; }}
+table.report th {{ background: #366092; color: #fff; padding: 6px 10px; position: sticky; top: 0; }}
+table.report td {{ border: 1px solid #ddd; padding: 4px 10px; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+{body}
+</body>
+</html>
+"""
+
+
+class ReportBackend(ABC):
+    """보고서 출력 형식 공통 인터페이스
+    
+    write(tables, path): 시트 이름 → DataFrame을 path에 기록하고 생성한 파일 경로 목록 반환
+    """
+    
+    extension = ''
+    
+    def get_output_path(self, base_name):
+        """확장자가 없는 보고서 이름으로 출력 경로 반환"""
+        return f"{base_name}{self.extension}"
+    
+    @abstractmethod
+    def write(self, tables, path):
+        """tables를 path에 기록하고 생성한 파일 경로 목록 반환"""
+
+
+class ExcelBackend(ReportBackend):
+    """단일 .xlsx (행 수 한도를 넘는 시트는 '이름 (2)', '이름 (3)' ... 시트로 분할)"""
+    
+    extension = '.xlsx'
+    
+    def __init__(self, max_rows=EXCEL_MAX_ROWS):
+        self.max_rows = max_rows
+    
+    def write(self, tables, path):
+        sheets = {}
+        for sheet_name, df in tables.items():
+            for part, part_df in enumerate(split_table(df, self.max_rows), start=1):
+                if part == 1:
+                    sheets[sheet_name] = part_df
+                else:
+                    suffix = f" ({part})"
+                    sheets[sheet_name[:EXCEL_SHEET_NAME_LENGTH - len(suffix)] + suffix] = part_df
         
-        # 채널별 성과 시트에 파이차트 추가
-        if '채널별 성과' in wb.sheetnames:
-            ws = wb['채널별 성과']
-            
-            if ws.max_row > 1:
-                chart = PieChart()
-                chart.title = "채널별 세션 점유율"
-                
-                data = Reference(ws, min_col=3, min_row=1, max_row=ws.max_row)  # Sessions 열
-                cats = Reference(ws, min_col=1, min_row=2, max_row=ws.max_row)  # Channel 열
-                
-                chart.add_data(data, titles_from_data=True)
-                chart.set_categories(cats)
+        write_excel_report(sheets, path)
+        
+        return [path]
+
+
+class DirectoryBackend(ReportBackend):
+    """시트마다 파일을 만드는 출력 형식 공통 처리 (보고서 이름의 디렉터리에 기록)"""
+    
+    file_extension = ''
+    
+    def __init__(self, max_rows_per_file=None):
+        self.max_rows_per_file = max_rows_per_file
+    
+    def get_output_path(self, base_name):
+        return base_name
+    
+    def write(self, tables, path):
+        os.makedirs(path, exist_ok=True)
+        
+        paths = []
+        for sheet_name, df in tables.items():
+            parts = split_table(df, self.max_rows_per_file) if self.max_rows_per_file else [df]
+            for part, part_df in enumerate(parts, start=1):
+                name = get_safe_filename(sheet_name)
+                if len(parts) > 1:
+                    name = f"{name}_part{part}"
                 
-                ws.add_chart(chart, "G2")
+                file_path = os.path.join(path, f"{name}{self.file_extension}")
+                self.write_table(sheet_name, part_df, file_path)
+                paths.append(file_path)
+        
+        return paths
+    
+    @abstractmethod
+    def write_table(self, sheet_name, df, file_path):
+        """시트 하나(또는 분할된 일부)를 file_path에 기록"""
+
+
+class ParquetBackend(DirectoryBackend):
+    """시트별 Parquet 파일 (분할 없이 한 파일, 다른 도구에서 바로 읽기용)"""
+    
+    file_extension = '.parquet'
+    
+    def write_table(self, sheet_name, df, file_path):
+        df.to_parquet(file_path, index=False)
+
+
+class CsvBackend(DirectoryBackend):
+    """시트별 gzip 압축 CSV (csv_max_rows_per_file행마다 파일 분할)"""
+    
+    file_extension = '.csv.gz'
+    
+    def __init__(self, max_rows_per_file=None):
+        super().__init__(max_rows_per_file or config.REPORT_SETTINGS['csv_max_rows_per_file'])
+    
+    def write_table(self, sheet_name, df, file_path):
+        df.to_csv(file_path, index=False, compression='gzip', encoding='utf-8')
+
+
+class HtmlBackend(DirectoryBackend):
+    """시트별 정적 HTML + 목차(index.html) (html_max_rows_per_file행마다 파일 분할)"""
+    
+    file_extension = '.html'
+    
+    def __init__(self, max_rows_per_file=None):
+        super().__init__(max_rows_per_file or config.REPORT_SETTINGS['html_max_rows_per_file'])
+    
+    def write(self, tables, path):
+        paths = super().write(tables, path)
+        
+        links = ''.join(
+            f'<li><a href="{os.path.basename(file_path)}">{html.escape(os.path.basename(file_path))}</a></li>'
+            for file_path in paths
+        )
+        index_path = os.path.join(path, 'index.html')
+        with open(index_path, 'w', encoding='utf-8') as f:
+            f.write(HTML_TEMPLATE.format(title='보고서 목차', body=f'<ul>{links}</ul>'))
+        
+        return [index_path] + paths
+    
+    def write_table(self, sheet_name, df, file_path):
+        table = df.to_html(index=False, na_rep='', border=0, classes='report')
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(HTML_TEMPLATE.format(
+                title=html.escape(sheet_name),
+                body=f'<p><a href="index.html">목차</a> · {len(df):,}행</p>{table}'
+            ))
+
+
+# 출력 형식 이름 → 백엔드 클래스
+BACKENDS = {
+    'excel': ExcelBackend,
+    'parquet': ParquetBackend,
+    'csv': CsvBackend,
+    'html': HtmlBackend
+}
+
+
+@instrument('render')
+def write_report(tables, formats=None, base_name=None):
+    """보고서 시트들을 여러 형식으로 출력
+    
+    tables: 시트 이름 → DataFrame (build_report_tables 결과 등)
+    formats: BACKENDS 이름 목록 (기본값: REPORT_SETTINGS['output_formats'])
+    base_name: 확장자 없는 출력 이름 (기본값: get_report_filename()에서 확장자 제외)
+    반환값: {형식: [생성한 파일 경로]}
+    """
+    formats = formats or config.REPORT_SETTINGS['output_formats']
+    base_name = base_name or os.path.splitext(get_report_filename())[0]
+    
+    outputs = {}
+    for output_format in formats:
+        backend = BACKENDS[output_format]()
+        outputs[output_format] = backend.write(tables, backend.get_output_path(base_name))
     
-    except Exception as e:
-        print(f"차트 생성 중 오류 발생: {e}")
+    return outputs
 
 
+@instrument('render')
 def create_quick_summary_report(utm_data, gsc_data):
-    """간단한 요약 보고서 생성 (테스트용)"""
+    """간단한 요약 보고서 생성 (테스트용, utm_data: DataFrame 또는 AggregationCube)"""
     
     filename = f"quick_report_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
     
     with pd.ExcelWriter(filename, engine='openpyxl') as writer:
         
         # UTM 데이터 요약
-        utm_summary = utm_data.groupby(['Campaign', 'Source', 'Medium']).agg({
-            'Sessions': 'sum',
-            'Users': 'sum',
-            'Conversions': 'sum'
-        }).sort_values('Sessions', ascending=False).reset_index()
+        utm_summary = data_analyzer.as_cube(utm_data).rollup(
+            ['Campaign', 'Source', 'Medium'], ['Sessions', 'Users', 'Conversions']
+        ).sort_values('Sessions', ascending=False).reset_index(drop=True)
         
         utm_summary.to_excel(writer, sheet_name='UTM 요약', index=False)
         
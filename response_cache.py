@@ -0,0 +1,148 @@
+"""
+API 응답 디스크 캐시
+GA4 / Search Console 요청별 응답을 TTL과 용량 제한(LRU)을 두고 저장
+"""
+
+import os
+import json
+import time
+import pickle
+import hashlib
+import threading
+from datetime import datetime
+import config
+
+
+CACHE_FILE_SUFFIX = '.cache'
+
+_lock = threading.Lock()
+
+
+def make_cache_key(api, target, request):
+    """캐시 키 생성 (API 종류 + 속성/사이트 + 정규화된 요청 본문의 해시)
+    
+    API 주소를 바꾼 경우(가짜 서버 등) 주소도 키에 포함해 실제 API 응답과 섞이지 않게 함
+    """
+    key = {'api': api, 'target': target, 'request': request}
+    endpoint = config.API_ENDPOINTS.get(api)
+    if endpoint:
+        key['endpoint'] = endpoint
+    
+    canonical = json.dumps(key, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def get_ttl(end_date):
+    """데이터 기간의 종료일 기준 TTL(초) 반환
+    
+    - 최근 며칠이 포함된 기간: 아직 집계 중이므로 짧게
+    - 마감된 기간(지난주 이전): 거의 바뀌지 않으므로 길게
+    """
+    settings = config.CACHE_SETTINGS
+    data_age_days = (datetime.now() - datetime.strptime(end_date, '%Y-%m-%d')).days
+    
+    if data_age_days < settings['recent_days']:
+        return settings['ttl_recent_seconds']
+    if data_age_days < settings['closed_after_days']:
+        return settings['ttl_default_seconds']
+    return settings['ttl_closed_seconds']
+
+
+def _get_cache_path(key):
+    return os.path.join(config.CACHE_SETTINGS['cache_dir'], key + CACHE_FILE_SUFFIX)
+
+
+def get(key):
+    """캐시된 응답 반환 (없거나 만료되었으면 None)"""
+    if not config.CACHE_SETTINGS['enabled']:
+        return None
+    
+    path = _get_cache_path(key)
+    try:
+        with open(path, 'rb') as f:
+            entry = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    
+    if entry['expires_at'] < time.time():
+        _remove(path)
+        return None
+    
+    # 최근 사용 시각 갱신 (LRU 제거 순서 기준)
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    
+    return entry['payload']
+
+
+def put(key, payload, ttl):
+    """응답 저장 후 전체 용량이 상한을 넘으면 오래 사용하지 않은 항목부터 제거"""
+    if not config.CACHE_SETTINGS['enabled']:
+        return
+    
+    cache_dir = config.CACHE_SETTINGS['cache_dir']
+    os.makedirs(cache_dir, exist_ok=True)
+    
+    path = _get_cache_path(key)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump({'expires_at': time.time() + ttl, 'payload': payload}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    
+    evict()
+
+
+def evict(max_bytes=None):
+    """용량 상한을 넘는 만큼 마지막 사용 시각이 오래된 항목부터 삭제"""
+    max_bytes = max_bytes or config.CACHE_SETTINGS['max_size_mb'] * 1024 * 1024
+    cache_dir = config.CACHE_SETTINGS['cache_dir']
+    
+    with _lock:
+        entries = []
+        total_size = 0
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(CACHE_FILE_SUFFIX):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total_size += stat.st_size
+        
+        if total_size <= max_bytes:
+            return
+        
+        entries.sort()
+        for _, size, path in entries:
+            _remove(path)
+            total_size -= size
+            if total_size <= max_bytes:
+                break
+
+
+def clear():
+    """캐시 전체 삭제"""
+    cache_dir = config.CACHE_SETTINGS['cache_dir']
+    if not os.path.isdir(cache_dir):
+        return
+    
+    for name in os.listdir(cache_dir):
+        if name.endswith(CACHE_FILE_SUFFIX):
+            _remove(os.path.join(cache_dir, name))
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+if __name__ == "__main__":
+    cache_dir = config.CACHE_SETTINGS['cache_dir']
+    if os.path.isdir(cache_dir):
+        files = [name for name in os.listdir(cache_dir) if name.endswith(CACHE_FILE_SUFFIX)]
+        size = sum(os.path.getsize(os.path.join(cache_dir, name)) for name in files)
+        print(f"캐시 항목: {len(files)}개, {size / 1024 / 1024:.1f}MB ({cache_dir})")
+    else:
+        print("캐시가 비어 있습니다")
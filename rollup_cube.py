@@ -0,0 +1,474 @@
+"""
+사전 집계 롤업 큐브
+Date × Channel_Group × Campaign × Source × Medium (GSC는 Date × Query × Page)의 그룹화 집합을
+차원 코드 배열 + 지표 배열로 미리 집계하고, 차원별 역색인으로 조각/상위 집계 질의를 원본 재스캔 없이 응답
+"""
+
+import time
+import argparse
+from itertools import combinations
+import numpy as np
+import pandas as pd
+from data_analyzer import SUM_METRICS, MEAN_METRICS
+from instrumentation import instrument
+import warehouse
+
+
+# 데이터셋별 큐브 정의
+# - weighted: 지표 → 가중치 지표 (가중 평균, 예: 노출 가중 평균 순위)
+# - ratios: 지표 → (분자, 분모) (합계의 비율, 예: CTR = 클릭 / 노출)
+# - non_additive: 지표 → 더할 수 없는 차원 (여러 날을 합친 사용자 수는 순 사용자 수가 아니므로 제외)
+CUBE_DEFINITIONS = {
+    'ga4': {
+        'dimensions': ['Date', 'Channel_Group', 'Campaign', 'Source', 'Medium'],
+        'sums': SUM_METRICS,
+        'means': MEAN_METRICS,
+        'weighted': {},
+        'ratios': {},
+        'non_additive': {'Users': 'Date'}
+    },
+    'gsc': {
+        'dimensions': ['Date', 'Query', 'Page'],
+        'sums': ['Clicks', 'Impressions'],
+        'means': [],
+        'weighted': {'Position': 'Impressions'},
+        'ratios': {'CTR': ('Clicks', 'Impressions')},
+        'non_additive': {}
+    }
+}
+
+# warehouse 데이터셋 → 큐브 정의
+DATASET_CUBES = {
+    'daily_campaign': 'ga4',
+    'daily_utm_trend': 'ga4',
+    'query_page_performance': 'gsc',
+    'search_performance': 'gsc',
+    'page_performance': 'gsc',
+    'daily_search_trend': 'gsc'
+}
+
+
+class GroupingSet:
+    """그룹화 집합 하나의 집계 결과
+    
+    그룹은 차원 코드 사전순으로 정렬되어 있어 결합 키로 이진 탐색 가능
+    차원별 역색인(코드 → 그룹 위치)은 처음 사용할 때 만들어 저장
+    결측 차원 값은 코드 -1로 유지 (상위 집합을 만들 때 합계가 빠지지 않도록), 조회 결과에서는 제외
+    """
+    
+    def __init__(self, dimensions, codes, values, sizes):
+        self.dimensions = tuple(dimensions)
+        self.codes = codes      # 차원 → 그룹별 코드 (int32)
+        self.values = values    # 지표 컬럼 → 그룹별 값
+        self.sizes = sizes      # 차원 → 고유값 수
+        self.keys = _combine_keys(
+            [codes[dimension] for dimension in dimensions], [sizes[dimension] for dimension in dimensions]
+        )
+        self._postings = {}
+    
+    def __len__(self):
+        return len(self.keys)
+    
+    @property
+    def nbytes(self):
+        arrays = list(self.codes.values()) + list(self.values.values()) + [self.keys]
+        for order, offsets in self._postings.values():
+            arrays += [order, offsets]
+        return sum(array.nbytes for array in arrays)
+    
+    def postings(self, dimension):
+        """차원의 역색인 (그룹 위치 배열, 코드별 시작 위치) - 코드 c의 그룹은 order[offsets[c + 1]:offsets[c + 2]]"""
+        if dimension not in self._postings:
+            codes = self.codes[dimension]
+            order = np.argsort(codes, kind='stable').astype(np.int64)
+            counts = np.bincount(codes + 1, minlength=self.sizes[dimension] + 1)
+            self._postings[dimension] = (order, np.concatenate([[0], np.cumsum(counts)]))
+        return self._postings[dimension]
+    
+    def select(self, conditions):
+        """모든 조건 {차원: 코드 목록}을 만족하는 그룹 위치 (오름차순)
+        
+        해당 그룹 수가 가장 적은 조건 하나만 역색인에서 꺼내고, 나머지 조건은 그 위치들의 코드로 걸러냄
+        """
+        if not conditions:
+            return np.arange(len(self))
+        
+        def count(dimension):
+            _, offsets = self.postings(dimension)
+            return sum(offsets[code + 2] - offsets[code + 1] for code in conditions[dimension])
+        
+        first = min(conditions, key=count)
+        order, offsets = self.postings(first)
+        parts = [order[offsets[code + 1]:offsets[code + 2]] for code in conditions[first]]
+        positions = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+        
+        for dimension, codes in conditions.items():
+            if dimension == first:
+                continue
+            allowed = np.zeros(self.sizes[dimension] + 1, dtype=bool)
+            allowed[np.asarray(codes, dtype=np.int64) + 1] = True
+            positions = positions[allowed[self.codes[dimension][positions] + 1]]
+        
+        return positions
+    
+    def locate(self, codes):
+        """차원별 코드 하나씩으로 그룹 위치 검색 (없으면 None)"""
+        key = _combine_keys(
+            [np.array([codes[dimension]]) for dimension in self.dimensions],
+            [self.sizes[dimension] for dimension in self.dimensions]
+        )[0]
+        position = int(np.searchsorted(self.keys, key))
+        
+        if position < len(self.keys) and self.keys[position] == key:
+            return position
+        return None
+
+
+class RollupCube:
+    """그룹화 집합별 사전 집계 + 조회
+    
+    grouping_sets를 지정하지 않으면 모든 차원 부분집합(2^차원 수)을 미리 집계
+    각 집합은 이미 만든 가장 작은 상위 집합에서 다시 묶어 만들므로 원본은 한 번만 읽음
+    평균 지표는 합계/개수, 가중 평균 지표는 (값 × 가중치) 합계로 저장해 어느 수준에서나 정확한 값을 계산
+    non_additive 지표는 결과 한 행이 해당 차원 값 여러 개를 합치는 질의(예: 여러 날의 Users)에서 제외
+    """
+    
+    def __init__(self, data, dimensions, sums, means=(), weighted=None, ratios=None, grouping_sets=None,
+                 non_additive=None):
+        self.dimensions = [column for column in dimensions if column in data.columns]
+        self.sums = [column for column in sums if column in data.columns]
+        self.means = [column for column in means if column in data.columns]
+        self.weighted = {
+            metric: weight for metric, weight in (weighted or {}).items()
+            if metric in data.columns and weight in self.sums
+        }
+        self.ratios = {
+            metric: (numerator, denominator) for metric, (numerator, denominator) in (ratios or {}).items()
+            if numerator in self.sums and denominator in self.sums
+        }
+        self.non_additive = {
+            metric: dimension for metric, dimension in (non_additive or {}).items()
+            if metric in self.sums and dimension in self.dimensions
+        }
+        
+        if grouping_sets is None:
+            grouping_sets = [
+                subset for size in range(len(self.dimensions) + 1)
+                for subset in combinations(self.dimensions, size)
+            ]
+        
+        self.labels, self.grouping_sets = build_grouping_sets(
+            data, self.dimensions, self.sums, self.means, self.weighted, grouping_sets
+        )
+        self.sizes = {dimension: len(labels) for dimension, labels in self.labels.items()}
+    
+    @property
+    def nbytes(self):
+        """집계 배열 + 역색인 메모리 (바이트)"""
+        return sum(grouping.nbytes for grouping in self.grouping_sets.values())
+    
+    def find_grouping_set(self, dimensions):
+        """dimensions를 모두 포함하는 가장 작은 그룹화 집합"""
+        dimensions = frozenset(dimensions)
+        unknown = dimensions - set(self.dimensions)
+        if unknown:
+            raise ValueError(f"큐브에 없는 차원입니다: {sorted(unknown)}")
+        
+        if dimensions in self.grouping_sets:
+            return self.grouping_sets[dimensions]
+        
+        candidates = [grouping for key, grouping in self.grouping_sets.items() if dimensions <= key]
+        if not candidates:
+            raise ValueError(f"{sorted(dimensions)}를 포함하는 그룹화 집합이 없습니다")
+        return min(candidates, key=len)
+    
+    def encode(self, dimension, condition):
+        """조건(값, 값 목록, slice(시작, 끝))을 차원 코드 목록으로 변환 (없는 값은 제외)"""
+        labels = self.labels[dimension]
+        
+        if isinstance(condition, slice):
+            indexer = labels.slice_indexer(condition.start, condition.stop)
+            return list(range(len(labels)))[indexer]
+        
+        if not isinstance(condition, (list, tuple, set, np.ndarray, pd.Index)):
+            condition = [condition]
+        if isinstance(labels, pd.DatetimeIndex):
+            condition = pd.to_datetime(list(condition))
+        
+        codes = labels.get_indexer(list(condition))
+        return sorted(set(codes[codes >= 0].tolist()))
+    
+    @instrument('analyze')
+    def query(self, by=(), where=None, metrics=None):
+        """조건에 맞는 그룹을 by 차원별로 집계
+        
+        by: 결과를 나눌 차원 목록 (빈 목록이면 전체 합계 한 행)
+        where: {차원: 값 | 값 목록 | slice(시작, 끝)} (slice는 날짜 등 정렬된 차원의 범위)
+        metrics: 반환할 지표 (기본값: 전체)
+        반환값: by 차원 + 지표 DataFrame (by 차원 값 순 정렬, 결측 차원 값 그룹 제외)
+        예: query(['Medium'], {'Campaign': 'summer_sale', 'Date': slice('2024-01-01', '2024-02-25')})
+        """
+        by = list(by)
+        where = where or {}
+        grouping = self.find_grouping_set(set(by) | set(where))
+        conditions = {dimension: self.encode(dimension, condition) for dimension, condition in where.items()}
+        
+        # 역색인으로 조건에 맞는 그룹만 꺼냄 (그룹화 집합 전체를 훑지 않음)
+        positions = grouping.select(conditions)
+        
+        result = self._aggregate(grouping, by, positions)
+        
+        return self._finish(result, metrics, self._crossed_metrics(by, conditions))
+    
+    def cell(self, **coordinates):
+        """차원 값이 모두 정해진 한 칸의 지표 {지표: 값} (예: cell(Campaign='summer_sale', Medium='cpc'))
+        
+        데이터가 없는 조합이면 None
+        """
+        grouping = self.find_grouping_set(coordinates)
+        codes = {}
+        for dimension, value in coordinates.items():
+            encoded = self.encode(dimension, value)
+            if len(encoded) != 1:
+                return None
+            codes[dimension] = encoded[0]
+        
+        if set(grouping.dimensions) == set(coordinates):
+            position = grouping.locate(codes)
+            positions = np.array([] if position is None else [position], dtype=np.int64)
+        else:
+            positions = grouping.select({dimension: [code] for dimension, code in codes.items()})
+        
+        if len(positions) == 0:
+            return None
+        
+        crossed = self._crossed_metrics([], {dimension: [code] for dimension, code in codes.items()})
+        row = self._finish(self._aggregate(grouping, [], positions), None, crossed)
+        return {column: row[column].iloc[0] for column in row.columns}
+    
+    def _crossed_metrics(self, by, conditions):
+        """결과 한 행이 더할 수 없는 차원의 값 여러 개를 합치게 되는 지표 목록
+        
+        by에 차원이 있거나 조건으로 값 하나만 고르면 (또는 큐브에 값이 하나뿐이면) 합쳐지지 않음
+        """
+        crossed = []
+        for metric, dimension in self.non_additive.items():
+            if dimension in by:
+                continue
+            selected = len(conditions[dimension]) if dimension in conditions else self.sizes[dimension]
+            if selected > 1:
+                crossed.append(metric)
+        return crossed
+    
+    def _aggregate(self, grouping, by, positions):
+        """그룹화 집합의 positions 그룹을 by 차원별로 합산 (합계 컬럼 상태)"""
+        value_columns = list(grouping.values)
+        
+        if not by:
+            return pd.DataFrame({column: [grouping.values[column][positions].sum()] for column in value_columns})
+        
+        # 결측 차원 값 그룹 제외
+        codes = [grouping.codes[dimension][positions] for dimension in by]
+        keep = np.logical_and.reduce([dimension_codes >= 0 for dimension_codes in codes])
+        positions = positions[keep]
+        codes = [dimension_codes[keep] for dimension_codes in codes]
+        
+        group_codes, sums = _group_sum(
+            codes, by, {column: grouping.values[column][positions] for column in value_columns}
+        )
+        
+        result = pd.DataFrame({
+            dimension: self.labels[dimension].take(group_codes[dimension]) for dimension in by
+        })
+        for column in value_columns:
+            result[column] = sums[column]
+        
+        return result
+    
+    def _finish(self, result, metrics, crossed=()):
+        """합계 컬럼을 평균/가중 평균/비율 지표로 변환, crossed 지표는 제외"""
+        requested = [metric for metric in crossed if metrics is not None and metric in metrics]
+        if requested:
+            dimension = self.non_additive[requested[0]]
+            raise ValueError(f"{requested[0]}는 {dimension} 값 여러 개를 합쳐 집계할 수 없습니다 (by에 {dimension}를 넣거나 값 하나로 제한)")
+        for metric in crossed:
+            del result[metric]
+        
+        for metric in self.means:
+            count = result.pop(f"{metric}_Count")
+            total = result.pop(f"{metric}_Sum")
+            result[metric] = total / count.where(count > 0)
+        for metric, weight in self.weighted.items():
+            weights = result[weight].where(result[weight] > 0)
+            result[metric] = (result.pop(f"Weighted_{metric}") / weights).fillna(0)
+        for metric, (numerator, denominator) in self.ratios.items():
+            result[metric] = (result[numerator] / result[denominator].where(result[denominator] > 0)).fillna(0)
+        
+        if metrics is not None:
+            dimensions = [column for column in result.columns if column in self.dimensions]
+            result = result[dimensions + list(metrics)]
+        
+        return result
+
+
+def _combine_keys(code_arrays, sizes):
+    """차원 코드(-1 = 결측)를 혼합 기수 정수 키로 합침 (코드 사전순과 키 순서가 같음)"""
+    keys = np.zeros(len(code_arrays[0]) if code_arrays else 1, dtype=np.int64)
+    for codes, size in zip(code_arrays, sizes):
+        keys = keys * (size + 1) + (codes.astype(np.int64) + 1)
+    return keys
+
+
+@instrument('analyze')
+def build_grouping_sets(data, dimensions, sums, means, weighted, grouping_sets):
+    """원본을 한 번 집계한 뒤 그룹화 집합별 집계 배열 생성
+    
+    반환값: ({차원: 코드 → 값}, {frozenset(차원): GroupingSet})
+    """
+    # 가중 평균 지표는 (값 × 가중치) 합계 컬럼으로 집계
+    weighted_columns = {f"Weighted_{metric}": data[metric] * data[weight] for metric, weight in weighted.items()}
+    if weighted_columns:
+        data = data.assign(**weighted_columns)
+    
+    # 차원 값 → 정렬된 코드 (결측은 -1), 평균 지표는 합계/개수 컬럼
+    row_codes, labels = [], {}
+    for dimension in dimensions:
+        codes, uniques = pd.factorize(data[dimension], sort=True)
+        row_codes.append(codes)
+        labels[dimension] = uniques
+    sizes = {dimension: len(labels[dimension]) for dimension in dimensions}
+    
+    values = {column: data[column].to_numpy() for column in sums + list(weighted_columns)}
+    for metric in means:
+        column = data[metric].to_numpy(dtype=np.float64, na_value=np.nan)
+        present = ~np.isnan(column)
+        values[f"{metric}_Sum"] = np.where(present, column, 0.0)
+        values[f"{metric}_Count"] = present.astype(np.int64)
+    
+    built = {frozenset(dimensions): _group_values(row_codes, dimensions, values, sizes)}
+    
+    # 큰 집합부터 만들어 각 집합을 이미 만든 가장 작은 상위 집합에서 다시 묶음
+    for grouping_dimensions in sorted({frozenset(subset) for subset in grouping_sets}, key=len, reverse=True):
+        if grouping_dimensions in built:
+            continue
+        
+        parent = min((grouping for key, grouping in built.items() if grouping_dimensions <= key), key=len)
+        ordered = [dimension for dimension in dimensions if dimension in grouping_dimensions]
+        built[grouping_dimensions] = _group_values(
+            [parent.codes[dimension] for dimension in ordered], ordered, parent.values, sizes
+        )
+    
+    requested = {frozenset(subset) for subset in grouping_sets} | {frozenset(dimensions)}
+    return labels, {key: grouping for key, grouping in built.items() if key in requested}
+
+
+def _group_sum(code_arrays, dimensions, values):
+    """차원 코드 조합별 지표 합계 (groupby, 차원 코드 사전순 - 결측 코드 -1도 하나의 그룹)
+    
+    반환값: ({차원: 그룹별 코드}, {지표 컬럼: 그룹별 합계})
+    """
+    frame = pd.DataFrame(dict(zip(dimensions, code_arrays)))
+    for column, array in values.items():
+        frame[column] = array
+    
+    summed = frame.groupby(list(dimensions), sort=True)[list(values)].sum()
+    codes = {dimension: summed.index.get_level_values(dimension).to_numpy() for dimension in dimensions}
+    
+    return codes, {column: summed[column].to_numpy() for column in values}
+
+
+def _group_values(code_arrays, dimensions, values, sizes):
+    """코드 배열 기준으로 지표 배열을 합산해 GroupingSet 생성 (차원 코드 사전순)"""
+    if not dimensions:
+        return GroupingSet((), {}, {column: array.sum(keepdims=True) for column, array in values.items()}, sizes)
+    
+    group_codes, sums = _group_sum(code_arrays, dimensions, values)
+    
+    return GroupingSet(
+        dimensions,
+        {dimension: codes.astype(np.int32) for dimension, codes in group_codes.items()},
+        sums,
+        sizes
+    )
+
+
+def build_cube(data, kind='ga4', grouping_sets=None):
+    """정의된 큐브(kind: 'ga4' 또는 'gsc')로 데이터 집계"""
+    definition = CUBE_DEFINITIONS[kind]
+    
+    return RollupCube(
+        data,
+        definition['dimensions'],
+        definition['sums'],
+        definition['means'],
+        definition['weighted'],
+        definition['ratios'],
+        grouping_sets,
+        definition['non_additive']
+    )
+
+
+def load_cube(dataset, start_date, end_date, root_dir=None):
+    """로컬 저장소(warehouse)의 기간 데이터로 큐브 생성 (API 호출 없음, 날짜별 행을 Date 차원으로 사용)"""
+    data = warehouse.load_dataset(dataset, start_date, end_date, root_dir, daily=True)
+    if data.empty:
+        raise ValueError(f"저장소에 {dataset} 데이터가 없습니다 ({start_date} ~ {end_date})")
+    
+    return build_cube(data, DATASET_CUBES[dataset])
+
+
+def parse_conditions(items):
+    """CLI 조건 목록 ['차원=값', '차원=값1,값2', '차원=시작..끝']을 where 딕셔너리로 변환"""
+    where = {}
+    for item in items or []:
+        dimension, _, value = item.partition('=')
+        if '..' in value:
+            start, _, end = value.partition('..')
+            where[dimension] = slice(start or None, end or None)
+        elif ',' in value:
+            where[dimension] = value.split(',')
+        else:
+            where[dimension] = value
+    return where
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='로컬 저장소 데이터로 롤업 큐브를 만들어 조회')
+    parser.add_argument('--dataset', choices=list(DATASET_CUBES), help='warehouse 데이터셋 (지정하지 않으면 더미 데이터로 테스트)')
+    parser.add_argument('--start-date', help='시작일 (YYYY-MM-DD)')
+    parser.add_argument('--end-date', help='종료일 (YYYY-MM-DD)')
+    parser.add_argument('--by', nargs='*', default=[], help='결과를 나눌 차원')
+    parser.add_argument('--where', nargs='*', help='조건 (차원=값, 차원=값1,값2, 차원=시작..끝)')
+    args = parser.parse_args()
+    
+    if args.dataset:
+        cube = load_cube(args.dataset, args.start_date, args.end_date)
+        print(cube.query(args.by, parse_conditions(args.where)).to_string(index=False))
+    else:
+        print("롤업 큐브 테스트...")
+        
+        # 테스트용 더미 데이터: 캠페인 200개 × 8주 일별
+        rng = np.random.default_rng(0)
+        num_rows = 20000
+        test_data = pd.DataFrame({
+            'Date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 56, num_rows), unit='D'),
+            'Channel_Group': rng.choice(['Paid Search', 'Organic Search', 'Social', 'Email'], num_rows),
+            'Campaign': rng.choice([f'campaign_{i}' for i in range(200)], num_rows),
+            'Source': rng.choice(['google', 'naver', 'facebook', 'newsletter'], num_rows),
+            'Medium': rng.choice(['cpc', 'organic', 'social', 'email'], num_rows),
+            'Users': rng.poisson(80, num_rows),
+            'Sessions': rng.poisson(100, num_rows),
+            'Conversions': rng.poisson(3, num_rows)
+        })
+        
+        started = time.perf_counter()
+        cube = build_cube(test_data)
+        print(f"그룹화 집합 {len(cube.grouping_sets)}개 생성: {time.perf_counter() - started:.3f}초, "
+              f"{cube.nbytes / 1024 / 1024:.1f}MB")
+        
+        started = time.perf_counter()
+        result = cube.query(['Medium'], {'Campaign': 'campaign_7', 'Date': slice('2024-01-01', '2024-02-25')})
+        print(f"캠페인 하나의 매체별 전환 (8주): {(time.perf_counter() - started) * 1000:.2f}ms")
+        print(result)
+        
+        print(cube.cell(Campaign='campaign_7', Medium='cpc'))
@@ -1,15 +1,39 @@
 """
 Slack 웹훅을 통한 알림 발송 모듈
+연결을 재사용하는 발송 클라이언트 (타임아웃, Retry-After를 따르는 재시도)와 동시 발송 대기열 포함
 """
 
+import os
+import time
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future
+from email.utils import parsedate_to_datetime
 import requests
+from requests.adapters import HTTPAdapter
 import json
 from datetime import datetime
+from rate_limiter import get_backoff_delay
+from instrumentation import instrument
+import data_analyzer
 import config
 
 
-def send_slack_notification(webhook_url, message, blocks=None):
-    """Slack 웹훅으로 메시지 발송"""
+# 재시도할 Slack 응답 상태 코드 (429는 Retry-After를 따로 처리)
+SLACK_RETRYABLE_STATUS = {500, 502, 503, 504}
+
+# Retry-After 헤더가 없을 때 기본 대기 시간 (초)
+DEFAULT_RETRY_AFTER = 1.0
+
+# 발송 시도 결과
+SENT = 'sent'
+RETRY = 'retry'
+FAILED = 'failed'
+
+
+def build_payload(message, blocks=None):
+    """웹훅 요청 본문 생성"""
     payload = {
         "text": message,
         "username": "UTM Report Bot",
@@ -19,13 +43,265 @@ def send_slack_notification(webhook_url, message, blocks=None):
     if blocks:
         payload["blocks"] = blocks
     
+    return payload
+
+
+def parse_retry_after(value):
+    """Retry-After 헤더(초 또는 HTTP 날짜)를 대기 초로 변환"""
+    if not value:
+        return DEFAULT_RETRY_AFTER
+    
     try:
-        response = requests.post(webhook_url, json=payload)
-        response.raise_for_status()
-        return True
-    except requests.exceptions.RequestException as e:
-        print(f"Slack 알림 발송 실패: {e}")
-        return False
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now().astimezone()).total_seconds(), 0)
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+
+
+class SlackDeliveryClient:
+    """연결 풀을 공유하는 Slack 웹훅 발송 클라이언트
+    
+    429 응답의 Retry-After 동안은 같은 웹훅으로의 모든 발송을 멈추고,
+    5xx/연결 오류/타임아웃은 지수 백오프로 재시도
+    """
+    
+    def __init__(self, timeout=None, max_retries=None, pool_size=None):
+        settings = config.SLACK_SETTINGS
+        self.timeout = timeout or settings['timeout']
+        self.max_retries = settings['max_retries'] if max_retries is None else max_retries
+        
+        pool_size = pool_size or settings['send_workers']
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        self.lock = threading.Lock()
+        self.blocked_until = {}   # 웹훅 → 발송 재개 시각 (Retry-After)
+    
+    def get_wait(self, webhook_url):
+        """웹훅이 Retry-After로 막혀 있으면 남은 대기 시간 (초)"""
+        with self.lock:
+            return max(self.blocked_until.get(webhook_url, 0) - time.monotonic(), 0)
+    
+    def block(self, webhook_url, seconds):
+        with self.lock:
+            until = time.monotonic() + seconds
+            self.blocked_until[webhook_url] = max(self.blocked_until.get(webhook_url, 0), until)
+    
+    def attempt(self, webhook_url, payload):
+        """한 번 발송 시도
+        
+        반환값: (SENT | RETRY | FAILED, 다시 시도할 때까지 대기 초 또는 None, 오류 메시지 또는 None)
+        오류 메시지가 None인 RETRY는 Retry-After 대기 중이라 요청을 보내지 않은 경우
+        """
+        wait = self.get_wait(webhook_url)
+        if wait > 0:
+            return RETRY, wait, None
+        
+        try:
+            response = self.session.post(webhook_url, json=payload, timeout=self.timeout)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            return RETRY, None, str(e)
+        except requests.exceptions.RequestException as e:
+            return FAILED, None, str(e)
+        
+        if response.status_code == 429:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            self.block(webhook_url, retry_after)
+            return RETRY, retry_after, f"HTTP 429 (Retry-After {retry_after:.0f}초)"
+        
+        if response.status_code in SLACK_RETRYABLE_STATUS:
+            return RETRY, None, f"HTTP {response.status_code}"
+        
+        if not response.ok:
+            return FAILED, None, f"HTTP {response.status_code}: {response.text[:200]}"
+        
+        return SENT, None, None
+    
+    def send(self, webhook_url, payload):
+        """재시도를 포함해 메시지 하나를 발송 (성공 여부 반환)"""
+        retries = 0
+        while True:
+            outcome, delay, error = self.attempt(webhook_url, payload)
+            if outcome == SENT:
+                return True
+            
+            if outcome == FAILED or (error and retries >= self.max_retries):
+                print(f"Slack 알림 발송 실패: {error}")
+                return False
+            
+            if error:
+                delay = delay if delay is not None else get_backoff_delay(retries)
+                retries += 1
+                print(f"⚠️ Slack 발송 재시도 {retries}/{self.max_retries} ({delay:.1f}초 후): {error}")
+            
+            time.sleep(delay)
+
+
+class SlackSendQueue:
+    """여러 속성의 알림을 제한된 스레드로 동시에 발송하는 대기열
+    
+    재시도할 메시지는 대기 시각과 함께 다시 대기열에 넣으므로, 대기 중인 메시지가
+    다른 메시지(다른 웹훅) 발송을 막지 않음. 대기열이 가득 차면 submit이 자리가 날 때까지 기다림
+    """
+    
+    def __init__(self, client=None, workers=None, max_size=None):
+        settings = config.SLACK_SETTINGS
+        self.client = client or get_delivery_client()
+        self.max_size = max_size or settings['send_queue_size']
+        
+        self.condition = threading.Condition()
+        self.heap = []              # (발송 가능 시각, 순번, 작업)
+        self.sequence = itertools.count()
+        self.in_progress = 0
+        self.closed = False
+        
+        self.sent = 0
+        self.failed = []
+        
+        self.threads = [
+            threading.Thread(target=self._work, daemon=True)
+            for _ in range(workers or settings['send_workers'])
+        ]
+        for thread in self.threads:
+            thread.start()
+    
+    def submit(self, webhook_url, message, blocks=None):
+        """발송 요청 추가 (대기열이 가득 차면 대기)
+        
+        반환값: 재시도까지 끝나면 성공 여부(True/False)가 설정되는 Future
+        """
+        task = {
+            'webhook_url': webhook_url,
+            'payload': build_payload(message, blocks),
+            'retries': 0,
+            'future': Future()
+        }
+        
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("이미 닫힌 발송 대기열입니다")
+            
+            while len(self.heap) + self.in_progress >= self.max_size:
+                self.condition.wait()
+            
+            heapq.heappush(self.heap, (time.monotonic(), next(self.sequence), task))
+            self.condition.notify_all()
+        
+        return task['future']
+    
+    def _next_task(self):
+        """발송 가능한 작업을 꺼냄 (닫혔고 남은 작업이 없으면 None)"""
+        with self.condition:
+            while True:
+                if not self.heap:
+                    if self.closed and self.in_progress == 0:
+                        return None
+                    self.condition.wait()
+                    continue
+                
+                ready_at = self.heap[0][0]
+                now = time.monotonic()
+                if ready_at > now:
+                    self.condition.wait(ready_at - now)
+                    continue
+                
+                self.in_progress += 1
+                return heapq.heappop(self.heap)[2]
+    
+    def _work(self):
+        while True:
+            task = self._next_task()
+            if task is None:
+                return
+            
+            try:
+                outcome, delay, error = self.client.attempt(task['webhook_url'], task['payload'])
+            except Exception as e:
+                # 요청 라이브러리 밖의 오류(본문 직렬화 실패 등)도 작업 실패로 처리해 작업자와 Future가 멈추지 않게 함
+                outcome, delay, error = FAILED, None, f"{type(e).__name__}: {e}"
+            
+            with self.condition:
+                self.in_progress -= 1
+                
+                if outcome == RETRY and not (error and task['retries'] >= self.client.max_retries):
+                    if error:
+                        delay = delay if delay is not None else get_backoff_delay(task['retries'])
+                        task['retries'] += 1
+                    heapq.heappush(self.heap, (time.monotonic() + delay, next(self.sequence), task))
+                elif outcome == SENT:
+                    self.sent += 1
+                else:
+                    outcome = FAILED
+                    self.failed.append({
+                        'webhook_url': task['webhook_url'],
+                        'message': task['payload']['text'],
+                        'error': error
+                    })
+                    print(f"✗ Slack 알림 발송 실패: {error}")
+                
+                self.condition.notify_all()
+            
+            if outcome != RETRY:
+                task['future'].set_result(outcome == SENT)
+    
+    def close(self):
+        """남은 발송(재시도 포함)을 모두 마칠 때까지 기다린 뒤 결과 반환
+        
+        반환값: {'sent': 성공 수, 'failed': [{'webhook_url', 'message', 'error'}]}
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        
+        for thread in self.threads:
+            thread.join()
+        
+        return {'sent': self.sent, 'failed': list(self.failed)}
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+_delivery_client = None
+_delivery_client_lock = threading.Lock()
+
+
+def get_delivery_client():
+    """프로세스 공용 발송 클라이언트 반환 (연결 풀 재사용)"""
+    global _delivery_client
+    with _delivery_client_lock:
+        if _delivery_client is None:
+            _delivery_client = SlackDeliveryClient()
+        return _delivery_client
+
+
+@instrument('notify')
+def send_slack_notification(webhook_url, message, blocks=None):
+    """Slack 웹훅으로 메시지 발송"""
+    return get_delivery_client().send(webhook_url, build_payload(message, blocks))
+
+
+@instrument('notify')
+def send_notifications(notifications, workers=None):
+    """여러 알림을 동시에 발송
+    
+    notifications: [(webhook_url, message, blocks)]
+    반환값: {'sent': 성공 수, 'failed': [{'webhook_url', 'message', 'error'}]}
+    """
+    with SlackSendQueue(workers=workers) as queue:
+        for webhook_url, message, blocks in notifications:
+            queue.submit(webhook_url, message, blocks)
+    
+    return {'sent': queue.sent, 'failed': list(queue.failed)}
 
 
 def create_report_summary_blocks(utm_summary, gsc_summary, report_filename):
@@ -103,15 +379,16 @@ def create_report_summary_blocks(utm_summary, gsc_summary, report_filename):
     return blocks
 
 
-def send_weekly_report_notification(webhook_url, utm_data, gsc_data, report_filename):
-    """주간 보고서 완성 알림"""
+def build_weekly_report_message(utm_data, gsc_data, report_filename):
+    """주간 보고서 완성 알림 메시지 (utm_data: DataFrame 또는 분석 단계의 AggregationCube)
+    
+    반환값: (message, blocks)
+    """
     
     # 데이터 요약
-    utm_summary = utm_data.groupby(['Campaign', 'Source', 'Medium']).agg({
-        'Sessions': 'sum',
-        'Users': 'sum', 
-        'Conversions': 'sum'
-    }).sort_values('Sessions', ascending=False).reset_index()
+    utm_summary = data_analyzer.as_cube(utm_data).rollup(
+        ['Campaign', 'Source', 'Medium'], ['Sessions', 'Users', 'Conversions']
+    ).sort_values('Sessions', ascending=False).reset_index(drop=True)
     
     gsc_summary = gsc_data.sort_values('Clicks', ascending=False)
     
@@ -121,11 +398,16 @@ def send_weekly_report_notification(webhook_url, utm_data, gsc_data, report_file
     # 상세 블록 생성
     blocks = create_report_summary_blocks(utm_summary, gsc_summary, report_filename)
     
-    return send_slack_notification(webhook_url, message, blocks)
+    return message, blocks
 
 
-def send_error_notification(webhook_url, error_message, step):
-    """에러 발생 시 알림"""
+def send_weekly_report_notification(webhook_url, utm_data, gsc_data, report_filename):
+    """주간 보고서 완성 알림"""
+    return send_slack_notification(webhook_url, *build_weekly_report_message(utm_data, gsc_data, report_filename))
+
+
+def build_error_message(error_message, step):
+    """에러 알림 메시지 (message, blocks)"""
     blocks = [
         {
             "type": "header",
@@ -154,17 +436,210 @@ def send_error_notification(webhook_url, error_message, step):
     ]
     
     message = f"UTM 보고서 생성 중 오류가 발생했습니다: {step}"
-    return send_slack_notification(webhook_url, message, blocks)
+    return message, blocks
 
 
-def send_alert_notification(webhook_url, alert_type, threshold_data):
-    """임계값 기반 알림 (성과 급감/급증 등)"""
-    blocks = [
+def send_error_notification(webhook_url, error_message, step):
+    """에러 발생 시 알림"""
+    return send_slack_notification(webhook_url, *build_error_message(error_message, step))
+
+
+class AlertAggregator:
+    """이상치 알림을 시간 창 단위로 묶어 하나의 메시지로 발송
+    
+    - 같은 창 안의 같은 (속성, 지표, 캠페인) 알림은 한 건으로 합침 (발생 횟수만 증가)
+    - 발송에 성공한 키는 쿨다운 동안 다시 보내지 않음 (억제 건수만 집계해 다음 메시지에 표시, 실패하면 다시 발송)
+    - state_path를 주면 마지막 발송 시각을 파일에 저장해 다음 실행에서도 쿨다운 유지
+    - 창의 첫 알림이 들어온 뒤 window_seconds가 지나면 자동 발송
+    """
+    
+    def __init__(self, webhook_url, window_seconds=None, cooldown_seconds=None, max_items=None, queue=None,
+                 state_path=None):
+        settings = config.SLACK_SETTINGS
+        self.webhook_url = webhook_url
+        self.queue = queue      # SlackSendQueue를 주면 직접 보내지 않고 대기열에 넣음
+        self.state_path = state_path
+        self.window_seconds = settings['alert_window_seconds'] if window_seconds is None else window_seconds
+        self.cooldown_seconds = settings['alert_cooldown_seconds'] if cooldown_seconds is None else cooldown_seconds
+        self.max_items = max_items or settings['alert_max_items']
+        
+        self.lock = threading.Lock()
+        self.pending = {}       # (속성, 지표, 캠페인) → 알림
+        self.saved = load_alert_state(state_path) if state_path else {}        # 키 → 발송에 성공한 시각 (epoch 초)
+        self.last_sent = dict(self.saved)       # 발송 중인 알림 포함
+        self.suppressed = 0
+        self.timer = None
+    
+    def add(self, property_name, metric, campaign, alert_type, change_pct=None, detail=''):
+        """알림 추가 (쿨다운 중이면 억제하고 False 반환)"""
+        key = (property_name, metric, campaign)
+        now = time.time()
+        
+        with self.lock:
+            if now - self.last_sent.get(key, float('-inf')) < self.cooldown_seconds:
+                self.suppressed += 1
+                return False
+            
+            if key in self.pending:
+                alert = self.pending[key]
+                alert['count'] += 1
+                alert.update(alert_type=alert_type, change_pct=change_pct, detail=detail)
+            else:
+                self.pending[key] = {
+                    'property': property_name,
+                    'metric': metric,
+                    'campaign': campaign,
+                    'alert_type': alert_type,
+                    'change_pct': change_pct,
+                    'detail': detail,
+                    'count': 1
+                }
+            
+            if self.timer is None:
+                self.timer = threading.Timer(self.window_seconds, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+        
+        return True
+    
+    def add_performance_anomalies(self, property_name, anomalies):
+        """data_analyzer.detect_performance_anomalies 결과를 알림으로 추가, 추가된 건수 반환
+        
+        전주 대비 합계 변화는 캠페인 '전체', Z-score 이상치는 캠페인별로 추가
+        """
+        added = 0
+        for anomaly in anomalies:
+            if 'metric' in anomaly:
+                detail = f"{anomaly['current_value']:,} (전주 {anomaly['previous_value']:,})"
+                added += self.add(
+                    property_name, anomaly['metric'], '전체', anomaly['alert_type'], anomaly['change_pct'], detail
+                )
+            elif anomaly.get('type') == 'campaign_outliers':
+                for row in anomaly['data'].itertuples(index=False):
+                    alert_type = '급증' if row.Sessions_ZScore > 0 else '급감'
+                    detail = f"{row.Sessions:,}세션 (Z {row.Sessions_ZScore:+.1f}, {row.Source}/{row.Medium})"
+                    added += self.add(property_name, 'Sessions', row.Campaign, alert_type, None, detail)
+        return added
+    
+    def add_anomalies(self, property_name, anomalies):
+        """anomaly_engine.detect_anomalies 결과를 알림으로 추가, 추가된 건수 반환"""
+        added = 0
+        for row in anomalies.itertuples(index=False):
+            detail = f"{row.Value:,.0f} (기준 {row.Baseline:,.0f}, {row.Date:%m/%d})"
+            added += self.add(property_name, row.Metric, row.Campaign, row.Alert_Type, row.Change_Pct, detail)
+        return added
+    
+    def flush(self):
+        """모인 알림을 하나의 메시지로 발송
+        
+        반환값: 보낼 알림이 없으면 None, 대기열을 쓰면 발송 결과 Future, 아니면 성공 여부
+        """
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            
+            alerts = list(self.pending.values())
+            suppressed = self.suppressed
+            self.pending = {}
+            self.suppressed = 0
+            
+            # 발송 중에 같은 알림이 다시 들어와도 중복 발송하지 않도록 메모리에서만 쿨다운 시작
+            # (파일 저장은 발송 성공 후, 실패하면 되돌려 다음 창/실행에서 다시 발송)
+            now = time.time()
+            keys = [(alert['property'], alert['metric'], alert['campaign']) for alert in alerts]
+            previous = {key: self.last_sent.get(key) for key in keys}
+            for key in keys:
+                self.last_sent[key] = now
+        
+        if not alerts:
+            return None
+        
+        if self.queue is not None:
+            future = self.queue.submit(self.webhook_url, *build_alert_summary_message(alerts, suppressed, self.max_items))
+            future.add_done_callback(lambda done: self._finish_send(done.result(), now, previous))
+            return future
+        
+        sent = send_alert_summary_notification(self.webhook_url, alerts, suppressed, self.max_items)
+        self._finish_send(sent, now, previous)
+        return sent
+    
+    def _finish_send(self, sent, sent_at, previous):
+        """발송 성공이면 쿨다운 상태 저장, 실패면 이번 발송으로 바꾼 발송 시각을 되돌림"""
+        with self.lock:
+            if not sent:
+                for key, sent_before in previous.items():
+                    if self.last_sent.get(key) != sent_at:
+                        continue
+                    if sent_before is None:
+                        del self.last_sent[key]
+                    else:
+                        self.last_sent[key] = sent_before
+                return
+            
+            self.saved.update(dict.fromkeys(previous, sent_at))
+            if self.state_path:
+                save_alert_state(self.state_path, self.saved, self.cooldown_seconds)
+    
+    def close(self):
+        """남은 알림 발송"""
+        return self.flush()
+
+
+def load_alert_state(path):
+    """저장된 알림 발송 시각 불러오기 ({(속성, 지표, 캠페인): epoch 초}, 파일이 없거나 깨졌으면 빈 dict)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        return {(entry['property'], entry['metric'], entry['campaign']): entry['sent_at'] for entry in entries}
+    except FileNotFoundError:
+        return {}
+    except (ValueError, KeyError, TypeError) as e:
+        print(f"⚠️ 알림 상태 파일을 읽을 수 없어 쿨다운 없이 시작합니다: {e}")
+        return {}
+
+
+def save_alert_state(path, last_sent, cooldown_seconds):
+    """알림 발송 시각 저장 (쿨다운이 끝난 항목은 제외, 임시 파일에 쓴 뒤 교체)"""
+    cutoff = time.time() - cooldown_seconds
+    entries = [
+        {'property': key[0], 'metric': key[1], 'campaign': key[2], 'sent_at': sent_at}
+        for key, sent_at in last_sent.items()
+        if sent_at > cutoff
+    ]
+    
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(entries, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def create_alert_summary_blocks(alerts, suppressed=0, max_items=20):
+    """여러 알림을 요약한 Slack 블록 생성 (변화율이 큰 순서로 max_items개 표시)"""
+    ordered = sorted(alerts, key=lambda alert: abs(alert['change_pct'] or 0), reverse=True)
+    properties = sorted({alert['property'] for alert in alerts})
+    
+    lines = []
+    for alert in ordered[:max_items]:
+        change = f" {alert['change_pct']:+.1f}%" if alert['change_pct'] is not None else ''
+        repeat = f" ×{alert['count']}" if alert['count'] > 1 else ''
+        lines.append(
+            f"• [{alert['property']}] *{alert['campaign']}* {alert['metric']} {alert['alert_type']}{change}{repeat} {alert['detail']}"
+        )
+    if len(ordered) > max_items:
+        lines.append(f"• 외 {len(ordered) - max_items}건")
+    
+    context = f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} · 속성 {len(properties)}개"
+    if suppressed:
+        context += f" · 쿨다운으로 억제된 알림 {suppressed}건"
+    
+    return [
         {
-            "type": "header", 
+            "type": "header",
             "text": {
                 "type": "plain_text",
-                "text": f"🚨 성과 {alert_type} 알림",
+                "text": f"🚨 성과 이상 알림 {len(alerts)}건",
                 "emoji": True
             }
         },
@@ -172,13 +647,33 @@ def send_alert_notification(webhook_url, alert_type, threshold_data):
             "type": "section",
             "text": {
                 "type": "mrkdwn",
-                "text": f"*알림 유형:* {alert_type}\n*상세 내용:*\n{threshold_data}"
+                # 섹션 텍스트 최대 3,000자
+                "text": "\n".join(lines)[:3000]
             }
+        },
+        {
+            "type": "context",
+            "elements": [
+                {
+                    "type": "mrkdwn",
+                    "text": context
+                }
+            ]
         }
     ]
+
+
+def build_alert_summary_message(alerts, suppressed=0, max_items=20):
+    """여러 알림을 요약한 메시지 (message, blocks)"""
+    blocks = create_alert_summary_blocks(alerts, suppressed, max_items)
     
-    message = f"UTM 성과에 {alert_type} 상황이 감지되었습니다."
-    return send_slack_notification(webhook_url, message, blocks)
+    message = f"UTM 성과 이상 {len(alerts)}건이 감지되었습니다."
+    return message, blocks
+
+
+def send_alert_summary_notification(webhook_url, alerts, suppressed=0, max_items=20):
+    """여러 알림을 하나의 메시지로 발송"""
+    return send_slack_notification(webhook_url, *build_alert_summary_message(alerts, suppressed, max_items))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,39 @@
+"""
+pytest 공통 설정
+저장소 최상위 모듈(config, rate_limiter 등)을 import할 수 있도록 경로 추가, 가짜 시계
+"""
+
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeClock:
+    """모듈의 time 대신 넣는 가짜 시계 (sleep은 기다리지 않고 시각만 진행)"""
+    
+    def __init__(self, start=1000.0):
+        self.now = start
+        self.sleeps = []
+    
+    def monotonic(self):
+        return self.now
+    
+    def time(self):
+        return self.now
+    
+    def perf_counter(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+    
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_clock():
+    return FakeClock()
@@ -0,0 +1,83 @@
+"""anomaly_engine 기준선 / 이상치 판정 테스트"""
+
+import numpy as np
+import pandas as pd
+import pytest
+import config
+import anomaly_engine
+
+
+@pytest.fixture(autouse=True)
+def no_metrics(monkeypatch):
+    monkeypatch.setitem(config.METRICS_SETTINGS, 'enabled', False)
+
+
+def daily_frame(series, start='2024-01-01'):
+    """{캠페인: 일별 세션 목록} → get_daily_campaign_data 형식"""
+    frames = []
+    for campaign, sessions in series.items():
+        frames.append(pd.DataFrame({
+            'Date': pd.date_range(start, periods=len(sessions)),
+            'Campaign': campaign,
+            'Source': 'google',
+            'Medium': 'cpc',
+            'Channel_Group': 'Paid Search',
+            'Sessions': sessions,
+            'Conversions': [value // 10 for value in sessions]
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_flags_drop_against_same_weekday_baseline():
+    # 요일 패턴이 있는 5주 (기준선 4주 + 평가 1주), 마지막 날만 급감
+    weekly = [100, 120, 140, 160, 180, 60, 40]
+    steady = weekly * 5
+    dropped = weekly * 4 + weekly[:6] + [8]
+    
+    anomalies = anomaly_engine.detect_anomalies(
+        daily_frame({'steady': steady, 'dropped': dropped}), metrics=['Sessions'], baseline_weeks=4
+    )
+    
+    assert len(anomalies) == 1
+    row = anomalies.iloc[0]
+    assert row['Campaign'] == 'dropped'
+    assert row['Date'] == pd.Timestamp('2024-02-04')
+    assert row['Baseline'] == 40
+    assert row['Change_Pct'] == -80.0
+    assert row['Alert_Type'] == '급감'
+
+
+def test_no_flags_without_enough_history():
+    anomalies = anomaly_engine.detect_anomalies(
+        daily_frame({'short': [100] * 20 + [5]}), metrics=['Sessions'], baseline_weeks=4
+    )
+    
+    assert anomalies.empty
+
+
+def test_since_limits_reported_days():
+    weekly = [100] * 7
+    sessions = weekly * 4 + [100, 5, 100, 100, 100, 100, 5]
+    
+    anomalies = anomaly_engine.detect_anomalies(
+        daily_frame({'c': sessions}), metrics=['Sessions'], baseline_weeks=4, since='2024-02-02'
+    )
+    
+    assert anomalies['Date'].tolist() == [pd.Timestamp('2024-02-04')]
+
+
+def test_empty_input_returns_anomaly_columns():
+    anomalies = anomaly_engine.detect_anomalies(pd.DataFrame(columns=['Date', 'Campaign', 'Sessions']))
+    
+    assert anomalies.empty
+    assert list(anomalies.columns) == ['Campaign'] + anomaly_engine.ANOMALY_COLUMNS
+
+
+def test_score_matrix_uses_weekly_lags_only():
+    values = np.arange(36, dtype=np.float64)[None, :]
+    
+    baseline, _, _ = anomaly_engine.score_matrix(values, baseline_weeks=4)
+    
+    assert np.isnan(baseline[0, :28]).all()
+    # 28일째 기준선: 0, 7, 14, 21일 값의 중앙값
+    assert baseline[0, 28] == 10.5
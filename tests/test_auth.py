@@ -0,0 +1,43 @@
+"""auth 접속 주소별 클라이언트 캐시 테스트"""
+
+import pytest
+from google.auth.credentials import AnonymousCredentials
+import config
+import auth
+
+
+@pytest.fixture(autouse=True)
+def fresh_clients(monkeypatch):
+    monkeypatch.setattr(config, 'API_ENDPOINTS', {'ga4': None, 'gsc': None})
+    monkeypatch.setattr(auth, '_load_credentials', AnonymousCredentials)
+    auth.reset_clients()
+    yield
+    auth.reset_clients()
+
+
+def test_ga4_client_follows_endpoint_changes():
+    config.API_ENDPOINTS['ga4'] = 'localhost:50051'
+    fake = auth.get_ga4_client()
+    assert auth.get_ga4_client() is fake
+    
+    config.API_ENDPOINTS['ga4'] = 'localhost:50052'
+    other = auth.get_ga4_client()
+    assert other is not fake
+    
+    # 주소를 지우면 인증된 기본 클라이언트
+    config.API_ENDPOINTS['ga4'] = None
+    default = auth.get_ga4_client()
+    assert default is not fake and default is not other
+    assert isinstance(default._transport._credentials, AnonymousCredentials)
+
+
+def test_search_console_service_follows_endpoint_changes():
+    config.API_ENDPOINTS['gsc'] = 'http://localhost:8080/'
+    fake = auth.get_search_console_service()
+    assert auth.get_search_console_service() is fake
+    assert fake._baseUrl.startswith('http://localhost:8080/')
+    
+    config.API_ENDPOINTS['gsc'] = None
+    default = auth.get_search_console_service()
+    assert default is not fake
+    assert not default._baseUrl.startswith('http://localhost:8080/')
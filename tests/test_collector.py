@@ -0,0 +1,99 @@
+"""collector 그룹별 동시 실행 제한 / 시간 초과 처리 / 백필 병합 테스트"""
+
+import time
+import threading
+import pandas as pd
+import pytest
+import config
+import collector
+
+
+@pytest.fixture(autouse=True)
+def no_metrics(monkeypatch):
+    monkeypatch.setitem(config.METRICS_SETTINGS, 'enabled', False)
+
+
+class ConcurrencyProbe:
+    """동시에 실행 중인 작업 수의 최댓값 기록"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+    
+    def task(self, seconds, value=None):
+        def run():
+            with self.lock:
+                self.running += 1
+                self.peak = max(self.peak, self.running)
+            time.sleep(seconds)
+            with self.lock:
+                self.running -= 1
+            return value
+        return run
+
+
+def test_per_group_limit():
+    probe = ConcurrencyProbe()
+    groups = {'p1': {f"t{i}": probe.task(0.02, i) for i in range(5)}}
+    
+    result = collector.collect_grouped(groups, max_workers=4, per_group_limit=2)
+    
+    assert result['data']['p1'] == {f"t{i}": i for i in range(5)}
+    assert probe.peak == 2
+
+
+def test_timed_out_call_keeps_group_slot_until_finished():
+    probe = ConcurrencyProbe()
+    tasks = {'slow': probe.task(0.5)}
+    tasks.update({f"fast{i}": probe.task(0.02, i) for i in range(3)})
+    
+    result = collector.collect_grouped({'p1': tasks}, max_workers=4, per_group_limit=1, timeout=0.1)
+    
+    assert 'slow' in result['errors']['p1']
+    assert result['data']['p1'] == {f"fast{i}": i for i in range(3)}
+    # 시간 초과된 호출이 아직 실행 중일 때 같은 그룹의 다음 호출이 시작되면 안 됨
+    assert probe.peak == 1
+
+
+def test_collect_all_reports_errors():
+    def fail():
+        raise ValueError("broken")
+    
+    result = collector.collect_all({'ok': lambda: 1, 'bad': fail}, max_workers=2)
+    
+    assert result['data'] == {'ok': 1}
+    assert result['errors'] == {'bad': 'broken'}
+
+
+def chunk_summary(start_date, end_date):
+    """구간별 집계처럼 Date 없이 키별 값을 돌려주는 가짜 수집 함수 (1월 구간과 2월 구간의 값이 다름)"""
+    january = start_date.startswith('2024-01')
+    return pd.DataFrame({
+        'Campaign': ['summer_sale', 'brand'] if january else ['brand'],
+        'Users': [80, 9] if january else [20],
+        'Sessions': [100, 10] if january else [30],
+        'Engagement_Rate': [0.5, 0.2] if january else [0.6]
+    })
+
+
+def test_backfill_reaggregates_chunk_summaries():
+    df = collector.backfill(chunk_summary, '2024-01-01', '2024-02-29', chunk_days=31, max_workers=2)
+    
+    # 구간별 행을 이어 붙이지 않고 키별로 다시 집계, 여러 구간에 걸친 Users는 제외
+    assert list(df.columns) == ['Campaign', 'Sessions', 'Engagement_Rate']
+    brand = df.set_index('Campaign').loc['brand']
+    assert brand['Sessions'] == 40
+    assert brand['Engagement_Rate'] == pytest.approx((0.2 * 10 + 0.6 * 30) / 40)
+    
+    single = collector.backfill(chunk_summary, '2024-01-01', '2024-01-31', chunk_days=31)
+    assert single['Users'].tolist() == [80, 9]
+
+
+def test_backfill_concatenates_daily_rows():
+    def daily(start_date, end_date):
+        return pd.DataFrame({'Date': pd.date_range(start_date, end_date), 'Sessions': 1})
+    
+    df = collector.backfill(daily, '2024-01-01', '2024-01-10', chunk_days=3)
+    
+    assert df['Date'].tolist() == list(pd.date_range('2024-01-01', '2024-01-10'))
@@ -0,0 +1,71 @@
+"""data_analyzer 집계 큐브 테스트 (원본 groupby 결과와 비교)"""
+
+import numpy as np
+import pandas as pd
+import pytest
+import config
+import data_analyzer
+
+
+@pytest.fixture(autouse=True)
+def no_metrics(monkeypatch):
+    monkeypatch.setitem(config.METRICS_SETTINGS, 'enabled', False)
+
+
+@pytest.fixture
+def utm_data():
+    return pd.DataFrame({
+        'Campaign': ['summer_sale', 'summer_sale', 'brand', None, 'brand'],
+        'Source': ['google', 'naver', 'google', 'google', 'google'],
+        'Medium': ['cpc', 'cpc', 'cpc', 'cpc', 'cpc'],
+        'Channel_Group': pd.Categorical(['Paid Search', 'Paid Search', 'Paid Search', 'Direct', 'Paid Search']),
+        'Users': [80, 20, 40, 5, 10],
+        'Sessions': [100, 30, 50, 6, 12],
+        'Page_Views': [200, 50, 90, 6, 20],
+        'Conversions': [5, 1, 2, 0, 1],
+        'Engagement_Rate': [0.5, np.nan, 0.4, 0.9, 0.6],
+        'Avg_Session_Duration': [60.0, 30.0, 90.0, 10.0, 45.0]
+    })
+
+
+def test_rollup_matches_groupby(utm_data):
+    cube = data_analyzer.AggregationCube(utm_data)
+    
+    rollup = cube.rollup(['Campaign', 'Source', 'Medium'])
+    expected = utm_data.groupby(['Campaign', 'Source', 'Medium']).agg({
+        'Users': 'sum', 'Sessions': 'sum', 'Page_Views': 'sum', 'Conversions': 'sum',
+        'Engagement_Rate': 'mean', 'Avg_Session_Duration': 'mean'
+    }).reset_index()
+    
+    pd.testing.assert_frame_equal(rollup, expected)
+
+
+def test_rollup_selects_metrics_and_keeps_categorical_groups(utm_data):
+    cube = data_analyzer.AggregationCube(utm_data)
+    
+    channels = cube.rollup(['Channel_Group'], ['Sessions', 'Engagement_Rate'])
+    
+    assert list(channels.columns) == ['Channel_Group', 'Sessions', 'Engagement_Rate']
+    assert channels.set_index('Channel_Group')['Sessions'].to_dict() == {'Direct': 6, 'Paid Search': 192}
+
+
+def test_totals_and_nunique_include_missing_dimension_rows(utm_data):
+    cube = data_analyzer.AggregationCube(utm_data)
+    
+    totals = cube.totals()
+    
+    assert totals['Sessions'] == 198
+    assert totals['Engagement_Rate'] == pytest.approx(utm_data['Engagement_Rate'].mean())
+    assert cube.nunique('Campaign') == 2
+
+
+def test_analyzers_accept_dataframe_or_cube(utm_data):
+    cube = data_analyzer.AggregationCube(utm_data)
+    
+    pd.testing.assert_frame_equal(
+        data_analyzer.analyze_utm_performance(cube), data_analyzer.analyze_utm_performance(utm_data)
+    )
+    
+    # 큐브 없이 받은 DataFrame은 매번 새로 집계 (수정한 원본이 그대로 반영)
+    utm_data.loc[0, 'Sessions'] = 1000
+    assert data_analyzer.analyze_channel_performance(utm_data)['Sessions'].max() == 1092
@@ -0,0 +1,37 @@
+"""date_utils 기간 계산 / 분할 테스트"""
+
+import pytest
+import date_utils
+
+
+def test_full_range_is_validated_and_returned():
+    assert date_utils.get_date_range('2024-01-01', '2024-03-31') == ('2024-01-01', '2024-03-31')
+    
+    with pytest.raises(ValueError):
+        date_utils.get_date_range('2024-03-31', '2024-01-01')
+
+
+def test_no_range_defaults_to_last_week():
+    assert date_utils.get_date_range() == date_utils.get_last_week_range()
+
+
+@pytest.mark.parametrize('start_date, end_date', [('2024-01-01', None), (None, '2024-01-07')])
+def test_half_specified_range_raises(start_date, end_date):
+    with pytest.raises(ValueError):
+        date_utils.get_date_range(start_date, end_date)
+
+
+def test_previous_period_has_same_length():
+    assert date_utils.get_previous_period('2024-01-08', '2024-01-14') == ('2024-01-01', '2024-01-07')
+
+
+def test_split_date_range_covers_period_without_gaps():
+    chunks = date_utils.split_date_range('2024-01-01', '2024-03-01', 30)
+    
+    assert chunks == [('2024-01-01', '2024-01-30'), ('2024-01-31', '2024-02-29'), ('2024-03-01', '2024-03-01')]
+
+
+def test_group_consecutive_days():
+    days = ['2024-01-05', '2024-01-01', '2024-01-02', '2024-01-03']
+    
+    assert date_utils.group_consecutive_days(days) == [('2024-01-01', '2024-01-03'), ('2024-01-05', '2024-01-05')]
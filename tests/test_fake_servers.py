@@ -0,0 +1,125 @@
+"""가짜 GA4 / Search Console 서버 테스트 (실제 수집 코드로 페이지 넘김, 재시도, 할당량 초과 확인)"""
+
+import pytest
+from google.api_core import exceptions as api_exceptions
+from googleapiclient.errors import HttpError
+import auth
+import config
+import fake_servers
+import ga4_data
+import gsc_data
+
+
+SITE_URL = 'https://example.com/'
+
+
+@pytest.fixture(autouse=True)
+def local_settings(monkeypatch):
+    monkeypatch.setitem(config.METRICS_SETTINGS, 'enabled', False)
+    monkeypatch.setitem(config.CACHE_SETTINGS, 'enabled', False)
+    # 재시도 대기 없이 바로 다시 호출
+    monkeypatch.setitem(config.RATE_LIMIT_SETTINGS, 'base_delay', 0)
+    monkeypatch.setitem(config.RATE_LIMIT_SETTINGS, 'max_retries', 2)
+
+
+@pytest.fixture
+def start_servers(monkeypatch):
+    """빈 포트로 가짜 서버를 띄우고 config.API_ENDPOINTS를 지정 (테스트가 끝나면 종료 후 원래대로)"""
+    monkeypatch.setattr(config, 'API_ENDPOINTS', dict(config.API_ENDPOINTS))
+    started = []
+    
+    def start(**overrides):
+        servers = fake_servers.FakeServers(
+            ga4_port=0, gsc_port=0, latency_ms=0, latency_jitter_ms=0, **overrides
+        )
+        started.append(servers)
+        servers.configure_endpoints()
+        return servers
+    
+    yield start
+    
+    for servers in started:
+        servers.stop()
+    auth.reset_clients()
+
+
+def utm_request(property_id, return_property_quota=True):
+    request = ga4_data.build_utm_campaign_request('2024-01-01', '2024-01-07', property_id)
+    request.return_property_quota = return_property_quota
+    return request
+
+
+def fail_first(monkeypatch, behavior, count):
+    """처음 count번의 요청만 일시적 오류로 응답"""
+    failures = iter([True] * count)
+    monkeypatch.setattr(behavior, 'should_fail', lambda: next(failures, False))
+
+
+def test_ga4_offset_paging_follows_row_count(start_servers):
+    servers = start_servers(ga4_rows=250)
+    
+    pages = list(ga4_data.iter_report_pages(auth.get_ga4_client(), utm_request('fake-paging'), page_size=100))
+    
+    assert [len(page.rows) for page in pages] == [100, 100, 50]
+    assert {page.row_count for page in pages} == {250}
+    
+    df = ga4_data.pages_to_dataframe(pages, ga4_data.UTM_CAMPAIGN_COLUMNS)
+    assert len(df) == 250
+    # 첫 번째 차원은 행 번호별로 다른 값이라 페이지가 겹치거나 빠지지 않았는지 확인 가능
+    assert df['Campaign'].tolist() == [f"sessionCampaignName_{i}" for i in range(250)]
+    assert servers.stats()['ga4'] == {'requests': 3, 'rows': 250, 'errors': 0, 'quota_exceeded': 0}
+
+
+def test_gsc_start_row_paging(start_servers, monkeypatch):
+    servers = start_servers(gsc_rows=120)
+    monkeypatch.setattr(gsc_data, 'GSC_MAX_PAGE_SIZE', 50)
+    body = {'startDate': '2024-01-01', 'endDate': '2024-01-07', 'dimensions': ['query']}
+    
+    df = gsc_data.query_search_analytics(body, site_url=SITE_URL)
+    
+    assert df['Query'].tolist() == [f"query {i}" for i in range(120)]
+    assert servers.stats()['gsc']['requests'] == 3
+    
+    # max_rows를 넘는 페이지는 요청하지 않음
+    assert len(gsc_data.query_search_analytics(body, max_rows=70, site_url=SITE_URL)) == 70
+    assert servers.stats()['gsc']['requests'] == 5
+
+
+def test_transient_errors_are_retried(start_servers, monkeypatch):
+    servers = start_servers(ga4_rows=10, gsc_rows=10)
+    fail_first(monkeypatch, servers.ga4_behavior, 2)
+    fail_first(monkeypatch, servers.gsc_behavior, 2)
+    
+    response = ga4_data.run_report(auth.get_ga4_client(), utm_request('fake-retry'))
+    rows = gsc_data.execute_query(auth.get_search_console_service(), SITE_URL, {
+        'startDate': '2024-01-01', 'endDate': '2024-01-07', 'dimensions': ['query']
+    })['rows']
+    
+    assert len(response.rows) == 10
+    assert len(rows) == 10
+    for api in ('ga4', 'gsc'):
+        assert servers.stats()[api]['errors'] == 2
+        assert servers.stats()[api]['requests'] == 3
+
+
+def test_quota_exhaustion_reaches_caller(start_servers):
+    servers = start_servers(ga4_rows=10, gsc_rows=10, quota_tokens=10, tokens_per_request=10)
+    # 남은 토큰으로 호출 간격을 늘리는 GA4 추적기가 끼어들지 않도록 할당량 정보는 받지 않음
+    request = utm_request('fake-quota', return_property_quota=False)
+    client = auth.get_ga4_client()
+    body = {'startDate': '2024-01-01', 'endDate': '2024-01-07', 'dimensions': ['query']}
+    service = auth.get_search_console_service()
+    
+    ga4_data.run_report(client, request)
+    gsc_data.execute_query(service, SITE_URL, body)
+    
+    with pytest.raises(api_exceptions.ResourceExhausted):
+        ga4_data.run_report(client, request)
+    with pytest.raises(HttpError) as error:
+        gsc_data.execute_query(service, SITE_URL, body)
+    
+    assert error.value.resp.status == 429
+    # 재시도를 모두 쓴 뒤에 호출한 쪽으로 전달
+    retries = config.RATE_LIMIT_SETTINGS['max_retries']
+    assert servers.stats()['ga4']['quota_exceeded'] == retries + 1
+    assert servers.stats()['gsc']['quota_exceeded'] == retries + 1
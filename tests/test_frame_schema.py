@@ -0,0 +1,55 @@
+"""frame_schema 메모리 절약 스키마가 집계 결과를 바꾸지 않는지 테스트"""
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import frame_schema
+
+
+def make_utm_data(size=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Campaign': rng.choice(['summer_sale', 'brand_awareness', 'retargeting'], size),
+        'Source': rng.choice(['google', 'facebook', 'naver'], size),
+        'Medium': rng.choice(['cpc', 'social', 'email'], size),
+        'Users': rng.integers(0, 30000, size),
+        'Sessions': rng.integers(0, 30000, size),
+        'Engagement_Rate': rng.random(size),
+        'Avg_Session_Duration': rng.random(size) * 300
+    })
+
+
+def summarize(df):
+    summary = df.groupby(['Campaign', 'Source', 'Medium'], observed=True).agg({
+        'Users': 'sum',
+        'Sessions': 'sum',
+        'Engagement_Rate': 'mean',
+        'Avg_Session_Duration': 'mean'
+    }).reset_index()
+    return summary.astype({'Campaign': str, 'Source': str, 'Medium': str})
+
+
+def test_compact_dtypes():
+    compact = frame_schema.to_compact(make_utm_data())
+    
+    assert isinstance(compact['Campaign'].dtype, pd.CategoricalDtype)
+    assert compact['Sessions'].dtype.itemsize < 8
+    assert compact['Engagement_Rate'].dtype == np.float64
+    assert compact['Avg_Session_Duration'].dtype == np.float64
+
+
+def test_compact_aggregates_are_identical():
+    utm_data = make_utm_data()
+    
+    # 정수 합계는 다운캐스트한 dtype 범위를 넘어도 정확해야 하고, 평균은 비트 단위까지 같아야 함
+    pdt.assert_frame_equal(summarize(frame_schema.to_compact(utm_data)), summarize(utm_data), check_dtype=False, check_exact=True)
+    assert summarize(utm_data)['Sessions'].max() > np.iinfo(np.int16).max
+
+
+def test_compact_does_not_modify_input():
+    utm_data = make_utm_data()
+    dtypes = utm_data.dtypes.copy()
+    
+    frame_schema.to_compact(utm_data)
+    
+    pdt.assert_series_equal(utm_data.dtypes, dtypes)
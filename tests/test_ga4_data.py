@@ -0,0 +1,173 @@
+"""ga4_data 페이지 조회 / 열 단위 디코딩 / 배치 수집 테스트 (가짜 클라이언트 사용)"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from google.analytics.data_v1beta.types import (
+    BatchRunReportsResponse, DateRange, MetricType, RunReportRequest, RunReportResponse
+)
+import config
+import ga4_data
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    monkeypatch.setitem(config.CACHE_SETTINGS, 'enabled', False)
+    monkeypatch.setitem(config.METRICS_SETTINGS, 'enabled', False)
+    monkeypatch.setitem(config.REPORT_SETTINGS, 'compact_frames', False)
+
+
+def make_response(campaigns, sessions, row_count):
+    return RunReportResponse(
+        dimension_headers=[{'name': 'sessionCampaignName'}],
+        metric_headers=[
+            {'name': 'sessions', 'type_': MetricType.TYPE_INTEGER},
+            {'name': 'engagementRate', 'type_': MetricType.TYPE_FLOAT}
+        ],
+        rows=[
+            {'dimension_values': [{'value': campaign}], 'metric_values': [{'value': str(value)}, {'value': '0.5'}]}
+            for campaign, value in zip(campaigns, sessions)
+        ],
+        row_count=row_count
+    )
+
+
+def make_request():
+    return RunReportRequest(
+        property='properties/1',
+        date_ranges=[DateRange(start_date='2024-01-01', end_date='2024-01-07')]
+    )
+
+
+class FakeClient:
+    """offset/limit에 맞춰 total_rows행 보고서를 나눠 반환"""
+    
+    def __init__(self, total_rows):
+        self.total_rows = total_rows
+        self.offsets = []
+    
+    def run_report(self, request):
+        self.offsets.append(request.offset)
+        end = min(request.offset + request.limit, self.total_rows)
+        indices = range(request.offset, end)
+        return make_response([f"c{i}" for i in indices], list(indices), self.total_rows)
+
+
+def test_pages_follow_offset_until_row_count():
+    client = FakeClient(total_rows=25)
+    
+    pages = list(ga4_data.iter_report_pages(client, make_request(), page_size=10))
+    
+    assert client.offsets == [0, 10, 20]
+    assert [len(page.rows) for page in pages] == [10, 10, 5]
+
+
+def test_pages_to_dataframe_keeps_order_and_dtypes():
+    client = FakeClient(total_rows=25)
+    pages = ga4_data.iter_report_pages(client, make_request(), page_size=10)
+    
+    df = ga4_data.pages_to_dataframe(pages, ['Campaign', 'Sessions', 'Engagement_Rate'])
+    
+    assert list(df.columns) == ['Campaign', 'Sessions', 'Engagement_Rate']
+    assert df['Campaign'].tolist() == [f"c{i}" for i in range(25)]
+    assert df['Sessions'].tolist() == list(range(25))
+    # compact_frames가 꺼져 있으면 차원은 범주형으로 바꾸지 않음
+    assert not isinstance(df['Campaign'].dtype, pd.CategoricalDtype)
+    assert df['Sessions'].dtype == np.int64
+    assert df['Engagement_Rate'].dtype == np.float64
+
+
+def test_compact_frames_makes_whole_report_categorical(monkeypatch):
+    monkeypatch.setitem(config.REPORT_SETTINGS, 'compact_frames', True)
+    monkeypatch.setitem(config.GA4_SETTINGS, 'page_size', 10)
+    client = FakeClient(total_rows=25)
+    
+    df = ga4_data.collect_report(client, 'utm_campaign', make_request())
+    
+    assert client.offsets == [0, 10, 20]
+    
+    # 여러 페이지의 차원이 하나의 범주 집합으로 변환됨
+    assert isinstance(df['Campaign'].dtype, pd.CategoricalDtype)
+    assert len(df['Campaign'].cat.categories) == 25
+    assert df['Sessions'].dtype.itemsize < 8
+
+
+def test_buffer_allocates_once_from_row_count():
+    buffer = ga4_data.ReportBuffer()
+    
+    buffer.append_page(make_response(['a', 'b'], [1, 2], row_count=5))
+    arrays = buffer.arrays
+    buffer.append_page(make_response(['c', 'd', 'e'], [3, 4, 5], row_count=5))
+    
+    assert buffer.arrays is arrays
+    assert buffer.to_dataframe()['Sessions'].tolist() == [1, 2, 3, 4, 5]
+
+
+def test_buffer_grows_when_row_count_increases():
+    buffer = ga4_data.ReportBuffer()
+    
+    buffer.append_page(make_response(['a', 'b'], [1, 2], row_count=3))
+    buffer.append_page(make_response(['c', 'd'], [3, 4], row_count=4))
+    
+    assert buffer.to_dataframe()['Campaign'].tolist() == ['a', 'b', 'c', 'd']
+
+
+def test_empty_report_has_requested_columns():
+    df = ga4_data.pages_to_dataframe(iter([make_response([], [], row_count=0)]), ['Campaign', 'Sessions'])
+    
+    assert df.empty
+    assert list(df.columns) == ['Campaign', 'Sessions']
+
+
+class BatchClient:
+    """요청의 차원/지표에 맞춰 기간별 한 행씩 반환 (date_ranges가 2개면 dateRange 차원 추가)"""
+    
+    def __init__(self):
+        self.batch_calls = 0
+        self.run_calls = 0
+    
+    def batch_run_reports(self, request):
+        self.batch_calls += 1
+        return BatchRunReportsResponse(reports=[self.respond(report) for report in request.requests])
+    
+    def run_report(self, request):
+        self.run_calls += 1
+        return self.respond(request)
+    
+    def respond(self, request):
+        dimensions = [dimension.name for dimension in request.dimensions]
+        compare = len(request.date_ranges) > 1
+        if compare:
+            dimensions.append('dateRange')
+        
+        rows = []
+        for value, date_range in enumerate(request.date_ranges, start=1):
+            keys = [f"{dimension}_1" for dimension in request.dimensions] + ([date_range.name] if compare else [])
+            rows.append({
+                'dimension_values': [{'value': key} for key in keys],
+                'metric_values': [{'value': str(value * 10)} for _ in request.metrics]
+            })
+        
+        return RunReportResponse(
+            dimension_headers=[{'name': dimension} for dimension in dimensions],
+            metric_headers=[{'name': metric.name, 'type_': MetricType.TYPE_INTEGER} for metric in request.metrics],
+            rows=rows,
+            row_count=len(rows)
+        )
+
+
+def test_weekly_reports_use_one_batch_call(monkeypatch):
+    client = BatchClient()
+    monkeypatch.setattr(ga4_data, 'get_ga4_client', lambda: client)
+    
+    data = ga4_data.get_weekly_report_data('2024-01-08', '2024-01-14', property_id='1')
+    
+    assert client.batch_calls == 1
+    assert client.run_calls == 0
+    
+    current, previous = data['utm_campaign']
+    assert list(current.columns) == ga4_data.UTM_CAMPAIGN_COLUMNS
+    assert current['Sessions'].tolist() == [10]
+    assert previous['Sessions'].tolist() == [20]
+    assert list(data['landing_page'].columns) == ga4_data.LANDING_PAGE_COLUMNS
+    assert len(data['landing_page']) == 1
@@ -0,0 +1,170 @@
+"""gsc_data startRow 페이지 조회 / 열 버퍼 / 기간 비교 재집계 테스트 (가짜 서비스 사용)"""
+
+import numpy as np
+import pandas as pd
+import pytest
+import config
+import gsc_data
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    monkeypatch.setitem(config.CACHE_SETTINGS, 'enabled', False)
+    monkeypatch.setitem(config.METRICS_SETTINGS, 'enabled', False)
+    monkeypatch.setitem(config.REPORT_SETTINGS, 'compact_frames', False)
+
+
+def make_rows(start, end, dimensions=1):
+    return [
+        {
+            'keys': [f"key{i}_{d}" for d in range(dimensions)],
+            'clicks': i, 'impressions': 10 * i + 10, 'ctr': 0.1, 'position': 2.0
+        }
+        for i in range(start, end)
+    ]
+
+
+class FakeService:
+    """startRow/rowLimit에 맞춰 total_rows행 결과를 나눠 반환"""
+    
+    def __init__(self, total_rows, dimensions=1):
+        self.total_rows = total_rows
+        self.dimensions = dimensions
+        self.bodies = []
+    
+    def searchanalytics(self):
+        return self
+    
+    def query(self, siteUrl, body):
+        self.bodies.append(body)
+        end = min(body['startRow'] + body['rowLimit'], self.total_rows)
+        rows = make_rows(body['startRow'], end, self.dimensions)
+        return FakeRequest({'rows': rows} if rows else {})
+
+
+class FakeRequest:
+    def __init__(self, response):
+        self.response = response
+    
+    def execute(self):
+        return self.response
+
+
+@pytest.fixture
+def service(monkeypatch):
+    def install(total_rows, dimensions=1):
+        fake = FakeService(total_rows, dimensions)
+        monkeypatch.setattr(gsc_data, 'get_search_console_service', lambda: fake)
+        return fake
+    return install
+
+
+BODY = {'startDate': '2024-01-01', 'endDate': '2024-01-07', 'dimensions': ['query']}
+
+
+def test_pages_follow_start_row(service, monkeypatch):
+    fake = service(total_rows=25)
+    monkeypatch.setattr(gsc_data, 'GSC_MAX_PAGE_SIZE', 10)
+    
+    df = gsc_data.query_search_analytics(BODY, site_url='sc-domain:example.com')
+    
+    assert [body['startRow'] for body in fake.bodies] == [0, 10, 20]
+    assert df['Query'].tolist() == [f"key{i}_0" for i in range(25)]
+    assert df['Clicks'].dtype == np.int64
+
+
+def test_max_rows_limits_last_page(service, monkeypatch):
+    fake = service(total_rows=100)
+    monkeypatch.setattr(gsc_data, 'GSC_MAX_PAGE_SIZE', 10)
+    
+    df = gsc_data.query_search_analytics(BODY, max_rows=15, site_url='sc-domain:example.com')
+    
+    assert [body['rowLimit'] for body in fake.bodies] == [10, 5]
+    assert len(df) == 15
+
+
+def test_buffer_splits_multiple_dimensions():
+    buffer = gsc_data.ColumnBuffer(['query', 'page'])
+    buffer.append_page(make_rows(0, 3, dimensions=2))
+    buffer.append_page(make_rows(3, 5, dimensions=2))
+    
+    df = buffer.to_dataframe()
+    
+    assert list(df.columns) == ['Query', 'Page', 'Clicks', 'Impressions', 'CTR', 'Position']
+    assert df['Query'].tolist() == [f"key{i}_0" for i in range(5)]
+    assert df['Page'].tolist() == [f"key{i}_1" for i in range(5)]
+
+
+def test_empty_result_keeps_columns_and_dtypes():
+    df = gsc_data.ColumnBuffer(['query']).to_dataframe()
+    
+    assert df.empty
+    assert df['Clicks'].dtype == np.int64
+
+
+def test_row_limit_is_keyword_only(service):
+    fake = service(total_rows=500, dimensions=1)
+    
+    df = gsc_data.get_page_performance_data('2024-01-01', '2024-01-07', 'sc-domain:example.com', row_limit=30)
+    
+    assert fake.bodies[0]['startDate'] == '2024-01-01'
+    assert fake.bodies[0]['endDate'] == '2024-01-07'
+    assert len(df) == 30
+    with pytest.raises(TypeError):
+        gsc_data.get_page_performance_data('2024-01-01', '2024-01-07', 'sc-domain:example.com', 30)
+
+
+def daily_query_rows(rows):
+    """(날짜, 검색어, 클릭, 노출, 순위) 목록 → query_search_analytics 결과 형식"""
+    df = pd.DataFrame(rows, columns=['Date', 'Query', 'Clicks', 'Impressions', 'Position'])
+    df['CTR'] = df['Clicks'] / df['Impressions']
+    return df[['Date', 'Query', 'Clicks', 'Impressions', 'CTR', 'Position']]
+
+
+def test_aggregate_search_rows_recomputes_ratios():
+    df = daily_query_rows([
+        ('2024-01-01', 'shoes', 10, 100, 2.0),
+        ('2024-01-02', 'shoes', 30, 300, 6.0),
+        ('2024-01-01', 'boots', 0, 0, 0.0)
+    ])
+    
+    summary = gsc_data._aggregate_search_rows(df, ['Query'])
+    
+    assert list(summary.columns) == ['Query', 'Clicks', 'Impressions', 'CTR', 'Position']
+    shoes = summary.iloc[0]
+    assert shoes['Query'] == 'shoes'
+    assert shoes['Clicks'] == 40 and shoes['Impressions'] == 400
+    assert shoes['CTR'] == pytest.approx(0.1)
+    # 노출 가중 평균 순위, 단순 평균(4.0)이 아님
+    assert shoes['Position'] == pytest.approx(5.0)
+    # 노출이 없는 키는 0으로 (0으로 나누지 않음)
+    boots = summary.iloc[1]
+    assert boots['CTR'] == 0 and boots['Position'] == 0
+
+
+def test_comparison_splits_one_query_into_periods(monkeypatch):
+    bodies = []
+    
+    def fake_query(request_body, max_rows=None, site_url=None):
+        bodies.append(request_body)
+        return daily_query_rows([
+            ('2024-01-03', 'shoes', 5, 50, 3.0),
+            ('2024-01-07', 'shoes', 5, 50, 5.0),
+            ('2024-01-08', 'shoes', 20, 100, 1.0),
+            ('2024-01-14', 'boots', 1, 10, 9.0)
+        ])
+    
+    monkeypatch.setattr(gsc_data, 'query_search_analytics', fake_query)
+    
+    current, previous = gsc_data.get_search_performance_comparison('2024-01-08', '2024-01-14')
+    
+    assert len(bodies) == 1
+    assert bodies[0]['startDate'] == '2024-01-01'
+    assert bodies[0]['endDate'] == '2024-01-14'
+    assert bodies[0]['dimensions'] == ['date', 'query']
+    
+    assert current['Query'].tolist() == ['shoes', 'boots']
+    assert current['Clicks'].tolist() == [20, 1]
+    assert previous['Query'].tolist() == ['shoes']
+    assert previous['Clicks'].tolist() == [10]
+    assert previous['Position'].iloc[0] == pytest.approx(4.0)
@@ -0,0 +1,70 @@
+"""instrumentation 구간별 메모리 최고치 테스트"""
+
+import threading
+import tracemalloc
+import pytest
+import config
+import instrumentation
+
+MB = 1024 * 1024
+
+
+@pytest.fixture(autouse=True)
+def tracing(monkeypatch):
+    monkeypatch.setitem(config.METRICS_SETTINGS, 'enabled', True)
+    monkeypatch.setitem(config.METRICS_SETTINGS, 'tracemalloc', True)
+    instrumentation.get_registry().reset()
+    yield
+    tracemalloc.stop()
+    instrumentation.get_registry().reset()
+
+
+def peak_of(name):
+    return instrumentation.get_registry().snapshot()['stages'][name]['tracemalloc_peak_bytes']
+
+
+def test_peak_excludes_memory_held_before_span():
+    tracemalloc.start()
+    held = bytearray(8 * MB)
+    
+    with instrumentation.measure('small'):
+        temporary = bytearray(1 * MB)
+        del temporary
+    
+    assert 0.9 * MB < peak_of('small') < 2 * MB
+    del held
+
+
+def test_outer_span_keeps_peak_of_nested_span():
+    with instrumentation.measure('outer'):
+        with instrumentation.measure('inner'):
+            temporary = bytearray(4 * MB)
+            del temporary
+        small = bytearray(1 * MB)
+        del small
+    
+    assert 3.9 * MB < peak_of('inner') < 5 * MB
+    assert 3.9 * MB < peak_of('outer') < 5 * MB
+
+
+def test_overlapping_threads_drop_memory_metric():
+    inside = threading.Event()
+    release = threading.Event()
+    
+    def background():
+        with instrumentation.measure('background'):
+            inside.set()
+            release.wait(5)
+    
+    thread = threading.Thread(target=background)
+    thread.start()
+    inside.wait(5)
+    with instrumentation.measure('foreground'):
+        temporary = bytearray(2 * MB)
+        del temporary
+    release.set()
+    thread.join()
+    
+    assert peak_of('foreground') == 0
+    assert peak_of('background') == 0
+    assert instrumentation.get_registry().snapshot()['stages']['foreground']['count'] == 1
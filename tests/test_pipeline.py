@@ -0,0 +1,98 @@
+"""pipeline 단계 DAG 체크포인트 저장 / 재개 테스트"""
+
+import os
+import pytest
+import config
+import pipeline
+
+
+@pytest.fixture(autouse=True)
+def pipeline_settings(monkeypatch, tmp_path):
+    monkeypatch.setitem(config.METRICS_SETTINGS, 'enabled', False)
+    monkeypatch.setitem(config.PIPELINE_SETTINGS, 'checkpoint_dir', str(tmp_path))
+    monkeypatch.setitem(config.SLACK_SETTINGS, 'webhook_url', '')
+
+
+class FakeStages:
+    """실행 횟수를 기록하고, fail에 든 단계는 실패하는 가짜 단계 DAG"""
+    
+    def __init__(self, monkeypatch):
+        self.calls = []
+        self.fail = set()
+        stages = {
+            'collect': {'deps': [], 'run': self.stage('collect')},
+            'analyze': {'deps': ['collect'], 'run': self.stage('analyze')},
+            'render': {'deps': ['analyze'], 'run': self.stage('render')}
+        }
+        monkeypatch.setattr(pipeline, 'STAGES', stages)
+    
+    def stage(self, name):
+        def run(context, inputs):
+            self.calls.append(name)
+            if name in self.fail:
+                raise RuntimeError(f"{name} broken")
+            return {'stage': name, 'inputs': sorted(inputs)}
+        return run
+
+
+def run(**kwargs):
+    return pipeline.run_pipeline('2024-01-01', '2024-01-07', **kwargs)
+
+
+def test_failed_stage_resumes_from_checkpoints(monkeypatch):
+    stages = FakeStages(monkeypatch)
+    stages.fail = {'analyze'}
+    
+    first = run()
+    
+    assert first['errors'] == {'analyze': 'analyze broken'}
+    assert first['skipped'] == ['render']
+    assert list(first['outputs']) == ['collect']
+    
+    stages.fail = set()
+    stages.calls = []
+    second = run()
+    
+    assert second['resumed'] == ['collect']
+    assert stages.calls == ['analyze', 'render']
+    assert second['outputs']['render'] == {'stage': 'render', 'inputs': ['analyze']}
+    assert not second['errors']
+
+
+def test_completed_run_is_not_repeated_unless_fresh(monkeypatch):
+    stages = FakeStages(monkeypatch)
+    run()
+    
+    stages.calls = []
+    resumed = run()
+    assert stages.calls == []
+    assert sorted(resumed['resumed']) == ['analyze', 'collect', 'render']
+    
+    fresh = run(fresh=True)
+    assert stages.calls == ['collect', 'analyze', 'render']
+    assert fresh['resumed'] == []
+
+
+def test_unreadable_checkpoint_is_rerun(monkeypatch):
+    stages = FakeStages(monkeypatch)
+    run()
+    
+    with open(pipeline.get_checkpoint_path('2024-01-01_2024-01-07', 'analyze'), 'wb') as f:
+        f.write(b'not a pickle')
+    
+    stages.calls = []
+    result = run()
+    
+    assert stages.calls == ['analyze']
+    assert 'analyze' not in result['resumed']
+
+
+def test_run_id_separates_checkpoints(monkeypatch, tmp_path):
+    stages = FakeStages(monkeypatch)
+    run(run_id='first')
+    
+    stages.calls = []
+    run(run_id='second')
+    
+    assert stages.calls == ['collect', 'analyze', 'render']
+    assert sorted(os.listdir(tmp_path)) == ['first', 'second']
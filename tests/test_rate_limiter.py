@@ -0,0 +1,184 @@
+"""rate_limiter 토큰 버킷 / GA4 할당량 추적 / 백오프 테스트 (가짜 시계 사용)"""
+
+import random
+from types import SimpleNamespace
+import pytest
+import config
+import rate_limiter
+
+
+@pytest.fixture
+def clock(fake_clock, monkeypatch):
+    monkeypatch.setattr(rate_limiter, 'time', fake_clock)
+    return fake_clock
+
+
+def make_property_quota(hour_remaining, day_remaining, consumed):
+    return SimpleNamespace(
+        tokens_per_hour=SimpleNamespace(remaining=hour_remaining, consumed=consumed),
+        tokens_per_day=SimpleNamespace(remaining=day_remaining, consumed=consumed)
+    )
+
+
+class RetryableError(Exception):
+    pass
+
+
+# TokenBucket
+
+def test_bucket_allows_burst_then_waits(clock):
+    bucket = rate_limiter.TokenBucket(rate=2, capacity=3)
+    
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.sleeps == []
+    
+    bucket.acquire()
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+
+def test_bucket_refills_at_rate(clock):
+    bucket = rate_limiter.TokenBucket(rate=4, capacity=5)
+    for _ in range(5):
+        bucket.acquire()
+    
+    clock.advance(0.75)   # 3개 충전
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.sleeps == []
+    
+    bucket.acquire()
+    assert sum(clock.sleeps) == pytest.approx(0.25)
+
+
+def test_bucket_never_exceeds_capacity(clock):
+    bucket = rate_limiter.TokenBucket(rate=100, capacity=4)
+    bucket.acquire()
+    
+    clock.advance(3600)
+    for _ in range(4):
+        bucket.acquire()
+    assert clock.sleeps == []
+    
+    bucket.acquire()
+    assert len(clock.sleeps) == 1
+
+
+# 백오프
+
+@pytest.mark.parametrize('attempt', range(10))
+def test_backoff_delay_within_jitter_bounds(attempt):
+    settings = config.RATE_LIMIT_SETTINGS
+    ceiling = min(settings['max_delay'], settings['base_delay'] * 2 ** attempt)
+    
+    random.seed(attempt)
+    delays = [rate_limiter.get_backoff_delay(attempt) for _ in range(200)]
+    
+    assert all(0 <= delay <= ceiling for delay in delays)
+    # full jitter: 구간 전체에 퍼져 있어야 함
+    assert min(delays) < ceiling * 0.25 and max(delays) > ceiling * 0.75
+
+
+def test_backoff_delay_capped(monkeypatch):
+    monkeypatch.setattr(rate_limiter.random, 'uniform', lambda low, high: high)
+    
+    assert rate_limiter.get_backoff_delay(30) == config.RATE_LIMIT_SETTINGS['max_delay']
+
+
+def test_call_with_backoff_retries_then_succeeds(clock, monkeypatch):
+    monkeypatch.setattr(rate_limiter, 'get_backoff_delay', lambda attempt: 2 ** attempt)
+    calls = []
+    
+    def flaky():
+        calls.append(clock.now)
+        if len(calls) < 3:
+            raise RetryableError("temporary")
+        return 'ok'
+    
+    result = rate_limiter.call_with_backoff(flaky, lambda e: isinstance(e, RetryableError))
+    
+    assert result == 'ok'
+    assert clock.sleeps == [1, 2]
+
+
+def test_call_with_backoff_gives_up_after_max_retries(clock, monkeypatch):
+    monkeypatch.setitem(config.RATE_LIMIT_SETTINGS, 'max_retries', 2)
+    calls = []
+    
+    def always_fail():
+        calls.append(1)
+        raise RetryableError("still down")
+    
+    with pytest.raises(RetryableError):
+        rate_limiter.call_with_backoff(always_fail, lambda e: True)
+    assert len(calls) == 3
+
+
+def test_call_with_backoff_does_not_retry_other_errors(clock):
+    def broken():
+        raise ValueError("bad request")
+    
+    with pytest.raises(ValueError):
+        rate_limiter.call_with_backoff(broken, lambda e: isinstance(e, RetryableError))
+    assert clock.sleeps == []
+
+
+# Ga4QuotaTracker
+
+def test_no_pacing_without_quota_information(clock):
+    tracker = rate_limiter.Ga4QuotaTracker()
+    
+    tracker.wait_for_turn('p1')
+    tracker.wait_for_turn('p1')
+    
+    assert clock.sleeps == []
+
+
+def test_no_pacing_above_threshold(clock):
+    tracker = rate_limiter.Ga4QuotaTracker()
+    tracker.record('p1', make_property_quota(hour_remaining=30000, day_remaining=150000, consumed=10))
+    
+    tracker.wait_for_turn('p1')
+    tracker.wait_for_turn('p1')
+    
+    assert clock.sleeps == []
+
+
+def test_pacing_spreads_remaining_hourly_tokens(clock):
+    tracker = rate_limiter.Ga4QuotaTracker()
+    # 시간당 한도의 20% 미만 (남은 1,000토큰 / 요청당 10토큰 = 100회 → 1시간에 고르게 36초 간격)
+    tracker.record('p1', make_property_quota(hour_remaining=1000, day_remaining=150000, consumed=10))
+    
+    tracker.wait_for_turn('p1')
+    tracker.wait_for_turn('p1')
+    tracker.wait_for_turn('p1')
+    
+    assert clock.sleeps == [pytest.approx(36), pytest.approx(36)]
+
+
+def test_pacing_is_per_property(clock):
+    tracker = rate_limiter.Ga4QuotaTracker()
+    tracker.record('p1', make_property_quota(hour_remaining=100, day_remaining=150000, consumed=10))
+    
+    tracker.wait_for_turn('p1')
+    tracker.wait_for_turn('p2')
+    tracker.wait_for_turn('p2')
+    
+    assert clock.sleeps == []
+
+
+def test_cost_is_moving_average(clock):
+    tracker = rate_limiter.Ga4QuotaTracker()
+    tracker.record('p1', make_property_quota(30000, 150000, consumed=10))
+    tracker.record('p1', make_property_quota(29000, 149000, consumed=20))
+    
+    assert tracker.cost['p1'] == pytest.approx(12)
+    assert tracker.get_remaining('p1') == {'tokens_per_hour': 29000, 'tokens_per_day': 149000}
+
+
+def test_record_ignores_missing_quota():
+    tracker = rate_limiter.Ga4QuotaTracker()
+    
+    tracker.record('p1', None)
+    
+    assert tracker.get_remaining('p1') == {}
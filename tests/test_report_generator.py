@@ -0,0 +1,107 @@
+"""report_generator 단일 패스 Excel 작성 / 출력 형식(백엔드) 테스트"""
+
+import os
+import openpyxl
+import pandas as pd
+import pytest
+import batch_render
+import config
+import report_generator
+
+
+@pytest.fixture(autouse=True)
+def no_metrics(monkeypatch):
+    monkeypatch.setitem(config.METRICS_SETTINGS, 'enabled', False)
+
+
+def make_tables():
+    summary = pd.DataFrame([['📊 UTM 성과 요약', ''], ['총 세션', '1,800']], columns=['항목', '값'])
+    campaigns = pd.DataFrame({
+        'Campaign': ['summer_sale', 'brand_awareness'],
+        'Source': ['google', 'facebook'],
+        'Medium': ['cpc', 'social'],
+        'Users': [1000, 500],
+        'Sessions': [1200, None],
+        'Conversions': [50, 15]
+    })
+    return {report_generator.SUMMARY_SHEET_NAME: summary, 'UTM 캠페인 성과': campaigns}
+
+
+def test_excel_report_styles_in_one_pass(tmp_path):
+    path = tmp_path / 'report.xlsx'
+    
+    report_generator.write_excel_report(make_tables(), str(path))
+    
+    wb = openpyxl.load_workbook(path)
+    assert wb.sheetnames == [report_generator.SUMMARY_SHEET_NAME, 'UTM 캠페인 성과']
+    
+    summary = wb[report_generator.SUMMARY_SHEET_NAME]
+    assert summary['A1'].font.bold and summary['A1'].fill.start_color.rgb.endswith('366092')
+    assert summary['A2'].font.bold and summary['A2'].font.size == 14
+    assert not summary['A3'].font.bold
+    
+    campaigns = wb['UTM 캠페인 성과']
+    assert [cell.value for cell in campaigns[2]] == ['summer_sale', 'google', 'cpc', 1000, 1200, 50]
+    # 결측값은 빈 셀
+    assert campaigns['E3'].value is None
+    assert campaigns.column_dimensions['A'].width == len('brand_awareness') + 2
+    assert len(campaigns._charts) == 1
+
+
+def test_excel_backend_splits_large_sheets(tmp_path):
+    tables = {'검색 키워드': pd.DataFrame({'Query': [f"q{i}" for i in range(5)], 'Clicks': range(5)})}
+    path = str(tmp_path / 'report.xlsx')
+    
+    assert report_generator.ExcelBackend(max_rows=2).write(tables, path) == [path]
+    
+    wb = openpyxl.load_workbook(path)
+    assert wb.sheetnames == ['검색 키워드', '검색 키워드 (2)', '검색 키워드 (3)']
+    assert [wb[name].max_row for name in wb.sheetnames] == [3, 3, 2]
+
+
+def test_write_report_creates_every_format(tmp_path):
+    base_name = str(tmp_path / 'weekly')
+    
+    outputs = report_generator.write_report(make_tables(), ['excel', 'parquet', 'csv', 'html'], base_name)
+    
+    assert outputs['excel'] == [f"{base_name}.xlsx"]
+    assert sorted(os.path.basename(path) for path in outputs['parquet']) == ['UTM_캠페인_성과.parquet', '주간_성과_요약.parquet']
+    
+    campaigns = pd.read_parquet(os.path.join(base_name, 'UTM_캠페인_성과.parquet'))
+    pd.testing.assert_frame_equal(campaigns, make_tables()['UTM 캠페인 성과'])
+    
+    csv = pd.read_csv(os.path.join(base_name, 'UTM_캠페인_성과.csv.gz'))
+    assert csv['Campaign'].tolist() == ['summer_sale', 'brand_awareness']
+    
+    assert outputs['html'][0] == os.path.join(base_name, 'index.html')
+    with open(outputs['html'][0], encoding='utf-8') as f:
+        assert 'UTM_캠페인_성과.html' in f.read()
+
+
+@pytest.mark.parametrize('backend, extension', [
+    (report_generator.CsvBackend, '.csv.gz'),
+    (report_generator.HtmlBackend, '.html')
+])
+def test_directory_backends_split_files(tmp_path, backend, extension):
+    tables = {'검색 키워드': pd.DataFrame({'Query': [f"q{i}" for i in range(5)], 'Clicks': range(5)})}
+    
+    paths = backend(max_rows_per_file=2).write(tables, str(tmp_path))
+    
+    parts = [os.path.basename(path) for path in paths if not path.endswith('index.html')]
+    assert parts == [f"검색_키워드_part{part}{extension}" for part in (1, 2, 3)]
+
+
+def test_backends_without_writer_cannot_be_created():
+    with pytest.raises(TypeError):
+        report_generator.ReportBackend()
+    with pytest.raises(TypeError):
+        report_generator.DirectoryBackend()
+
+
+def test_batch_render_writes_requested_formats(tmp_path):
+    filename = str(tmp_path / 'brand_a.xlsx')
+    
+    outputs, _ = batch_render.render_report(batch_render.serialize_tables(make_tables()), filename, ['excel', 'csv'])
+    
+    assert outputs['excel'] == [filename]
+    assert sorted(os.path.basename(path) for path in outputs['csv']) == ['UTM_캠페인_성과.csv.gz', '주간_성과_요약.csv.gz']
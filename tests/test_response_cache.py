@@ -0,0 +1,92 @@
+"""response_cache TTL / 만료 / 용량 제한(LRU) 테스트"""
+
+import os
+from datetime import datetime, timedelta
+import pytest
+import config
+import response_cache
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setitem(config.CACHE_SETTINGS, 'enabled', True)
+    monkeypatch.setitem(config.CACHE_SETTINGS, 'cache_dir', str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """response_cache가 보는 time.time()을 고정된 값으로 대체"""
+    now = {'value': 1_000_000.0}
+    monkeypatch.setattr(response_cache.time, 'time', lambda: now['value'])
+    return now
+
+
+def days_ago(days):
+    return (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+
+
+def test_ttl_depends_on_data_age():
+    settings = config.CACHE_SETTINGS
+    
+    assert response_cache.get_ttl(days_ago(0)) == settings['ttl_recent_seconds']
+    assert response_cache.get_ttl(days_ago(settings['recent_days'])) == settings['ttl_default_seconds']
+    assert response_cache.get_ttl(days_ago(settings['closed_after_days'])) == settings['ttl_closed_seconds']
+
+
+def test_entry_expires_after_ttl(cache_dir, clock):
+    response_cache.put('key', {'rows': [1, 2]}, ttl=60)
+    
+    clock['value'] += 59
+    assert response_cache.get('key') == {'rows': [1, 2]}
+    
+    clock['value'] += 2
+    assert response_cache.get('key') is None
+    assert not os.listdir(cache_dir)
+
+
+def test_disabled_cache_stores_nothing(cache_dir, monkeypatch):
+    monkeypatch.setitem(config.CACHE_SETTINGS, 'enabled', False)
+    
+    response_cache.put('key', 'payload', ttl=60)
+    
+    assert response_cache.get('key') is None
+    assert not os.listdir(cache_dir)
+
+
+def test_evict_removes_least_recently_used(cache_dir, monkeypatch):
+    monkeypatch.setitem(config.CACHE_SETTINGS, 'max_size_mb', 1024)
+    for index, key in enumerate(['old', 'middle', 'new']):
+        response_cache.put(key, b'x' * 1000, ttl=60)
+        path = response_cache._get_cache_path(key)
+        os.utime(path, (1000 + index, 1000 + index))
+    
+    entry_size = os.path.getsize(response_cache._get_cache_path('old'))
+    response_cache.evict(max_bytes=entry_size * 2)
+    
+    assert response_cache.get('old') is None
+    assert response_cache.get('middle') is not None
+    assert response_cache.get('new') is not None
+
+
+def test_get_refreshes_lru_order(cache_dir, monkeypatch):
+    monkeypatch.setitem(config.CACHE_SETTINGS, 'max_size_mb', 1024)
+    for index, key in enumerate(['first', 'second']):
+        response_cache.put(key, b'x' * 1000, ttl=60)
+        os.utime(response_cache._get_cache_path(key), (1000 + index, 1000 + index))
+    
+    # 먼저 저장한 항목을 읽으면 최근 사용 항목이 되어 나중 항목이 먼저 제거됨
+    response_cache.get('first')
+    response_cache.evict(max_bytes=os.path.getsize(response_cache._get_cache_path('first')))
+    
+    assert response_cache.get('first') is not None
+    assert response_cache.get('second') is None
+
+
+def test_cache_key_includes_endpoint_override(monkeypatch):
+    request = {'dimensions': ['query']}
+    real_key = response_cache.make_cache_key('gsc', 'site', request)
+    
+    monkeypatch.setitem(config.API_ENDPOINTS, 'gsc', 'http://127.0.0.1:8080')
+    
+    assert response_cache.make_cache_key('gsc', 'site', request) != real_key
@@ -0,0 +1,53 @@
+"""rollup_cube 조회 / 날짜 간 Users 제외 테스트"""
+
+import pandas as pd
+import pytest
+import config
+import rollup_cube
+
+
+@pytest.fixture(autouse=True)
+def no_metrics(monkeypatch):
+    monkeypatch.setitem(config.METRICS_SETTINGS, 'enabled', False)
+
+
+@pytest.fixture
+def cube():
+    data = pd.DataFrame({
+        'Date': pd.to_datetime(['2024-01-01', '2024-01-01', '2024-01-02', '2024-01-02']),
+        'Channel_Group': ['Paid Search', 'Email', 'Paid Search', 'Email'],
+        'Campaign': ['summer_sale', 'newsletter', 'summer_sale', 'newsletter'],
+        'Source': ['google', 'mailchimp', 'google', 'mailchimp'],
+        'Medium': ['cpc', 'email', 'cpc', 'email'],
+        'Users': [80, 30, 90, 20],
+        'Sessions': [100, 40, 120, 25],
+        'Conversions': [3, 1, 4, 0]
+    })
+    return rollup_cube.build_cube(data)
+
+
+def test_query_by_date_keeps_users(cube):
+    result = cube.query(['Date', 'Medium'], {'Campaign': 'summer_sale'})
+    
+    assert result['Sessions'].tolist() == [100, 120]
+    assert result['Users'].tolist() == [80, 90]
+
+
+def test_users_excluded_when_rows_span_several_days(cube):
+    result = cube.query(['Campaign'])
+    
+    assert 'Users' not in result.columns
+    assert result.set_index('Campaign')['Sessions'].to_dict() == {'newsletter': 65, 'summer_sale': 220}
+    assert 'Users' not in cube.cell(Campaign='summer_sale')
+
+
+def test_users_kept_for_a_single_day(cube):
+    result = cube.query(['Campaign'], {'Date': '2024-01-02'})
+    
+    assert result.set_index('Campaign')['Users'].to_dict() == {'newsletter': 20, 'summer_sale': 90}
+    assert cube.cell(Campaign='summer_sale', Date='2024-01-01')['Users'] == 80
+
+
+def test_requesting_users_across_days_raises(cube):
+    with pytest.raises(ValueError):
+        cube.query(['Campaign'], metrics=['Users'])
@@ -0,0 +1,174 @@
+"""slack_notifier 발송 대기열 테스트"""
+
+import threading
+from concurrent.futures import Future
+import pandas as pd
+import pytest
+import config
+import slack_notifier
+
+
+@pytest.fixture(autouse=True)
+def no_metrics(monkeypatch):
+    monkeypatch.setitem(config.METRICS_SETTINGS, 'enabled', False)
+
+
+class FakeClient:
+    """웹훅별로 정해진 결과를 돌려주는 가짜 발송 클라이언트"""
+    
+    max_retries = 1
+    
+    def __init__(self, outcomes=None):
+        self.outcomes = outcomes or {}
+        self.lock = threading.Lock()
+        self.payloads = []
+    
+    def attempt(self, webhook_url, payload):
+        with self.lock:
+            self.payloads.append((webhook_url, payload))
+        outcome = self.outcomes.get(webhook_url, slack_notifier.SENT)
+        if outcome == slack_notifier.SENT:
+            return outcome, None, None
+        return outcome, 0, "HTTP 503"
+
+
+def test_queue_submit_returns_delivery_future():
+    client = FakeClient({'http://hooks.test/broken': slack_notifier.RETRY})
+    
+    with slack_notifier.SlackSendQueue(client=client, workers=2) as queue:
+        sent = queue.submit('http://hooks.test/ok', "보고서")
+        failed = queue.submit('http://hooks.test/broken', "오류")
+        
+        assert sent.result(timeout=5) is True
+        # 재시도를 모두 쓴 뒤에 실패로 확정
+        assert failed.result(timeout=5) is False
+    
+    assert queue.sent == 1
+    assert [item['message'] for item in queue.failed] == ["오류"]
+    assert len(client.payloads) == 1 + 1 + client.max_retries
+
+
+def test_unexpected_client_error_fails_task_without_killing_worker():
+    class BrokenClient(FakeClient):
+        def attempt(self, webhook_url, payload):
+            if webhook_url.endswith('/broken'):
+                raise TypeError("Object of type int64 is not JSON serializable")
+            return super().attempt(webhook_url, payload)
+    
+    with slack_notifier.SlackSendQueue(client=BrokenClient(), workers=1) as queue:
+        broken = queue.submit('http://hooks.test/broken', "보고서")
+        assert broken.result(timeout=5) is False
+        # 같은 작업자가 다음 작업을 계속 처리
+        assert queue.submit('http://hooks.test/ok', "알림").result(timeout=5) is True
+    
+    assert queue.failed[0]['error'].startswith("TypeError")
+
+
+def test_delivery_client_pools_http_and_https():
+    client = slack_notifier.SlackDeliveryClient(pool_size=3)
+    
+    assert client.session.get_adapter('http://localhost:8080/hook') is client.session.get_adapter('https://hooks.slack.com/x')
+    assert client.session.get_adapter('http://localhost:8080/hook')._pool_maxsize == 3
+
+
+@pytest.fixture
+def queued():
+    """AlertAggregator가 보낸 (message, blocks)를 기록하는 가짜 대기열 (delivered=False면 발송 실패)"""
+    class RecordingQueue:
+        def __init__(self):
+            self.messages = []
+            self.delivered = True
+        
+        def submit(self, webhook_url, message, blocks=None):
+            self.messages.append((message, blocks))
+            future = Future()
+            future.set_result(self.delivered)
+            return future
+    
+    return RecordingQueue()
+
+
+def make_aggregator(queue, **kwargs):
+    return slack_notifier.AlertAggregator('http://hooks.test/alerts', window_seconds=600, cooldown_seconds=3600,
+                                          queue=queue, **kwargs)
+
+
+def test_aggregator_dedupes_same_key_within_window(queued):
+    aggregator = make_aggregator(queued)
+    
+    aggregator.add('brand_a', 'Sessions', 'summer_sale', '급감', -40.0)
+    aggregator.add('brand_a', 'Sessions', 'summer_sale', '급감', -55.0)
+    aggregator.add('brand_a', 'Sessions', 'brand', '급증', 35.0)
+    aggregator.close()
+    
+    assert len(queued.messages) == 1
+    message, blocks = queued.messages[0]
+    assert message == "UTM 성과 이상 2건이 감지되었습니다."
+    lines = blocks[1]['text']['text'].split("\n")
+    assert lines[0].startswith("• [brand_a] *summer_sale* Sessions 급감 -55.0% ×2")
+
+
+def test_aggregator_cooldown_survives_restart(queued, tmp_path, monkeypatch, fake_clock):
+    monkeypatch.setattr(slack_notifier, 'time', fake_clock)
+    state_path = tmp_path / 'alert_state.json'
+    
+    first = make_aggregator(queued, state_path=state_path)
+    first.add('brand_a', 'Sessions', 'summer_sale', '급감', -40.0)
+    first.close()
+    
+    # 다음 실행 (새 인스턴스): 쿨다운 안이면 억제
+    fake_clock.advance(1800)
+    second = make_aggregator(queued, state_path=state_path)
+    assert second.add('brand_a', 'Sessions', 'summer_sale', '급감', -40.0) is False
+    assert second.add('brand_b', 'Sessions', 'summer_sale', '급감', -40.0) is True
+    second.close()
+    
+    assert len(queued.messages) == 2
+    assert "쿨다운으로 억제된 알림 1건" in queued.messages[1][1][2]['elements'][0]['text']
+    
+    # 쿨다운이 지나면 다시 발송
+    fake_clock.advance(1801)
+    third = make_aggregator(queued, state_path=state_path)
+    assert third.add('brand_a', 'Sessions', 'summer_sale', '급감', -40.0) is True
+
+
+def test_aggregator_ignores_corrupt_state(queued, tmp_path):
+    state_path = tmp_path / 'alert_state.json'
+    state_path.write_text("{not json")
+    
+    aggregator = make_aggregator(queued, state_path=state_path)
+    
+    assert aggregator.add('brand_a', 'Sessions', 'summer_sale', '급감', -40.0) is True
+
+
+def test_performance_anomalies_keep_property_and_campaign(queued):
+    outliers = pd.DataFrame({
+        'Campaign': ['summer_sale'], 'Source': ['google'], 'Medium': ['cpc'],
+        'Sessions': [5000], 'Sessions_ZScore': [2.5]
+    })
+    anomalies = [
+        {'metric': 'Sessions', 'change_pct': -45.0, 'current_value': 550, 'previous_value': 1000, 'alert_type': '급감'},
+        {'type': 'campaign_outliers', 'data': outliers}
+    ]
+    aggregator = make_aggregator(queued)
+    
+    assert aggregator.add_performance_anomalies('123456789', anomalies) == 2
+    assert set(aggregator.pending) == {('123456789', 'Sessions', '전체'), ('123456789', 'Sessions', 'summer_sale')}
+
+
+def test_failed_send_does_not_start_cooldown(queued, tmp_path):
+    state_path = tmp_path / 'alert_state.json'
+    queued.delivered = False
+    
+    first = make_aggregator(queued, state_path=state_path)
+    first.add('brand_a', 'Sessions', 'summer_sale', '급감', -40.0)
+    assert first.close().result() is False
+    
+    # 같은 실행의 다음 창에서도, 다시 실행해도 다시 발송
+    assert first.add('brand_a', 'Sessions', 'summer_sale', '급감', -40.0) is True
+    queued.delivered = True
+    resumed = make_aggregator(queued, state_path=state_path)
+    assert resumed.add('brand_a', 'Sessions', 'summer_sale', '급감', -40.0) is True
+    assert resumed.close().result() is True
+    
+    assert make_aggregator(queued, state_path=state_path).add('brand_a', 'Sessions', 'summer_sale', '급감', -40.0) is False
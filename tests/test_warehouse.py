@@ -0,0 +1,126 @@
+"""warehouse 여러 날 읽기(다시 집계) / 빈 날짜 동기화 / GSC 수정 기간 테스트"""
+
+from datetime import datetime
+import pandas as pd
+import pytest
+import config
+import warehouse
+
+
+@pytest.fixture(autouse=True)
+def no_metrics(monkeypatch):
+    monkeypatch.setitem(config.METRICS_SETTINGS, 'enabled', False)
+
+
+def utm_day(sessions, engagement_rate, users):
+    return pd.DataFrame({
+        'Campaign': ['summer_sale', 'brand'],
+        'Source': ['google', 'naver'],
+        'Medium': ['cpc', 'cpc'],
+        'Channel_Group': ['Paid Search', 'Paid Search'],
+        'Users': users,
+        'Sessions': sessions,
+        'Page_Views': [2 * value for value in sessions],
+        'Engagement_Rate': engagement_rate,
+        'Avg_Session_Duration': [60.0, 120.0],
+        'Conversions': [1, 2]
+    })
+
+
+def search_day(clicks, impressions, position):
+    return pd.DataFrame({
+        'Query': ['shoes'],
+        'Clicks': [clicks],
+        'Impressions': [impressions],
+        'CTR': [clicks / impressions],
+        'Position': [position]
+    })
+
+
+def test_multi_day_load_reaggregates_per_key(tmp_path):
+    warehouse.write_partition('utm_campaign', '2024-01-01', utm_day([100, 10], [0.5, 0.2], [80, 9]), tmp_path)
+    warehouse.write_partition('utm_campaign', '2024-01-02', utm_day([300, 30], [0.9, 0.4], [200, 25]), tmp_path)
+    
+    df = warehouse.load_dataset('utm_campaign', '2024-01-01', '2024-01-02', tmp_path)
+    
+    assert len(df) == 2
+    summer = df.set_index('Campaign').loc['summer_sale']
+    assert summer['Sessions'] == 400
+    assert summer['Page_Views'] == 800
+    assert summer['Conversions'] == 2
+    # 세션 가중 평균 (0.5 × 100 + 0.9 × 300) / 400
+    assert summer['Engagement_Rate'] == pytest.approx(0.8)
+    # 날짜 간에 더할 수 없는 지표는 제외
+    assert 'Users' not in df.columns
+    assert 'Date' not in df.columns
+
+
+def test_single_day_load_keeps_users(tmp_path):
+    warehouse.write_partition('utm_campaign', '2024-01-01', utm_day([100, 10], [0.5, 0.2], [80, 9]), tmp_path)
+    
+    df = warehouse.load_dataset('utm_campaign', '2024-01-01', '2024-01-07', tmp_path)
+    
+    assert df['Users'].tolist() == [80, 9]
+
+
+def test_search_load_recomputes_ctr_and_position(tmp_path):
+    warehouse.write_partition('search_performance', '2024-01-01', search_day(10, 100, 2.0), tmp_path)
+    warehouse.write_partition('search_performance', '2024-01-02', search_day(30, 300, 6.0), tmp_path)
+    
+    df = warehouse.load_dataset('search_performance', '2024-01-01', '2024-01-02', tmp_path)
+    
+    row = df.iloc[0]
+    assert row['Clicks'] == 40
+    assert row['Impressions'] == 400
+    assert row['CTR'] == pytest.approx(0.1)
+    # 노출 가중 평균 순위 (2 × 100 + 6 × 300) / 400
+    assert row['Position'] == pytest.approx(5.0)
+
+
+def test_daily_load_returns_rows_per_day(tmp_path):
+    warehouse.write_partition('utm_campaign', '2024-01-01', utm_day([100, 10], [0.5, 0.2], [80, 9]), tmp_path)
+    warehouse.write_partition('utm_campaign', '2024-01-02', utm_day([300, 30], [0.9, 0.4], [200, 25]), tmp_path)
+    
+    df = warehouse.load_dataset('utm_campaign', '2024-01-01', '2024-01-02', tmp_path, daily=True)
+    
+    assert len(df) == 4
+    assert sorted(df['Date'].dt.strftime('%Y-%m-%d').unique()) == ['2024-01-01', '2024-01-02']
+
+
+def test_sync_does_not_store_empty_days(tmp_path, monkeypatch):
+    def collect(start_date, end_date):
+        df = utm_day([100, 10], [0.5, 0.2], [80, 9])
+        return df if start_date == '2024-01-01' else df.iloc[:0]
+    
+    monkeypatch.setitem(warehouse.DATASETS, 'utm_campaign', {'collect': collect, 'source': 'ga4', 'daily': False})
+    
+    result = warehouse.sync(['utm_campaign'], '2024-01-01', '2024-01-02', tmp_path)
+    
+    assert result['written'] == {'utm_campaign': ['2024-01-01']}
+    assert result['empty'] == {'utm_campaign': ['2024-01-02']}
+    assert warehouse.list_stored_dates('utm_campaign', tmp_path) == {'2024-01-01'}
+    assert warehouse.plan_sync(['utm_campaign'], '2024-01-01', '2024-01-02', tmp_path) == {'utm_campaign': ['2024-01-02']}
+
+
+def test_plan_sync_refetches_only_days_still_revised(tmp_path, monkeypatch):
+    class FixedDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(2024, 3, 10, 9, 0)
+    
+    monkeypatch.setattr(warehouse, 'datetime', FixedDatetime)
+    monkeypatch.setitem(config.WAREHOUSE_SETTINGS, 'gsc_revise_days', 3)
+    for day in ['2024-01-01', '2024-01-02', '2024-03-06', '2024-03-07', '2024-03-08']:
+        warehouse.write_partition('search_performance', day, search_day(10, 100, 3.0), tmp_path)
+    
+    # 과거 기간: 저장된 날짜는 다시 수집하지 않음
+    assert warehouse.plan_sync(['search_performance'], '2024-01-01', '2024-01-02', tmp_path) == {'search_performance': []}
+    # 어제까지 3일(03-07 ~ 03-09) 중 요청 기간 안의 날짜만 다시 수집
+    assert warehouse.plan_sync(['search_performance'], '2024-03-05', '2024-03-08', tmp_path) == {
+        'search_performance': ['2024-03-05', '2024-03-07', '2024-03-08']
+    }
+
+
+def test_sync_rejects_half_specified_range(tmp_path):
+    with pytest.raises(ValueError):
+        warehouse.sync(['utm_campaign'], start_date='2024-01-01', root_dir=tmp_path)
@@ -0,0 +1,270 @@
+"""
+로컬 Parquet 데이터 저장소
+수집 결과를 날짜별 파티션으로 저장하고, 저장소에 없는 날짜만 증분 동기화
+"""
+
+import os
+import argparse
+from datetime import datetime, timedelta
+from functools import partial
+import pandas as pd
+from date_utils import get_date_range, iter_days, split_date_range, group_consecutive_days
+import ga4_data
+import gsc_data
+import collector
+import config
+
+
+# 데이터셋 이름별 수집 함수
+# - source='gsc': 최근 며칠 데이터가 수정되므로 다시 수집
+# - daily=True: 결과에 Date 컬럼이 있으므로 여러 날을 한 번에 수집한 뒤 날짜별로 나눠 저장
+# - daily=False: 하루씩 수집해 저장하고, 여러 날을 읽을 때 load_dataset이 키별로 다시 집계
+# - Search Console은 상위 N개 제한 없는 전체 수집 함수 사용 (하루치 상위 N개를 여러 날 합치면
+#   같은 기간을 API로 조회한 결과와 달라지므로 파티션에는 그날의 전체 행을 저장)
+DATASETS = {
+    'utm_campaign': {'collect': ga4_data.get_utm_campaign_data, 'source': 'ga4', 'daily': False},
+    'landing_page': {'collect': ga4_data.get_landing_page_data, 'source': 'ga4', 'daily': False},
+    'daily_utm_trend': {'collect': ga4_data.get_daily_utm_trend, 'source': 'ga4', 'daily': True},
+    'daily_campaign': {'collect': ga4_data.get_daily_campaign_data, 'source': 'ga4', 'daily': True},
+    'search_performance': {'collect': gsc_data.get_full_search_performance_data, 'source': 'gsc', 'daily': False},
+    'page_performance': {'collect': gsc_data.get_full_page_performance_data, 'source': 'gsc', 'daily': False},
+    'query_page_performance': {'collect': gsc_data.get_full_query_page_performance, 'source': 'gsc', 'daily': False},
+    'daily_search_trend': {'collect': gsc_data.get_daily_search_trend, 'source': 'gsc', 'daily': True}
+}
+
+PARTITION_FILENAME = 'part-0.parquet'
+
+# 여러 날을 합칠 때 날짜별 값을 그대로 더하는 지표
+ADDITIVE_METRICS = ['Sessions', 'Page_Views', 'Conversions', 'Clicks', 'Impressions']
+
+# 가중 평균으로 다시 계산하는 비율 지표 → 가중치 지표
+# (참여율/이탈률/평균 세션 시간은 세션 기준, 순위는 노출 기준 평균이므로 날짜별 값 × 가중치의 합 / 가중치 합이 기간 값과 같음)
+WEIGHTED_METRICS = {
+    'Engagement_Rate': 'Sessions',
+    'Bounce_Rate': 'Sessions',
+    'Avg_Session_Duration': 'Sessions',
+    'Position': 'Impressions'
+}
+
+# 분자/분모 합계로 다시 계산하는 비율 지표
+RATIO_METRICS = {
+    'CTR': ('Clicks', 'Impressions')
+}
+
+# 날짜 간에 더할 수 없는 지표 (같은 사용자가 여러 날에 집계되므로 합계는 순 사용자 수보다 큼)
+NON_ADDITIVE_METRICS = ['Users']
+
+
+def get_partition_path(dataset, day, root_dir=None):
+    """데이터셋/날짜별 Parquet 파일 경로 반환 ({root}/{dataset}/date=YYYY-MM-DD/part-0.parquet)"""
+    root_dir = root_dir or config.WAREHOUSE_SETTINGS['root_dir']
+    return os.path.join(root_dir, dataset, f"date={day}", PARTITION_FILENAME)
+
+
+def list_stored_dates(dataset, root_dir=None):
+    """저장소에 있는 데이터셋의 날짜 목록 반환"""
+    root_dir = root_dir or config.WAREHOUSE_SETTINGS['root_dir']
+    dataset_dir = os.path.join(root_dir, dataset)
+    
+    if not os.path.isdir(dataset_dir):
+        return set()
+    
+    dates = set()
+    for name in os.listdir(dataset_dir):
+        if name.startswith('date=') and os.path.exists(os.path.join(dataset_dir, name, PARTITION_FILENAME)):
+            dates.add(name[len('date='):])
+    
+    return dates
+
+
+def write_partition(dataset, day, df, root_dir=None):
+    """하루치 데이터를 파티션 파일로 저장 (임시 파일에 쓴 뒤 교체)"""
+    path = get_partition_path(dataset, day, root_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    
+    df = df.copy()
+    if 'Date' not in df.columns:
+        df.insert(0, 'Date', pd.Timestamp(day))
+    
+    tmp_path = f"{path}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    
+    return path
+
+
+def load_dataset(dataset, start_date, end_date, root_dir=None, daily=False):
+    """저장소에서 기간 내 데이터를 읽어 하나의 DataFrame으로 반환 (API 호출 없음)
+    
+    일별 데이터셋(Date 컬럼이 있는 수집 결과)은 날짜별 행 그대로 반환.
+    그 외 데이터셋은 날짜별 파티션을 키별로 다시 집계해 같은 기간을 API로 조회한 결과와 같은 형식으로 반환
+    (aggregate_days 참고, Users는 날짜 간에 더할 수 없으므로 여러 날을 합친 결과에서 제외).
+    daily=True면 다시 집계하지 않고 날짜별 행을 Date 컬럼과 함께 반환
+    """
+    stored = list_stored_dates(dataset, root_dir)
+    days = [day for day in iter_days(start_date, end_date) if day in stored]
+    
+    frames = [pd.read_parquet(get_partition_path(dataset, day, root_dir)) for day in days]
+    if not frames:
+        return pd.DataFrame()
+    
+    df = pd.concat(frames, ignore_index=True)
+    if daily or DATASETS[dataset]['daily']:
+        return df
+    
+    return aggregate_days(df)
+
+
+def aggregate_days(df):
+    """날짜별 행을 Date를 뺀 키별로 합산
+    
+    합산 지표는 합계, 비율 지표는 가중 평균(WEIGHTED_METRICS) 또는 분자/분모 합계의 비(RATIO_METRICS)로 다시 계산.
+    Users처럼 더할 수 없는 지표는 하루치만 있을 때만 유지 (여러 날이면 제외 - 기간 순 사용자 수는 API로 조회)
+    """
+    num_days = df['Date'].nunique()
+    metrics = ADDITIVE_METRICS + list(WEIGHTED_METRICS) + list(RATIO_METRICS) + NON_ADDITIVE_METRICS
+    keys = [column for column in df.columns if column != 'Date' and column not in metrics]
+    
+    sums = [column for column in ADDITIVE_METRICS if column in df.columns]
+    if num_days == 1:
+        sums += [column for column in NON_ADDITIVE_METRICS if column in df.columns]
+    
+    weighted = {
+        metric: weight for metric, weight in WEIGHTED_METRICS.items()
+        if metric in df.columns and weight in df.columns
+    }
+    df = df.assign(**{f"Weighted_{metric}": df[metric] * df[weight] for metric, weight in weighted.items()})
+    
+    summary = df.groupby(keys, observed=True, dropna=False, sort=False)[
+        sums + [f"Weighted_{metric}" for metric in weighted]
+    ].sum().reset_index()
+    
+    for metric, weight in weighted.items():
+        weights = summary[weight].where(summary[weight] > 0)
+        summary[metric] = summary.pop(f"Weighted_{metric}") / weights
+    for metric, (numerator, denominator) in RATIO_METRICS.items():
+        if metric in df.columns:
+            summary[metric] = (summary[numerator] / summary[denominator].where(summary[denominator] > 0)).fillna(0)
+    
+    columns = [column for column in df.columns if column in summary.columns]
+    order = next((column for column in ('Sessions', 'Clicks') if column in summary.columns), None)
+    if order is not None:
+        summary = summary.sort_values(order, ascending=False, kind='stable')
+    
+    return summary[columns].reset_index(drop=True)
+
+
+def get_sync_range(days=None):
+    """동기화 기본 기간 반환 (어제까지 최근 N일)"""
+    days = days or config.WAREHOUSE_SETTINGS['sync_days']
+    end = datetime.now() - timedelta(days=1)
+    start = end - timedelta(days=days - 1)
+    
+    return start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')
+
+
+def plan_sync(datasets, start_date, end_date, root_dir=None):
+    """데이터셋별로 수집이 필요한 날짜 목록 계산
+    
+    저장소에 없는 날짜 + (GSC) 데이터가 아직 수정되는 최근 며칠
+    (수정 기간은 요청 기간의 끝이 아니라 오늘 기준 어제까지 N일이므로, 과거 기간을 요청하면 다시 수집하지 않음)
+    """
+    revise_days = config.WAREHOUSE_SETTINGS['gsc_revise_days']
+    all_days = list(iter_days(start_date, end_date))
+    recent_days = set(iter_days(*get_sync_range(revise_days))) & set(all_days) if revise_days > 0 else set()
+    
+    plan = {}
+    for dataset in datasets:
+        stored = list_stored_dates(dataset, root_dir)
+        refetch = recent_days if DATASETS[dataset]['source'] == 'gsc' else set()
+        plan[dataset] = [day for day in all_days if day not in stored or day in refetch]
+    
+    return plan
+
+
+def sync(datasets=None, start_date=None, end_date=None, root_dir=None):
+    """누락된 날짜만 API에서 수집하여 저장소에 저장
+    
+    기간을 지정하지 않으면 get_sync_range() (어제까지 최근 N일), 한쪽만 지정하면 ValueError
+    반환값: {'written': {데이터셋: [날짜]}, 'empty': {데이터셋: [결과가 없어 저장하지 않은 날짜]},
+             'errors': {작업 이름: 오류 메시지}}
+    """
+    datasets = list(datasets or DATASETS)
+    if start_date or end_date:
+        start_date, end_date = get_date_range(start_date, end_date)
+    else:
+        start_date, end_date = get_sync_range()
+    
+    plan = plan_sync(datasets, start_date, end_date, root_dir)
+    
+    # 수집 작업 (일별 데이터셋은 연속된 날짜를 구간 단위로 묶어 한 번에 수집)
+    chunk_days = config.BACKFILL_SETTINGS['chunk_days']
+    tasks = {}
+    for dataset, days in plan.items():
+        collect = DATASETS[dataset]['collect']
+        if DATASETS[dataset]['daily']:
+            for run_start, run_end in group_consecutive_days(days):
+                for chunk_start, chunk_end in split_date_range(run_start, run_end, chunk_days):
+                    tasks[(dataset, chunk_start, chunk_end)] = partial(collect, start_date=chunk_start, end_date=chunk_end)
+        else:
+            for day in days:
+                tasks[(dataset, day, day)] = partial(collect, start_date=day, end_date=day)
+    
+    if not tasks:
+        print("✓ 저장소가 최신 상태입니다")
+        return {'written': {}, 'empty': {}, 'errors': {}}
+    
+    print(f"수집 대상: {len(tasks)}개 (데이터셋 {len(datasets)}개, {start_date} ~ {end_date})")
+    result = collector.collect_all(tasks, max_workers=config.BACKFILL_SETTINGS['max_workers'])
+    
+    written = {}
+    empty = {}
+    for (dataset, chunk_start, chunk_end), df in result['data'].items():
+        for day in iter_days(chunk_start, chunk_end):
+            if DATASETS[dataset]['daily']:
+                day_df = df[df['Date'] == pd.Timestamp(day)]
+            else:
+                day_df = df
+            
+            # 빈 결과는 저장하지 않음 (아직 집계되지 않은 날짜가 저장된 것으로 표시되면 다시 수집하지 않으므로)
+            if day_df.empty:
+                empty.setdefault(dataset, []).append(day)
+                continue
+            
+            write_partition(dataset, day, day_df, root_dir)
+            written.setdefault(dataset, []).append(day)
+    
+    for dataset, days in written.items():
+        print(f"✓ {dataset}: {len(days)}일 저장")
+    for dataset, days in empty.items():
+        print(f"⚠️ {dataset}: 데이터가 없는 {len(days)}일은 저장하지 않음 (다음 동기화에서 다시 수집)")
+    
+    return {'written': written, 'empty': empty, 'errors': result['errors']}
+
+
+def print_status(root_dir=None):
+    """데이터셋별 저장된 날짜 범위 출력"""
+    for dataset in DATASETS:
+        dates = sorted(list_stored_dates(dataset, root_dir))
+        if dates:
+            print(f"{dataset}: {len(dates)}일 ({dates[0]} ~ {dates[-1]})")
+        else:
+            print(f"{dataset}: 저장된 데이터 없음")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='로컬 Parquet 저장소 관리')
+    parser.add_argument('command', choices=['sync', 'status'])
+    parser.add_argument('--start-date', help='동기화 시작일 (YYYY-MM-DD)')
+    parser.add_argument('--end-date', help='동기화 종료일 (YYYY-MM-DD)')
+    parser.add_argument('--days', type=int, help='어제까지 최근 N일 동기화')
+    parser.add_argument('--datasets', nargs='+', choices=list(DATASETS), help='동기화할 데이터셋')
+    args = parser.parse_args()
+    
+    if args.command == 'sync':
+        start_date, end_date = args.start_date, args.end_date
+        if not (start_date or end_date):
+            start_date, end_date = get_sync_range(args.days)
+        sync(args.datasets, start_date, end_date)
+    else:
+        print_status()